@@ -0,0 +1,236 @@
+"""baseline schema
+
+The schema as Base.metadata.create_all built it before migrations were
+introduced. Databases created that way should be stamped at this revision
+(`alembic stamp 0001`) and then upgraded; new databases start here.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16 21:13:32.131065
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('itinerary_trips',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('destination', sa.String(length=255), nullable=True),
+    sa.Column('start_date', sa.Date(), nullable=False),
+    sa.Column('end_date', sa.Date(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('cover_image_url', sa.String(length=500), nullable=True),
+    sa.Column('join_code', sa.String(length=6), nullable=True),
+    sa.Column('created_by', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_itinerary_trips_id'), 'itinerary_trips', ['id'], unique=False)
+    op.create_index(op.f('ix_itinerary_trips_join_code'), 'itinerary_trips', ['join_code'], unique=True)
+    op.create_table('users',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('password_hash', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('profile_pic_url', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_table('expense_trips',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('budget', sa.Float(), nullable=True),
+    sa.Column('created_by', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('itinerary_days',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('trip_id', sa.UUID(), nullable=False),
+    sa.Column('day_number', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['trip_id'], ['itinerary_trips.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('trip_id', 'day_number', name='uq_trip_day_number')
+    )
+    op.create_index(op.f('ix_itinerary_days_id'), 'itinerary_days', ['id'], unique=False)
+    op.create_table('itinerary_packing_lists',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('trip_id', sa.UUID(), nullable=False),
+    sa.Column('item', sa.String(length=255), nullable=False),
+    sa.Column('category', sa.String(length=100), nullable=True),
+    sa.Column('is_packed', sa.Boolean(), nullable=True),
+    sa.Column('quantity', sa.Integer(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('added_by', sa.UUID(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['trip_id'], ['itinerary_trips.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_itinerary_packing_lists_id'), 'itinerary_packing_lists', ['id'], unique=False)
+    op.create_table('itinerary_trip_members',
+    sa.Column('trip_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('role', sa.String(length=20), nullable=True),
+    sa.Column('joined_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['trip_id'], ['itinerary_trips.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('trip_id', 'user_id')
+    )
+    op.create_table('trips',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('cover_photo_url', sa.String(), nullable=True),
+    sa.Column('join_code', sa.String(length=6), nullable=True),
+    sa.Column('created_by', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_trips_id'), 'trips', ['id'], unique=False)
+    op.create_index(op.f('ix_trips_join_code'), 'trips', ['join_code'], unique=True)
+    op.create_table('expense_trip_members',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('trip_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('role', sa.String(), nullable=True),
+    sa.Column('joined_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['trip_id'], ['expense_trips.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('expenses',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('trip_id', sa.UUID(), nullable=False),
+    sa.Column('payer_id', sa.UUID(), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('currency', sa.String(length=3), nullable=True),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('category', sa.String(), nullable=True),
+    sa.Column('date', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('split_details', sa.JSON(), nullable=True),
+    sa.Column('type', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['payer_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['trip_id'], ['expense_trips.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_expenses_id'), 'expenses', ['id'], unique=False)
+    op.create_table('itinerary_activities',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('day_id', sa.UUID(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('activity_type', sa.String(length=50), nullable=True),
+    sa.Column('start_time', sa.Time(), nullable=True),
+    sa.Column('end_time', sa.Time(), nullable=True),
+    sa.Column('duration', sa.Integer(), nullable=True),
+    sa.Column('location', sa.String(length=255), nullable=True),
+    sa.Column('location_lat', sa.Numeric(precision=10, scale=8), nullable=True),
+    sa.Column('location_lng', sa.Numeric(precision=11, scale=8), nullable=True),
+    sa.Column('maps_link', sa.String(length=500), nullable=True),
+    sa.Column('cost', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('currency', sa.String(length=3), nullable=True),
+    sa.Column('booking_url', sa.String(length=500), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('image_url', sa.String(length=500), nullable=True),
+    sa.Column('assigned_to', sa.UUID(), nullable=True),
+    sa.Column('order_index', sa.Integer(), nullable=False),
+    sa.Column('is_completed', sa.Boolean(), nullable=True),
+    sa.Column('created_by', sa.UUID(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['day_id'], ['itinerary_days.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_itinerary_activities_id'), 'itinerary_activities', ['id'], unique=False)
+    op.create_table('media',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('trip_id', sa.UUID(), nullable=True),
+    sa.Column('gcs_path', sa.String(), nullable=False),
+    sa.Column('public_url', sa.String(), nullable=False),
+    sa.Column('thumbnail_url', sa.String(), nullable=True),
+    sa.Column('filename', sa.String(), nullable=False),
+    sa.Column('mime_type', sa.String(), nullable=False),
+    sa.Column('size_bytes', sa.Integer(), nullable=False),
+    sa.Column('is_favorite', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('photos',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('trip_id', sa.UUID(), nullable=True),
+    sa.Column('uploader_id', sa.UUID(), nullable=False),
+    sa.Column('gcs_path', sa.Text(), nullable=False),
+    sa.Column('public_url', sa.Text(), nullable=False),
+    sa.Column('media_type', sa.String(), nullable=True),
+    sa.Column('mime_type', sa.String(), nullable=True),
+    sa.Column('size_bytes', sa.BigInteger(), nullable=True),
+    sa.Column('is_favorite', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ),
+    sa.ForeignKeyConstraint(['uploader_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_photos_id'), 'photos', ['id'], unique=False)
+    op.create_table('trip_members',
+    sa.Column('trip_id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('role', sa.String(), nullable=True),
+    sa.Column('joined_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['trip_id'], ['trips.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('trip_id', 'user_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('trip_members')
+    op.drop_index(op.f('ix_photos_id'), table_name='photos')
+    op.drop_table('photos')
+    op.drop_table('media')
+    op.drop_index(op.f('ix_itinerary_activities_id'), table_name='itinerary_activities')
+    op.drop_table('itinerary_activities')
+    op.drop_index(op.f('ix_expenses_id'), table_name='expenses')
+    op.drop_table('expenses')
+    op.drop_table('expense_trip_members')
+    op.drop_index(op.f('ix_trips_join_code'), table_name='trips')
+    op.drop_index(op.f('ix_trips_id'), table_name='trips')
+    op.drop_table('trips')
+    op.drop_table('itinerary_trip_members')
+    op.drop_index(op.f('ix_itinerary_packing_lists_id'), table_name='itinerary_packing_lists')
+    op.drop_table('itinerary_packing_lists')
+    op.drop_index(op.f('ix_itinerary_days_id'), table_name='itinerary_days')
+    op.drop_table('itinerary_days')
+    op.drop_table('expense_trips')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+    op.drop_index(op.f('ix_itinerary_trips_join_code'), table_name='itinerary_trips')
+    op.drop_index(op.f('ix_itinerary_trips_id'), table_name='itinerary_trips')
+    op.drop_table('itinerary_trips')
@@ -0,0 +1,73 @@
+"""hot path indexes
+
+Composite and partial indexes for the listing and membership queries each
+request runs. On PostgreSQL they are built with CREATE INDEX CONCURRENTLY,
+which cannot run inside a transaction, hence the autocommit block; writes
+to the tables keep working while the indexes build. IF NOT EXISTS makes the
+migration safe on databases where create_all already built some of them,
+and lets a build that failed half way be retried (drop the INVALID index
+first; see DEPLOY.md).
+
+itinerary_days needs nothing new: the uq_trip_day_number unique index on
+(trip_id, day_number) already serves WHERE trip_id = ? ORDER BY day_number.
+
+Check the resulting plans with `python -m benchmarks.check_query_plans`.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16 21:24:41.902117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns, extra create_index kwargs)
+INDEXES = [
+    # GET /media/trip/{id}: WHERE trip_id = ? ORDER BY created_at DESC, id DESC
+    ('ix_media_trip_created_id', 'media', ['trip_id', 'created_at', 'id'], {}),
+    # GET /media/favorites: WHERE is_favorite AND trip_id IN (...) ORDER BY created_at DESC, id DESC
+    ('ix_media_favorite_trip_created_id', 'media', ['trip_id', 'created_at', 'id'], {
+        'postgresql_where': sa.text('is_favorite = true'),
+        'sqlite_where': sa.text('is_favorite = 1'),
+    }),
+    # GET /expenses/trip/{id}: WHERE trip_id = ? ORDER BY date DESC
+    ('ix_expenses_trip_date', 'expenses', ['trip_id', 'date'], {}),
+    # Expense membership checks: WHERE trip_id = ? AND user_id = ?
+    ('ix_expense_trip_members_trip_user', 'expense_trip_members', ['trip_id', 'user_id'], {}),
+    # GET /itinerary/days/{id}/activities: WHERE day_id = ? ORDER BY order_index
+    ('ix_itinerary_activities_day_order', 'itinerary_activities', ['day_id', 'order_index'], {}),
+    # GET /itinerary/trips/{id}/packing: WHERE trip_id = ?
+    ('ix_itinerary_packing_lists_trip_id', 'itinerary_packing_lists', ['trip_id'], {}),
+    # GET /trips/: the (trip_id, user_id) primary key can't serve WHERE user_id = ?
+    ('ix_trip_members_user_id', 'trip_members', ['user_id'], {}),
+    # GET /itinerary/trips: same for itinerary membership
+    ('ix_itinerary_trip_members_user_id', 'itinerary_trip_members', ['user_id'], {}),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns, kwargs in INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+                **kwargs
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns, kwargs in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,54 @@
+"""itinerary versions
+
+Per-trip change versions and tombstones for GET /itinerary/trips/{id}/changes
+(see app/services/itinerary_sync.py). Existing rows start at version 0;
+clients take the version to sync from out of GET /itinerary/trips/{id}/full.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16 23:02:11.418664
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+VERSIONED_TABLES = ['itinerary_trips', 'itinerary_days', 'itinerary_activities', 'itinerary_packing_lists']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+
+    for table in VERSIONED_TABLES:
+        if 'version' not in {column['name'] for column in inspector.get_columns(table)}:
+            op.add_column(table, sa.Column('version', sa.BigInteger(), server_default='0', nullable=False))
+
+    if 'itinerary_tombstones' not in inspector.get_table_names():
+        op.create_table('itinerary_tombstones',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('trip_id', sa.UUID(), nullable=False),
+        sa.Column('entity_type', sa.String(length=20), nullable=False),
+        sa.Column('entity_id', sa.UUID(), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['trip_id'], ['itinerary_trips.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_itinerary_tombstones_trip_version', 'itinerary_tombstones', ['trip_id', 'version'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_itinerary_tombstones_trip_version', table_name='itinerary_tombstones')
+    op.drop_table('itinerary_tombstones')
+    for table in reversed(VERSIONED_TABLES):
+        op.drop_column(table, 'version')
@@ -0,0 +1,36 @@
+"""media size bigint
+
+media.size_bytes was a 32-bit integer, so completing an upload session for
+a file of 2 GiB or more (upload_sessions.size_bytes is already BIGINT)
+failed with "integer out of range". On PostgreSQL the ALTER rewrites the
+table under an ACCESS EXCLUSIVE lock. SQLite integers are 64-bit whatever
+the declared type, so SQLite is left alone rather than rebuilding the table.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 09:12:40.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        op.alter_column('media', 'size_bytes', type_=sa.BigInteger(), existing_type=sa.Integer(), existing_nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        op.alter_column('media', 'size_bytes', type_=sa.Integer(), existing_type=sa.BigInteger(), existing_nullable=False)
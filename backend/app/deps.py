@@ -1,15 +1,109 @@
 from fastapi import Depends, HTTPException, status, Query
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
-from sqlalchemy.orm import Session
-from .database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+from .database import get_db, get_async_db
 from .utils.security import SECRET_KEY, ALGORITHM
 from .models.user import User
+from .services.cache import get_cache
 from typing import Optional
+from datetime import datetime
+from uuid import UUID
+import os
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=False)
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+# Seconds an authenticated user's row is served from cache; 0 disables it.
+# With the in-process cache backend this is also how long other processes may
+# keep accepting a deleted account.
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))
+
+_user_cache = get_cache("users", USER_CACHE_TTL)
+
+
+def _parse_user_id(user_id: str) -> Optional[UUID]:
+    try:
+        return UUID(str(user_id))
+    except ValueError:
+        return None
+
+
+def _cached_user(user_uuid: UUID) -> Optional[User]:
+    """Build a detached User from the principal cache, or None on a miss."""
+    if USER_CACHE_TTL <= 0:
+        return None
+    cached = _user_cache.get(str(user_uuid))
+    if cached is None:
+        return None
+    user = User(
+        id=UUID(cached["id"]),
+        email=cached["email"],
+        name=cached["name"],
+        profile_pic_url=cached["profile_pic_url"],
+        created_at=datetime.fromisoformat(cached["created_at"]) if cached["created_at"] else None
+    )
+    make_transient_to_detached(user)
+    return user
+
+
+def _remember_user(user: User) -> None:
+    if USER_CACHE_TTL > 0:
+        _user_cache.set(str(user.id), {
+            "id": str(user.id),
+            "email": user.email,
+            "name": user.name,
+            "profile_pic_url": user.profile_pic_url,
+            "created_at": user.created_at.isoformat() if user.created_at else None,
+        })
+
+
+def _load_user(db: Session, user_id: str) -> Optional[User]:
+    """
+    Get the user a token belongs to, from the principal cache when possible.
+
+    A cache hit is attached to the request's session without a query, so
+    handlers can still modify or delete it. The password hash is never
+    cached; it is loaded from the database if something reads it.
+    """
+    user_uuid = _parse_user_id(user_id)
+    if user_uuid is None:
+        return None
+
+    user = _cached_user(user_uuid)
+    if user is not None:
+        return db.merge(user, load=False)
+
+    user = db.query(User).filter(User.id == user_uuid).first()
+    if user is not None:
+        _remember_user(user)
+    return user
+
+
+async def _load_user_async(db: AsyncSession, user_id: str) -> Optional[User]:
+    """_load_user for async sessions; a cache hit is returned detached."""
+    user_uuid = _parse_user_id(user_id)
+    if user_uuid is None:
+        return None
+
+    user = _cached_user(user_uuid)
+    if user is not None:
+        return user
+
+    user = await db.scalar(select(User).where(User.id == user_uuid))
+    if user is not None:
+        _remember_user(user)
+    return user
+
+
+def invalidate_user(user_id) -> None:
+    """Drop a user from the principal cache after changing or deleting it."""
+    _user_cache.delete(str(user_id))
+
+
+def _token_subject(token: Optional[str]) -> str:
+    """Return the user id a bearer token was issued for, or raise 401."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -24,10 +118,34 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    
-    user = db.query(User).filter(User.id == user_id).first()
+    return user_id
+
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    user = _load_user(db, _token_subject(token))
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    """
+    get_current_user for async endpoints.
+
+    The user is read-only: it may be detached (served from cache), so
+    handlers must not modify it or rely on lazy loading.
+    """
+    user = await _load_user_async(db, _token_subject(token))
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
 
@@ -57,7 +175,22 @@ def get_current_user_optional(
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = _load_user(db, user_id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    return user
+
+
+async def get_current_user_optional_async(
+    token: Optional[str] = Query(None),
+    auth_token: Optional[str] = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    get_current_user_optional for async endpoints. For connections that
+    can't set headers, such as EventSource streams.
+    """
+    user = await _load_user_async(db, _token_subject(token or auth_token))
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     return user
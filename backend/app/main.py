@@ -1,25 +1,57 @@
 from dotenv import load_dotenv
 load_dotenv()
 
-from fastapi import FastAPI
+import os
+import logging
+import threading
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from .database import engine, Base
-from .routers import auth, trips, expenses, media, users, expense_trips, itinerary
+from fastapi.responses import PlainTextResponse
+from .database import engine, Base, get_pool_status
+from .services.metrics import MetricsMiddleware, render_metrics
+from .services.profiler import ProfilerMiddleware, get_profile, is_authorized
+from .routers import auth, trips, expenses, media, users, expense_trips, itinerary, files
 
 # Import all models so they're registered with Base
 from .models.user import User
 from .models.trip import Trip
 from .models.expense import Expense
 from .models.media import Media
+from .models.upload_session import UploadSession
+from .models.job import Job
+from .services import job_handlers  # registers background job handlers
+from .services import itinerary_sync  # versions itinerary changes for delta sync
+from .services.jobs import run_worker
 from .models.itinerary_trip import ItineraryTrip, ItineraryTripMember
 from .models.itinerary_day import ItineraryDay
 from .models.itinerary_activity import ItineraryActivity
 from .models.itinerary_packing import ItineraryPackingList
+from .models.itinerary_tombstone import ItineraryTombstone
 
-# Auto-create tables (Dev only)
-Base.metadata.create_all(bind=engine)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 
-app = FastAPI(title="Economiq, Galleriq & Tripify API")
+# The schema is managed by Alembic (alembic upgrade head). Set DB_AUTO_CREATE=true
+# to have create_all build missing tables at startup instead (local dev only;
+# it never alters existing tables or adds indexes to them).
+if os.getenv("DB_AUTO_CREATE", "false").lower() == "true":
+    Base.metadata.create_all(bind=engine)
+
+# Run a job worker thread inside the API process. Set to "false" when running
+# dedicated workers (python -m app.worker).
+JOB_WORKER_EMBEDDED = os.getenv("JOB_WORKER_EMBEDDED", "true").lower() == "true"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    stop_event = threading.Event()
+    if JOB_WORKER_EMBEDDED:
+        threading.Thread(target=run_worker, args=(stop_event,), daemon=True, name="job-worker").start()
+    yield
+    stop_event.set()
+
+
+app = FastAPI(title="Economiq, Galleriq & Tripify API", lifespan=lifespan)
 
 # CORS
 app.add_middleware(
@@ -29,6 +61,10 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Sets X-Request-ID and profiles requests that ask for it (PROFILE_TOKEN)
+app.add_middleware(ProfilerMiddleware)
+# Outermost, so the timing covers every other middleware
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(auth.router)
 app.include_router(trips.router)
@@ -37,6 +73,8 @@ app.include_router(expenses.router)
 app.include_router(media.router)
 app.include_router(users.router)
 app.include_router(itinerary.router)
+# Stored files, when STORAGE_BACKEND=local
+app.include_router(files.router)
 
 @app.get("/")
 def read_root():
@@ -45,3 +83,23 @@ def read_root():
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
+
+@app.get("/health/db-pool")
+def db_pool_status():
+    """Connection pool occupancy and checkout waits for this worker process."""
+    return get_pool_status()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Request, SQL, storage and pool metrics for this worker process (Prometheus text format)."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+@app.get("/debug/profiles/{request_id}", response_class=PlainTextResponse)
+def read_profile(request_id: str, x_profile_token: str = Header(None)):
+    """Collapsed stacks of a profiled request, for flamegraph.pl / speedscope."""
+    if not is_authorized(x_profile_token):
+        raise HTTPException(status_code=403, detail="Invalid profile token")
+    folded = get_profile(request_id)
+    if folded is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(folded)
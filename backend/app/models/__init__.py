@@ -2,4 +2,13 @@ from ..database import Base
 from .user import User
 from .trip import Trip, TripMember
 from .expense import Expense
+from .expense_trip import ExpenseTrip, ExpenseTripMember
 from .photo import Photo
+from .media import Media
+from .upload_session import UploadSession
+from .job import Job
+from .itinerary_trip import ItineraryTrip, ItineraryTripMember
+from .itinerary_day import ItineraryDay
+from .itinerary_activity import ItineraryActivity
+from .itinerary_packing import ItineraryPackingList
+from .itinerary_tombstone import ItineraryTombstone
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, Numeric, JSON
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Text, Numeric, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -20,3 +20,8 @@ class Expense(Base):
     type = Column(String, default="expense") # expense, income, settled
     
     trip = relationship("ExpenseTrip", back_populates="expenses")
+
+    __table_args__ = (
+        # Trip expense list: WHERE trip_id = ? ORDER BY date DESC
+        Index("ix_expenses_trip_date", "trip_id", "date"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, DateTime, ForeignKey
+from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -33,3 +33,8 @@ class ExpenseTripMember(Base):
     # Relationships
     trip = relationship("ExpenseTrip", back_populates="members")
     user = relationship("User")
+
+    __table_args__ = (
+        # Membership checks: WHERE trip_id = ? AND user_id = ?
+        Index("ix_expense_trip_members_trip_user", "trip_id", "user_id"),
+    )
@@ -1,6 +1,6 @@
 """Itinerary activity model for Tripify app."""
 
-from sqlalchemy import Column, String, DateTime, Text, Integer, ForeignKey, Time, Numeric, Boolean
+from sqlalchemy import Column, String, DateTime, Text, Integer, BigInteger, ForeignKey, Time, Numeric, Boolean, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -36,6 +36,12 @@ class ItineraryActivity(Base):
     created_by = Column(UUID(as_uuid=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    version = Column(BigInteger, nullable=False, default=0, server_default="0")  # Trip version of the last change
     
     # Relationships
     day = relationship("ItineraryDay", back_populates="activities")
+    
+    __table_args__ = (
+        # A day's activities: WHERE day_id = ? ORDER BY order_index
+        Index("ix_itinerary_activities_day_order", "day_id", "order_index"),
+    )
@@ -1,6 +1,6 @@
 """Itinerary day model for Tripify app."""
 
-from sqlalchemy import Column, String, Date, DateTime, Text, Integer, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, String, Date, DateTime, Text, Integer, BigInteger, ForeignKey, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -20,12 +20,13 @@ class ItineraryDay(Base):
     title = Column(String(255))
     notes = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    version = Column(BigInteger, nullable=False, default=0, server_default="0")  # Trip version of the last change
     
     # Relationships
     trip = relationship("ItineraryTrip", back_populates="days")
     activities = relationship("ItineraryActivity", back_populates="day", cascade="all, delete-orphan", order_by="ItineraryActivity.order_index")
     
-    # Unique constraint
+    # Unique constraint (its index also serves WHERE trip_id = ? ORDER BY day_number)
     __table_args__ = (
         UniqueConstraint('trip_id', 'day_number', name='uq_trip_day_number'),
     )
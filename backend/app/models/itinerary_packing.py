@@ -1,6 +1,6 @@
 """Itinerary packing list model for Tripify app."""
 
-from sqlalchemy import Column, String, DateTime, Text, Integer, ForeignKey, Boolean
+from sqlalchemy import Column, String, DateTime, Text, Integer, BigInteger, ForeignKey, Boolean
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -14,7 +14,7 @@ class ItineraryPackingList(Base):
     __tablename__ = "itinerary_packing_lists"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    trip_id = Column(UUID(as_uuid=True), ForeignKey("itinerary_trips.id", ondelete="CASCADE"), nullable=False)
+    trip_id = Column(UUID(as_uuid=True), ForeignKey("itinerary_trips.id", ondelete="CASCADE"), nullable=False, index=True)
     item = Column(String(255), nullable=False)
     category = Column(String(100))  # clothing, electronics, documents, toiletries, etc.
     is_packed = Column(Boolean, default=False)
@@ -22,6 +22,7 @@ class ItineraryPackingList(Base):
     notes = Column(Text)
     added_by = Column(UUID(as_uuid=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    version = Column(BigInteger, nullable=False, default=0, server_default="0")  # Trip version of the last change
     
     # Relationships
     trip = relationship("ItineraryTrip", back_populates="packing_items")
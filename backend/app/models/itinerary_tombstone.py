@@ -0,0 +1,25 @@
+"""Itinerary tombstone model for Tripify delta sync."""
+
+from sqlalchemy import Column, String, DateTime, BigInteger, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+import uuid
+from ..database import Base
+
+
+class ItineraryTombstone(Base):
+    """Record of a deleted day, activity or packing item (see services/itinerary_sync.py)."""
+    
+    __tablename__ = "itinerary_tombstones"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    trip_id = Column(UUID(as_uuid=True), ForeignKey("itinerary_trips.id", ondelete="CASCADE"), nullable=False)
+    entity_type = Column(String(20), nullable=False)  # day, activity, packing_item
+    entity_id = Column(UUID(as_uuid=True), nullable=False)
+    version = Column(BigInteger, nullable=False)  # Trip version that deleted it
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        # GET /itinerary/trips/{id}/changes: WHERE trip_id = ? AND version > ?
+        Index("ix_itinerary_tombstones_trip_version", "trip_id", "version"),
+    )
@@ -1,6 +1,6 @@
 """Itinerary trip model for Tripify app."""
 
-from sqlalchemy import Column, String, Date, DateTime, Text, ForeignKey
+from sqlalchemy import Column, String, Date, DateTime, Text, ForeignKey, BigInteger
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -31,6 +31,8 @@ class ItineraryTrip(Base):
     created_by = Column(UUID(as_uuid=True), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Incremented by every change to the trip or its rows (services/itinerary_sync.py)
+    version = Column(BigInteger, nullable=False, default=0, server_default="0")
     
     # Relationships
     members = relationship("ItineraryTripMember", back_populates="trip", cascade="all, delete-orphan")
@@ -44,7 +46,7 @@ class ItineraryTripMember(Base):
     __tablename__ = "itinerary_trip_members"
     
     trip_id = Column(UUID(as_uuid=True), ForeignKey("itinerary_trips.id", ondelete="CASCADE"), primary_key=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True, index=True)  # PK leads with trip_id
     role = Column(String(20), default='editor')  # owner, editor, viewer
     joined_at = Column(DateTime(timezone=True), server_default=func.now())
     
@@ -0,0 +1,36 @@
+"""Job model for the database-backed background job queue."""
+
+from sqlalchemy import Column, String, Integer, DateTime, Text, JSON, Index
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from datetime import datetime
+from ..database import Base
+
+
+class Job(Base):
+    """A unit of deferred work (storage cleanup, thumbnails, ...)."""
+
+    __tablename__ = "jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(String(100), nullable=False)  # Handler name, see services/jobs.py
+    payload = Column(JSON, nullable=False, default=dict)
+
+    # Lifecycle: queued -> running -> done | failed (running -> queued on retry)
+    status = Column(String(20), nullable=False, default="queued")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    last_error = Column(Text, nullable=True)
+
+    # Scheduling: eligible once run_at has passed; a claimed job is invisible
+    # to other workers until locked_until, after which it is retried
+    run_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_until = Column(DateTime, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
@@ -1,6 +1,6 @@
 """Media model for storing photo/video metadata."""
 
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, BigInteger, Boolean, DateTime, ForeignKey, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -21,11 +21,15 @@ class Media(Base):
     gcs_path = Column(String, nullable=False)  # Relative path in bucket
     public_url = Column(String, nullable=False)  # Full HTTPS URL
     thumbnail_url = Column(String, nullable=True)  # Thumbnail URL (if generated)
+    medium_url = Column(String, nullable=True)  # Preview-size URL (if generated)
     
     # File metadata
     filename = Column(String, nullable=False)  # Original filename
     mime_type = Column(String, nullable=False)  # e.g., image/jpeg, video/mp4
-    size_bytes = Column(Integer, nullable=False)
+    size_bytes = Column(BigInteger, nullable=False)
+    
+    # Upload state: "pending" until a direct-to-bucket upload is completed
+    status = Column(String, nullable=False, default="ready", server_default="ready")
     
     # User preferences
     is_favorite = Column(Boolean, default=False)
@@ -37,3 +41,14 @@ class Media(Base):
     # Relationships
     user = relationship("User", back_populates="media")
     trip = relationship("Trip", back_populates="media")
+    
+    __table_args__ = (
+        # Keyset pagination of a trip's media: WHERE trip_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_media_trip_created_id", "trip_id", "created_at", "id"),
+        # Favorites listing; partial, since only a small share of media is favorited
+        Index(
+            "ix_media_favorite_trip_created_id", "trip_id", "created_at", "id",
+            postgresql_where=text("is_favorite = true"),
+            sqlite_where=text("is_favorite = 1")
+        ),
+    )
@@ -25,7 +25,7 @@ class TripMember(Base):
     __tablename__ = "trip_members"
     
     trip_id = Column(UUID(as_uuid=True), ForeignKey("trips.id"), primary_key=True)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True, index=True)  # PK leads with trip_id
     role = Column(String, default="member")
     joined_at = Column(DateTime(timezone=True), server_default=func.now())
 
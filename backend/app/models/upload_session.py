@@ -0,0 +1,35 @@
+"""Upload session model for resumable, chunked media uploads."""
+
+from sqlalchemy import Column, String, BigInteger, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from datetime import datetime
+from ..database import Base
+
+
+class UploadSession(Base):
+    """Tracks a GCS resumable upload so interrupted clients can continue."""
+
+    __tablename__ = "upload_sessions"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    trip_id = Column(UUID(as_uuid=True), ForeignKey("trips.id", ondelete="CASCADE"), nullable=True)
+
+    # Target object and the GCS resumable session URI backing it
+    gcs_path = Column(String, nullable=False)
+    session_url = Column(String, nullable=False)
+
+    # File metadata declared by the client
+    filename = Column(String, nullable=False)
+    mime_type = Column(String, nullable=False)
+    size_bytes = Column(BigInteger, nullable=False)
+
+    # Progress: bytes GCS has durably committed
+    committed_bytes = Column(BigInteger, nullable=False, default=0)
+    status = Column(String, nullable=False, default="active")  # active, uploaded, complete
+    media_id = Column(UUID(as_uuid=True), ForeignKey("media.id", ondelete="SET NULL"), nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
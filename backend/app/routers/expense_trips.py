@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session, joinedload
 from typing import List
+from uuid import UUID
 from ..database import get_db
 from ..models.expense_trip import ExpenseTrip, ExpenseTripMember
 from ..models.user import User
 from ..schemas.expense_trip import ExpenseTripCreate, ExpenseTripResponse
 from ..deps import get_current_user
+from ..services.authz import EXPENSE, invalidate_membership
 
 router = APIRouter(prefix="/expense-trips", tags=["expense-trips"])
 
@@ -66,6 +68,7 @@ def create_expense_trip(trip: ExpenseTripCreate, db: Session = Depends(get_db),
     )
     db.add(member)
     db.commit()
+    invalidate_membership(EXPENSE, new_trip.id, [current_user.id])
     
     # Reload trip with members
     trip_with_members = db.query(ExpenseTrip).options(
@@ -93,7 +96,7 @@ def create_expense_trip(trip: ExpenseTripCreate, db: Session = Depends(get_db),
     }
 
 @router.get("/{trip_id}")
-def get_expense_trip(trip_id: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_expense_trip(trip_id: UUID, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     """Get expense trip details"""
     trip = db.query(ExpenseTrip).options(
         joinedload(ExpenseTrip.members).joinedload(ExpenseTripMember.user)
@@ -126,7 +129,7 @@ def get_expense_trip(trip_id: str, db: Session = Depends(get_db), current_user:
     }
 
 @router.delete("/{trip_id}")
-def delete_expense_trip(trip_id: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def delete_expense_trip(trip_id: UUID, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     """Delete an expense trip (admin only)"""
     trip = db.query(ExpenseTrip).filter(ExpenseTrip.id == trip_id).first()
     
@@ -137,7 +140,9 @@ def delete_expense_trip(trip_id: str, db: Session = Depends(get_db), current_use
     if trip.created_by != current_user.id:
         raise HTTPException(status_code=403, detail="Only the trip creator can delete it")
     
+    member_ids = [m.user_id for m in trip.members]
     db.delete(trip)
     db.commit()
+    invalidate_membership(EXPENSE, trip.id, member_ids)
     
     return {"message": "Expense trip deleted successfully"}
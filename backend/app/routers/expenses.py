@@ -1,26 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 from uuid import UUID
-from ..database import get_db
+from ..database import get_db, get_async_db
 from ..models.expense import Expense
-from ..models.expense_trip import ExpenseTripMember
 from ..models.user import User
 from ..schemas.expense import ExpenseCreate, ExpenseResponse, ExpenseUpdate
 from ..deps import get_current_user
+from ..services.authz import EXPENSE, AsyncTripAccess, require_member
 
 router = APIRouter(prefix="/expenses", tags=["Expenses"])
 
+# Membership check for routes with the trip id in the path
+trip_member = AsyncTripAccess(EXPENSE, detail="You are not a member of this trip")
+
 @router.post("/", response_model=ExpenseResponse)
 def create_expense(expense: ExpenseCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     # 1. Verify User is Member of Trip
-    member = db.query(ExpenseTripMember).filter(
-        ExpenseTripMember.trip_id == expense.trip_id,
-        ExpenseTripMember.user_id == current_user.id
-    ).first()
-    
-    if not member:
-        raise HTTPException(status_code=403, detail="You are not a member of this trip")
+    require_member(db, EXPENSE, expense.trip_id, current_user.id, detail="You are not a member of this trip")
 
     # 2. Create Expense
     new_expense = Expense(
@@ -58,20 +57,11 @@ def update_expense(expense_id: UUID, expense_update: ExpenseUpdate, db: Session
     db.refresh(expense)
     return expense
 
-@router.get("/trip/{trip_id}", response_model=List[ExpenseResponse])
-def get_trip_expenses(trip_id: UUID, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    # 1. Verify User is Member
-    member = db.query(ExpenseTripMember).filter(
-        ExpenseTripMember.trip_id == trip_id,
-        ExpenseTripMember.user_id == current_user.id
-    ).first()
-    
-    if not member:
-        raise HTTPException(status_code=403, detail="You are not a member of this trip")
-
-    # 2. Fetch Expenses
-    expenses = db.query(Expense).filter(Expense.trip_id == trip_id).order_by(Expense.date.desc()).all()
-    return expenses
+@router.get("/trip/{trip_id}", response_model=List[ExpenseResponse], dependencies=[Depends(trip_member)])
+async def get_trip_expenses(trip_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    # Membership is checked by the trip_member dependency
+    expenses = await db.scalars(select(Expense).where(Expense.trip_id == trip_id).order_by(Expense.date.desc()))
+    return expenses.all()
 
 @router.delete("/{expense_id}")
 def delete_expense(expense_id: UUID, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
@@ -0,0 +1,68 @@
+import mimetypes
+import tempfile
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse
+
+from ..services.local_storage import COPY_BUFFER_SIZE, verify
+from ..services.storage import get_storage
+from ..utils.concurrency import run_storage_io
+
+router = APIRouter(prefix="/files", tags=["Files"])
+
+# Public objects never change under the same path (every upload gets a new uuid)
+PUBLIC_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def _local_storage():
+    storage = get_storage()
+    if not storage.serves_files:
+        # Only the local backend keeps files here (STORAGE_BACKEND=local)
+        raise HTTPException(status_code=404, detail="Not found")
+    return storage
+
+
+@router.get("/{blob_path:path}")
+def get_file(
+    blob_path: str,
+    filename: Optional[str] = None,
+    expires: Optional[int] = None,
+    signature: Optional[str] = None
+):
+    """
+    Serve a stored file.
+
+    Sent as a file response, which uses the server's zero-copy sendfile path
+    when it has one, and supports Range and conditional requests. With a
+    signature (a link from generate_signed_url) it downloads as `filename`.
+    """
+    storage = _local_storage()
+    path = storage.local_path(blob_path)
+    if path is None:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    media_type = mimetypes.guess_type(blob_path)[0] or "application/octet-stream"
+    if signature is None:
+        return FileResponse(path, media_type=media_type, headers={"Cache-Control": PUBLIC_CACHE_CONTROL})
+
+    if expires is None or filename is None or not verify("GET", blob_path, expires, signature, filename):
+        raise HTTPException(status_code=403, detail="Invalid or expired link")
+    return FileResponse(path, media_type=media_type, filename=filename)
+
+
+@router.put("/{blob_path:path}")
+async def put_file(blob_path: str, request: Request, expires: int, signature: str):
+    """Upload a file to a signed link from generate_upload_url."""
+    storage = _local_storage()
+    content_type = request.headers.get("content-type", "")
+    if not verify("PUT", blob_path, expires, signature, content_type):
+        raise HTTPException(status_code=403, detail="Invalid or expired link")
+
+    # Spool the body (to disk past the buffer size), then move it into place
+    with tempfile.SpooledTemporaryFile(max_size=COPY_BUFFER_SIZE) as spool:
+        async for chunk in request.stream():
+            await run_storage_io(spool.write, chunk)
+        spool.seek(0)
+        await run_storage_io(storage.save, blob_path, spool)
+    return {"path": blob_path}
@@ -1,44 +1,95 @@
 """Itinerary API router for Tripify app."""
 
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile
-from sqlalchemy.orm import Session
+import json
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status, File, UploadFile, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import case, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from typing import List
 from uuid import UUID
 
-from ..database import get_db
+from ..database import get_db, get_async_db
 from ..models.itinerary_trip import ItineraryTrip, ItineraryTripMember
 from ..models.itinerary_day import ItineraryDay
 from ..models.itinerary_activity import ItineraryActivity
 from ..models.itinerary_packing import ItineraryPackingList
+from ..models.itinerary_tombstone import ItineraryTombstone
 from ..models.user import User
 from ..schemas.itinerary import (
     ItineraryTripCreate, ItineraryTripUpdate, ItineraryTripResponse,
     ItineraryDayCreate, ItineraryDayUpdate, ItineraryDayResponse,
     ItineraryActivityCreate, ItineraryActivityUpdate, ItineraryActivityResponse,
     ItineraryPackingItemCreate, ItineraryPackingItemUpdate, ItineraryPackingItemResponse,
-    JoinTripRequest
+    ItineraryActivityReorder, ItineraryBatchRequest, ItineraryBatchResponse, ItineraryTripFullResponse, ItineraryChangesResponse, JoinTripRequest
 )
-from ..deps import get_current_user
+from ..deps import get_current_user, get_current_user_async, get_current_user_optional_async
+from ..services.authz import (
+    ITINERARY, ITINERARY_EDITOR_ROLES, AsyncTripAccess, TripAccess,
+    check_role, get_role_async, load_with_role, invalidate_membership
+)
+from ..services import itinerary_events
+from ..services.itinerary_batch import apply_batch
+from ..services.itinerary_order import plan_order
+from ..services.itinerary_sync import bump_version
+from ..services.storage import get_storage
+from ..services.jobs import enqueue
+from ..utils.concurrency import run_storage_io
 
 router = APIRouter(prefix="/itinerary", tags=["Itinerary"])
+logger = logging.getLogger(__name__)
 
 
-# Helper function to check trip access
-def check_trip_access(trip_id: UUID, user_id: UUID, db: Session, required_role: str = None):
-    """Check if user has access to trip."""
-    member = db.query(ItineraryTripMember).filter(
-        ItineraryTripMember.trip_id == trip_id,
-        ItineraryTripMember.user_id == user_id
-    ).first()
-    
-    if not member:
-        raise HTTPException(status_code=403, detail="Not a member of this trip")
-    
-    if required_role and member.role not in ['owner', required_role]:
-        if required_role == 'editor' and member.role == 'viewer':
-            raise HTTPException(status_code=403, detail="Insufficient permissions")
-    
-    return member
+# Access checks for routes with the trip id in the path
+trip_member = TripAccess(ITINERARY)
+trip_editor = TripAccess(ITINERARY, roles=ITINERARY_EDITOR_ROLES)
+trip_owner = TripAccess(ITINERARY, roles=("owner",), forbidden_detail="Only owner can delete trip")
+trip_member_async = AsyncTripAccess(ITINERARY)
+
+
+# Helpers for routes addressed by a day, activity or packing item: each loads
+# the row and the caller's membership of its trip in one query
+def get_day_with_access(day_id: UUID, user_id: UUID, db: Session, roles=None) -> ItineraryDay:
+    """Load a day, checking the user's role on its trip."""
+    day, _, role = load_with_role(
+        db, ITINERARY,
+        db.query(ItineraryDay).filter(ItineraryDay.id == day_id),
+        ItineraryDay.trip_id, user_id
+    )
+    if not day:
+        raise HTTPException(status_code=404, detail="Day not found")
+    check_role(role, roles)
+    return day
+
+
+def get_activity_with_access(activity_id: UUID, user_id: UUID, db: Session, roles=None):
+    """Load an activity and its trip id, checking the user's role on the trip."""
+    activity, trip_id, role = load_with_role(
+        db, ITINERARY,
+        db.query(ItineraryActivity).join(ItineraryDay, ItineraryActivity.day_id == ItineraryDay.id).filter(
+            ItineraryActivity.id == activity_id
+        ),
+        ItineraryDay.trip_id, user_id
+    )
+    if not activity:
+        raise HTTPException(status_code=404, detail="Activity not found")
+    check_role(role, roles)
+    return activity, trip_id
+
+
+def get_packing_item_with_access(item_id: UUID, user_id: UUID, db: Session, roles=None) -> ItineraryPackingList:
+    """Load a packing item, checking the user's role on its trip."""
+    item, _, role = load_with_role(
+        db, ITINERARY,
+        db.query(ItineraryPackingList).filter(ItineraryPackingList.id == item_id),
+        ItineraryPackingList.trip_id, user_id
+    )
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    check_role(role, roles)
+    return item
 
 
 # ==================== TRIP ENDPOINTS ====================
@@ -77,36 +128,36 @@ def create_trip(
     )
     db.add(owner_member)
     db.commit()
+    invalidate_membership(ITINERARY, new_trip.id, [current_user.id])
     db.refresh(new_trip)
     
     return new_trip
 
 
 @router.get("/trips", response_model=List[ItineraryTripResponse])
-def get_user_trips(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_user_trips(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """Get all trips user is a member of."""
-    memberships = db.query(ItineraryTripMember).filter(
-        ItineraryTripMember.user_id == current_user.id
-    ).all()
-    
-    trip_ids = [m.trip_id for m in memberships]
-    trips = db.query(ItineraryTrip).filter(ItineraryTrip.id.in_(trip_ids)).all()
+    # Members are part of the response; async sessions can't lazy-load them
+    trips = await db.scalars(
+        select(ItineraryTrip).join(
+            ItineraryTripMember, ItineraryTripMember.trip_id == ItineraryTrip.id
+        ).where(
+            ItineraryTripMember.user_id == current_user.id
+        ).options(selectinload(ItineraryTrip.members))
+    )
     
-    return trips
+    return trips.all()
 
 
-@router.get("/trips/{trip_id}", response_model=ItineraryTripResponse)
+@router.get("/trips/{trip_id}", response_model=ItineraryTripResponse, dependencies=[Depends(trip_member)])
 def get_trip(
     trip_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_db)
 ):
     """Get trip details."""
-    check_trip_access(trip_id, current_user.id, db)
-    
     trip = db.query(ItineraryTrip).filter(ItineraryTrip.id == trip_id).first()
     if not trip:
         raise HTTPException(status_code=404, detail="Trip not found")
@@ -114,16 +165,160 @@ def get_trip(
     return trip
 
 
-@router.put("/trips/{trip_id}", response_model=ItineraryTripResponse)
+@router.get("/trips/{trip_id}/full", response_model=ItineraryTripFullResponse, dependencies=[Depends(trip_member_async)])
+async def get_trip_full(
+    trip_id: UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Trip with its members, days, each day's activities and the packing list.
+    
+    Everything an itinerary page needs in one request and a fixed number of
+    queries (one per relationship level). The ETag is the trip's version,
+    which every change to any of these rows increments, so a client
+    revalidating with If-None-Match gets a 304 after a single lookup.
+    Afterwards, GET /trips/{id}/changes?since=<version> fetches only what
+    changed.
+    """
+    version = await db.scalar(select(ItineraryTrip.version).where(ItineraryTrip.id == trip_id))
+    if version is None:
+        raise HTTPException(status_code=404, detail="Trip not found")
+    
+    # Cacheable by the browser, but revalidated on every use
+    headers = {"ETag": f'"v{version}"', "Cache-Control": "private, no-cache"}
+    if headers["ETag"] in request.headers.get("if-none-match", ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    trip = await db.scalar(
+        select(ItineraryTrip).where(ItineraryTrip.id == trip_id).options(
+            selectinload(ItineraryTrip.members),
+            selectinload(ItineraryTrip.days).selectinload(ItineraryDay.activities),
+            selectinload(ItineraryTrip.packing_items)
+        )
+    )
+    if not trip:
+        raise HTTPException(status_code=404, detail="Trip not found")
+    
+    # A write between the two queries moves the version on; label the body with what it contains
+    headers["ETag"] = f'"v{trip.version}"'
+    body = ItineraryTripFullResponse.model_validate(trip).model_dump_json()
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@router.get("/trips/{trip_id}/changes", response_model=ItineraryChangesResponse, dependencies=[Depends(trip_member_async)])
+async def get_trip_changes(
+    trip_id: UUID,
+    since: int = Query(..., ge=0, description="version of the client's copy"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    What changed in a trip's itinerary after version `since`.
+    
+    Returns the current version, and, if it is newer, the trip with its
+    members plus the days, activities and packing items created or updated
+    since, and tombstones for those deleted. Apply them and keep the
+    returned version for the next call (on the next /events message).
+    """
+    trip = await db.scalar(
+        select(ItineraryTrip).where(ItineraryTrip.id == trip_id).options(selectinload(ItineraryTrip.members))
+    )
+    if not trip:
+        raise HTTPException(status_code=404, detail="Trip not found")
+    
+    if since > trip.version:
+        # Not a version this trip has had (e.g. the trip was recreated); start over
+        raise HTTPException(status_code=409, detail="Unknown version, reload the itinerary")
+    if since == trip.version:
+        return ItineraryChangesResponse(version=trip.version)
+    
+    days = await db.scalars(
+        select(ItineraryDay).where(
+            ItineraryDay.trip_id == trip_id, ItineraryDay.version > since
+        ).order_by(ItineraryDay.day_number)
+    )
+    activities = await db.scalars(
+        select(ItineraryActivity).join(ItineraryDay, ItineraryActivity.day_id == ItineraryDay.id).where(
+            ItineraryDay.trip_id == trip_id, ItineraryActivity.version > since
+        ).order_by(ItineraryActivity.day_id, ItineraryActivity.order_index)
+    )
+    packing_items = await db.scalars(
+        select(ItineraryPackingList).where(
+            ItineraryPackingList.trip_id == trip_id, ItineraryPackingList.version > since
+        )
+    )
+    deleted = await db.scalars(
+        select(ItineraryTombstone).where(
+            ItineraryTombstone.trip_id == trip_id, ItineraryTombstone.version > since
+        ).order_by(ItineraryTombstone.version)
+    )
+    
+    return ItineraryChangesResponse(
+        version=trip.version,
+        trip=trip,
+        days=days.all(),
+        activities=activities.all(),
+        packing_items=packing_items.all(),
+        deleted=deleted.all()
+    )
+
+
+@router.get("/trips/{trip_id}/events")
+async def stream_trip_events(
+    trip_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_optional_async)
+):
+    """
+    Server-sent events announcing changes to a trip's itinerary.
+    
+    Sends a `version` event with the trip's current version on connect and
+    again after every committed change (bursts are merged into the latest
+    version), and a `deleted` event before closing if the trip is deleted.
+    Clients fetch the changes from /changes. Authenticates with ?token=,
+    since EventSource can't send headers.
+    """
+    check_role(await get_role_async(db, ITINERARY, trip_id, current_user.id))
+    # Subscribe before reading the version, so no change falls in between
+    subscription = itinerary_events.subscribe(trip_id)
+    try:
+        version = await db.scalar(select(ItineraryTrip.version).where(ItineraryTrip.id == trip_id))
+    finally:
+        # Don't hold a pooled connection for the life of the stream
+        await db.close()
+    if version is None:
+        subscription.close()
+        raise HTTPException(status_code=404, detail="Trip not found")
+    
+    async def events():
+        try:
+            yield f"event: version\ndata: {json.dumps({'version': version})}\n\n"
+            while True:
+                message = await subscription.get(itinerary_events.EVENTS_KEEPALIVE_SECONDS)
+                if message is None:
+                    yield ": keepalive\n\n"
+                elif message.get("deleted"):
+                    yield "event: deleted\ndata: {}\n\n"
+                    return
+                else:
+                    yield f"event: version\ndata: {json.dumps(message)}\n\n"
+        finally:
+            subscription.close()
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        # Stop nginx from buffering the stream
+        "X-Accel-Buffering": "no",
+    })
+
+
+@router.put("/trips/{trip_id}", response_model=ItineraryTripResponse, dependencies=[Depends(trip_editor)])
 def update_trip(
     trip_id: UUID,
     trip_data: ItineraryTripUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_db)
 ):
     """Update trip details."""
-    check_trip_access(trip_id, current_user.id, db, required_role='editor')
-    
     trip = db.query(ItineraryTrip).filter(ItineraryTrip.id == trip_id).first()
     if not trip:
         raise HTTPException(status_code=404, detail="Trip not found")
@@ -136,24 +331,20 @@ def update_trip(
     return trip
 
 
-@router.delete("/trips/{trip_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/trips/{trip_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(trip_owner)])
 def delete_trip(
     trip_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_db)
 ):
     """Delete trip (owner only)."""
-    member = check_trip_access(trip_id, current_user.id, db)
-    
-    if member.role != 'owner':
-        raise HTTPException(status_code=403, detail="Only owner can delete trip")
-    
     trip = db.query(ItineraryTrip).filter(ItineraryTrip.id == trip_id).first()
     if not trip:
         raise HTTPException(status_code=404, detail="Trip not found")
-    
+
+    member_ids = [m.user_id for m in trip.members]
     db.delete(trip)
     db.commit()
+    invalidate_membership(ITINERARY, trip_id, member_ids)
 
 
 @router.post("/trips/join", response_model=ItineraryTripResponse)
@@ -187,6 +378,7 @@ def join_trip(
     )
     db.add(new_member)
     db.commit()
+    invalidate_membership(ITINERARY, trip.id, [current_user.id])
     db.refresh(trip)
     
     return trip
@@ -194,16 +386,13 @@ def join_trip(
 
 # ==================== DAY ENDPOINTS ====================
 
-@router.post("/trips/{trip_id}/days", response_model=ItineraryDayResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/trips/{trip_id}/days", response_model=ItineraryDayResponse, status_code=status.HTTP_201_CREATED, dependencies=[Depends(trip_editor)])
 def create_day(
     trip_id: UUID,
     day_data: ItineraryDayCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_db)
 ):
     """Add a day to trip itinerary."""
-    check_trip_access(trip_id, current_user.id, db, required_role='editor')
-    
     new_day = ItineraryDay(
         trip_id=trip_id,
         **day_data.dict()
@@ -215,20 +404,19 @@ def create_day(
     return new_day
 
 
-@router.get("/trips/{trip_id}/days", response_model=List[ItineraryDayResponse])
-def get_trip_days(
+@router.get("/trips/{trip_id}/days", response_model=List[ItineraryDayResponse], dependencies=[Depends(trip_member_async)])
+async def get_trip_days(
     trip_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all days for a trip."""
-    check_trip_access(trip_id, current_user.id, db)
-    
-    days = db.query(ItineraryDay).filter(
-        ItineraryDay.trip_id == trip_id
-    ).order_by(ItineraryDay.day_number).all()
+    days = await db.scalars(
+        select(ItineraryDay).where(
+            ItineraryDay.trip_id == trip_id
+        ).order_by(ItineraryDay.day_number)
+    )
     
-    return days
+    return days.all()
 
 
 @router.put("/days/{day_id}", response_model=ItineraryDayResponse)
@@ -239,11 +427,7 @@ def update_day(
     current_user: User = Depends(get_current_user)
 ):
     """Update day details."""
-    day = db.query(ItineraryDay).filter(ItineraryDay.id == day_id).first()
-    if not day:
-        raise HTTPException(status_code=404, detail="Day not found")
-    
-    check_trip_access(day.trip_id, current_user.id, db, required_role='editor')
+    day = get_day_with_access(day_id, current_user.id, db, roles=ITINERARY_EDITOR_ROLES)
     
     for key, value in day_data.dict(exclude_unset=True).items():
         setattr(day, key, value)
@@ -260,16 +444,33 @@ def delete_day(
     current_user: User = Depends(get_current_user)
 ):
     """Delete a day."""
-    day = db.query(ItineraryDay).filter(ItineraryDay.id == day_id).first()
-    if not day:
-        raise HTTPException(status_code=404, detail="Day not found")
-    
-    check_trip_access(day.trip_id, current_user.id, db, required_role='editor')
+    day = get_day_with_access(day_id, current_user.id, db, roles=ITINERARY_EDITOR_ROLES)
     
     db.delete(day)
     db.commit()
 
 
+# ==================== BATCH ENDPOINT ====================
+
+@router.post("/trips/{trip_id}/batch", response_model=ItineraryBatchResponse, dependencies=[Depends(trip_editor)])
+def apply_trip_batch(
+    trip_id: UUID,
+    batch: ItineraryBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Create, update and delete days, activities and packing items in one
+    transaction (see services/itinerary_batch.py).
+    
+    Rows created in the batch are named by the client's `ref` anywhere an
+    id is expected. Returns the trip's new version and, per operation, the
+    id of its row; fetch the rows themselves from /changes.
+    """
+    version, results = apply_batch(db, trip_id, current_user.id, batch.operations)
+    return ItineraryBatchResponse(version=version, results=results)
+
+
 # ==================== ACTIVITY ENDPOINTS ====================
 
 @router.post("/days/{day_id}/activities", response_model=ItineraryActivityResponse, status_code=status.HTTP_201_CREATED)
@@ -280,11 +481,7 @@ def create_activity(
     current_user: User = Depends(get_current_user)
 ):
     """Add activity to a day."""
-    day = db.query(ItineraryDay).filter(ItineraryDay.id == day_id).first()
-    if not day:
-        raise HTTPException(status_code=404, detail="Day not found")
-    
-    check_trip_access(day.trip_id, current_user.id, db, required_role='editor')
+    get_day_with_access(day_id, current_user.id, db, roles=ITINERARY_EDITOR_ROLES)
     
     new_activity = ItineraryActivity(
         day_id=day_id,
@@ -305,11 +502,7 @@ def get_day_activities(
     current_user: User = Depends(get_current_user)
 ):
     """Get all activities for a day."""
-    day = db.query(ItineraryDay).filter(ItineraryDay.id == day_id).first()
-    if not day:
-        raise HTTPException(status_code=404, detail="Day not found")
-    
-    check_trip_access(day.trip_id, current_user.id, db)
+    get_day_with_access(day_id, current_user.id, db)
     
     activities = db.query(ItineraryActivity).filter(
         ItineraryActivity.day_id == day_id
@@ -326,12 +519,7 @@ def update_activity(
     current_user: User = Depends(get_current_user)
 ):
     """Update activity details."""
-    activity = db.query(ItineraryActivity).filter(ItineraryActivity.id == activity_id).first()
-    if not activity:
-        raise HTTPException(status_code=404, detail="Activity not found")
-    
-    day = db.query(ItineraryDay).filter(ItineraryDay.id == activity.day_id).first()
-    check_trip_access(day.trip_id, current_user.id, db, required_role='editor')
+    activity, _ = get_activity_with_access(activity_id, current_user.id, db, roles=ITINERARY_EDITOR_ROLES)
     
     for key, value in activity_data.dict(exclude_unset=True).items():
         setattr(activity, key, value)
@@ -348,29 +536,99 @@ def delete_activity(
     current_user: User = Depends(get_current_user)
 ):
     """Delete an activity."""
-    activity = db.query(ItineraryActivity).filter(ItineraryActivity.id == activity_id).first()
-    if not activity:
-        raise HTTPException(status_code=404, detail="Activity not found")
+    activity, _ = get_activity_with_access(activity_id, current_user.id, db, roles=ITINERARY_EDITOR_ROLES)
     
-    day = db.query(ItineraryDay).filter(ItineraryDay.id == activity.day_id).first()
-    check_trip_access(day.trip_id, current_user.id, db, required_role='editor')
-    
-    # Delete photo from GCS if exists
+    # Queue deletion of the activity photo from GCS, if any
     if activity.image_url:
-        try:
-            from ..services.gcs import GCSService
-            gcs_service = GCSService()
-            # Extract path from URL
-            if 'storage.googleapis.com' in activity.image_url:
-                path = activity.image_url.split('/')[-1]
-                gcs_service.delete_file(path)
-        except Exception as e:
-            print(f"Failed to delete activity photo: {e}")
+        path = get_storage().get_blob_path(activity.image_url)
+        if path:
+            enqueue(db, "delete_storage_objects", {"paths": [path]})
     
     db.delete(activity)
     db.commit()
 
 
+@router.put("/trips/{trip_id}/activities/order", response_model=List[ItineraryActivityResponse], dependencies=[Depends(trip_editor)])
+def reorder_activities(
+    trip_id: UUID,
+    order: ItineraryActivityReorder,
+    db: Session = Depends(get_db)
+):
+    """
+    Set the order of activities on one or more days of a trip.
+    
+    Each listed day gets exactly the listed activities, in that order; an
+    activity listed under another day than its own moves there. A listed
+    day must list all its current activities, except those moving to
+    another listed day. Everything is applied in one transaction with one
+    UPDATE of the rows whose day or position changes. With `gaps`, current
+    indexes are kept where the new order allows, so moving one activity
+    usually rewrites only that row.
+    
+    Returns the activities of the listed days, ordered by day and position.
+    """
+    day_ids = [day.day_id for day in order.days]
+    activity_ids = [activity_id for day in order.days for activity_id in day.activity_ids]
+    if len(set(day_ids)) != len(day_ids):
+        raise HTTPException(status_code=400, detail="Day listed more than once")
+    if len(set(activity_ids)) != len(activity_ids):
+        raise HTTPException(status_code=400, detail="Activity listed more than once")
+    
+    # Taken first: holds off other writers to the trip until commit, so the
+    # order is planned from rows nobody else is changing
+    version = bump_version(db, trip_id)
+    
+    found_days = set(db.scalars(
+        select(ItineraryDay.id).where(ItineraryDay.trip_id == trip_id, ItineraryDay.id.in_(day_ids))
+    ))
+    if len(found_days) != len(day_ids):
+        raise HTTPException(status_code=404, detail="Day not found")
+    
+    rows = db.execute(
+        select(ItineraryActivity.id, ItineraryActivity.day_id, ItineraryActivity.order_index).join(
+            ItineraryDay, ItineraryActivity.day_id == ItineraryDay.id
+        ).where(
+            ItineraryDay.trip_id == trip_id,
+            or_(ItineraryActivity.id.in_(activity_ids), ItineraryActivity.day_id.in_(day_ids))
+        )
+    ).all()
+    current = {row.id: row for row in rows}
+    if any(activity_id not in current for activity_id in activity_ids):
+        raise HTTPException(status_code=404, detail="Activity not found")
+    listed = set(activity_ids)
+    if any(row.id not in listed for row in rows):
+        raise HTTPException(status_code=400, detail="Every activity of a listed day must be listed")
+    
+    new_days, new_indexes = {}, {}
+    for day in order.days:
+        staying = {
+            activity_id: current[activity_id].order_index
+            for activity_id in day.activity_ids if current[activity_id].day_id == day.day_id
+        }
+        for activity_id, index in zip(day.activity_ids, plan_order(day.activity_ids, staying, order.gaps)):
+            if current[activity_id].day_id != day.day_id or current[activity_id].order_index != index:
+                new_days[activity_id] = day.day_id
+                new_indexes[activity_id] = index
+    
+    if new_indexes:
+        # The ELSE branches are never taken; they give each CASE its column's type
+        db.execute(
+            update(ItineraryActivity).where(ItineraryActivity.id.in_(new_indexes)).values(
+                day_id=case(new_days, value=ItineraryActivity.id, else_=ItineraryActivity.day_id),
+                order_index=case(new_indexes, value=ItineraryActivity.id, else_=ItineraryActivity.order_index),
+                version=version
+            ).execution_options(synchronize_session=False)
+        )
+        db.commit()
+    else:
+        # Already in this order: leave the version alone
+        db.rollback()
+    
+    return db.query(ItineraryActivity).join(ItineraryDay, ItineraryActivity.day_id == ItineraryDay.id).filter(
+        ItineraryActivity.day_id.in_(day_ids)
+    ).order_by(ItineraryDay.day_number, ItineraryActivity.order_index).all()
+
+
 @router.post("/activities/{activity_id}/upload-photo")
 async def upload_activity_photo(
     activity_id: UUID,
@@ -379,44 +637,36 @@ async def upload_activity_photo(
     current_user: User = Depends(get_current_user)
 ):
     """Upload photo for an activity."""
-    from ..services.gcs import GCSService
-    import uuid as uuid_lib
-    
     # Get activity and check access
-    activity = db.query(ItineraryActivity).filter(ItineraryActivity.id == activity_id).first()
-    if not activity:
-        raise HTTPException(status_code=404, detail="Activity not found")
-    
-    day = db.query(ItineraryDay).filter(ItineraryDay.id == activity.day_id).first()
-    check_trip_access(day.trip_id, current_user.id, db, required_role='editor')
+    activity, trip_id = get_activity_with_access(activity_id, current_user.id, db, roles=ITINERARY_EDITOR_ROLES)
     
     # Validate file type
     allowed_types = ['image/jpeg', 'image/jpg', 'image/png', 'image/webp']
     if file.content_type not in allowed_types:
         raise HTTPException(status_code=400, detail="Only JPEG, PNG, and WebP images are allowed")
     
+    storage = get_storage()
+    
     # Delete old photo if exists
     if activity.image_url:
         try:
-            gcs_service = GCSService()
-            if 'storage.googleapis.com' in activity.image_url:
-                path = activity.image_url.split('/')[-1]
-                gcs_service.delete_file(path)
+            old_path = storage.get_blob_path(activity.image_url)
+            if old_path:
+                await run_storage_io(storage.delete_file, old_path)
         except Exception as e:
-            print(f"Failed to delete old photo: {e}")
+            logger.warning("Failed to delete old photo: %s", e)
     
-    # Upload new photo
+    # Upload new photo (storage calls run off the event loop)
     try:
-        gcs_service = GCSService()
-        file_extension = file.filename.split('.')[-1]
-        unique_filename = f"activity_{activity_id}_{uuid_lib.uuid4()}.{file_extension}"
-        gcs_path = f"users/user_{current_user.id}/activities/{unique_filename}"
-        
-        file_content = await file.read()
-        public_url = gcs_service.upload_file(
-            file_content=file_content,
-            destination_path=gcs_path,
-            content_type=file.content_type
+        await file.seek(0)
+        _, public_url, _, _ = await run_storage_io(
+            storage.upload_stream,
+            file_obj=file.file,
+            user_id=str(current_user.id),
+            trip_id=str(trip_id),
+            filename=file.filename,
+            content_type=file.content_type,
+            variant="activity"
         )
         
         # Update activity with photo URL
@@ -432,7 +682,7 @@ async def upload_activity_photo(
 
 # ==================== PACKING LIST ENDPOINTS ====================
 
-@router.post("/trips/{trip_id}/packing", response_model=ItineraryPackingItemResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/trips/{trip_id}/packing", response_model=ItineraryPackingItemResponse, status_code=status.HTTP_201_CREATED, dependencies=[Depends(trip_editor)])
 def create_packing_item(
     trip_id: UUID,
     item_data: ItineraryPackingItemCreate,
@@ -440,8 +690,6 @@ def create_packing_item(
     current_user: User = Depends(get_current_user)
 ):
     """Add item to packing list."""
-    check_trip_access(trip_id, current_user.id, db, required_role='editor')
-    
     new_item = ItineraryPackingList(
         trip_id=trip_id,
         added_by=current_user.id,
@@ -454,15 +702,12 @@ def create_packing_item(
     return new_item
 
 
-@router.get("/trips/{trip_id}/packing", response_model=List[ItineraryPackingItemResponse])
+@router.get("/trips/{trip_id}/packing", response_model=List[ItineraryPackingItemResponse], dependencies=[Depends(trip_member)])
 def get_packing_list(
     trip_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_db)
 ):
     """Get packing list for trip."""
-    check_trip_access(trip_id, current_user.id, db)
-    
     items = db.query(ItineraryPackingList).filter(
         ItineraryPackingList.trip_id == trip_id
     ).all()
@@ -477,11 +722,7 @@ def toggle_packed(
     current_user: User = Depends(get_current_user)
 ):
     """Toggle packed status of item."""
-    item = db.query(ItineraryPackingList).filter(ItineraryPackingList.id == item_id).first()
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-    
-    check_trip_access(item.trip_id, current_user.id, db)
+    item = get_packing_item_with_access(item_id, current_user.id, db)
     
     item.is_packed = not item.is_packed
     db.commit()
@@ -497,11 +738,7 @@ def delete_packing_item(
     current_user: User = Depends(get_current_user)
 ):
     """Delete packing item."""
-    item = db.query(ItineraryPackingList).filter(ItineraryPackingList.id == item_id).first()
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-    
-    check_trip_access(item.trip_id, current_user.id, db, required_role='editor')
+    item = get_packing_item_with_access(item_id, current_user.id, db, roles=ITINERARY_EDITOR_ROLES)
     
     db.delete(item)
     db.commit()
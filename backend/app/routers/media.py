@@ -1,18 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from fastapi.responses import RedirectResponse, StreamingResponse, StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request, Header
+from fastapi.responses import FileResponse, RedirectResponse, StreamingResponse, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from uuid import UUID
-from typing import List
+from uuid import UUID, uuid4
+from typing import List, Optional
+from datetime import datetime
+import asyncio
+import logging
+import os
 
-from ..database import get_db
+from ..database import get_db, get_async_db
 from ..models.media import Media
 from ..models.trip import Trip, TripMember
 from ..models.user import User
-from ..schemas.media import UploadRequest, UploadResponse, PhotoResponse, MediaUpdate, PaginatedPhotoResponse
-from ..deps import get_current_user, get_current_user_optional
-from ..services.gcs import get_gcs_service
+from ..models.upload_session import UploadSession
+from ..schemas.media import (
+    UploadRequest, UploadResponse, UploadSessionResponse,
+    PhotoResponse, MediaUpdate, PaginatedPhotoResponse,
+    BatchUploadItem, BatchUploadResponse
+)
+from ..deps import get_current_user, get_current_user_async, get_current_user_optional
+from ..services.authz import GALLERY, AsyncTripAccess, TripAccess, require_member, load_with_role
+from ..services.gcs import GCS_UPLOAD_CHUNK_SIZE, GCS_CHUNK_ALIGNMENT
+from ..services.storage import get_storage
+from ..services.jobs import enqueue
+from ..utils.concurrency import run_storage_io
+from ..utils.pagination import TotalMode, after_cursor, count_rows, count_rows_async, encode_cursor
 
 router = APIRouter(prefix="/media", tags=["Media"])
+logger = logging.getLogger(__name__)
+
+# Largest chunk accepted by PUT /media/uploads/{id}; the body is held in memory
+MAX_UPLOAD_CHUNK_BYTES = 4 * GCS_UPLOAD_CHUNK_SIZE
+
+# Concurrent storage writes per POST /media/upload-batch request
+BATCH_UPLOAD_PARALLELISM = int(os.getenv("BATCH_UPLOAD_PARALLELISM", "4"))
+
+# Membership check for routes with the trip id in the path
+trip_member = TripAccess(GALLERY)
+trip_member_async = AsyncTripAccess(GALLERY)
 
 
 @router.post("/upload", response_model=PhotoResponse)
@@ -27,7 +54,7 @@ async def upload_media(
     
     This endpoint handles the file upload in one step:
     1. Validates user has access to trip (if specified)
-    2. Uploads file to GCS
+    2. Streams file to GCS in chunks (constant memory per upload)
     3. Saves metadata to database
     4. Returns media info with public URL
     """
@@ -35,26 +62,18 @@ async def upload_media(
     trip_uuid = UUID(trip_id) if trip_id else None
     
     if trip_uuid:
-        member = db.query(TripMember).filter(
-            TripMember.trip_id == trip_uuid,
-            TripMember.user_id == current_user.id
-        ).first()
-        if not member:
-            raise HTTPException(status_code=403, detail="Not a member of this trip")
+        require_member(db, GALLERY, trip_uuid, current_user.id)
     
     # 2. Upload to GCS
-    gcs_service = get_gcs_service()
+    storage = get_storage()
     
     try:
-        # Read file content
-        file_content = await file.read()
-        
-        # Upload to GCS
-        from io import BytesIO
-        file_obj = BytesIO(file_content)
+        # Stream the request spool straight to GCS instead of reading it into memory
+        await file.seek(0)
         
-        gcs_path, public_url = gcs_service.upload_file(
-            file_obj=file_obj,
+        gcs_path, public_url, size_bytes, _ = await run_storage_io(
+            storage.upload_stream,
+            file_obj=file.file,
             user_id=str(current_user.id),
             trip_id=str(trip_uuid) if trip_uuid else "personal",
             filename=file.filename,
@@ -76,11 +95,15 @@ async def upload_media(
         public_url=public_url,
         filename=file.filename,
         mime_type=file.content_type,
-        size_bytes=len(file_content),
+        size_bytes=size_bytes,
         is_favorite=False
     )
     
     db.add(new_media)
+    db.flush()
+    
+    # Render thumbnails in the background
+    enqueue(db, "generate_thumbnails", {"media_id": str(new_media.id)})
     db.commit()
     db.refresh(new_media)
     
@@ -99,6 +122,7 @@ async def upload_media(
         uploader_name=current_user.name,
         public_url=new_media.public_url,
         thumbnail_url=new_media.thumbnail_url,
+        medium_url=new_media.medium_url,
         filename=new_media.filename,
         media_type="video" if "video" in file.content_type else "image",
         mime_type=new_media.mime_type,
@@ -108,35 +132,541 @@ async def upload_media(
     )
 
 
-@router.get("/trip/{trip_id}", response_model=PaginatedPhotoResponse)
-def get_trip_media(
-    trip_id: UUID,
-    page: int = 1,
-    limit: int = 50,
+@router.post("/upload-batch", response_model=BatchUploadResponse)
+async def upload_media_batch(
+    files: List[UploadFile] = File(...),
+    trip_id: Optional[str] = Form(None),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all media for a specific trip (Paginated)."""
-    # 1. Check Membership
-    member = db.query(TripMember).filter(
-        TripMember.trip_id == trip_id,
-        TripMember.user_id == current_user.id
-    ).first()
-    if not member:
-        raise HTTPException(status_code=403, detail="Not a member of this trip")
-
-    # 2. Build Query
-    query = db.query(Media, User.name.label("uploader_name")).join(User, Media.user_id == User.id).filter(
-        Media.trip_id == trip_id
+    """
+    Upload many photos/videos to one trip in a single request.
+    
+    Membership is checked once, files are streamed to GCS concurrently
+    (BATCH_UPLOAD_PARALLELISM at a time), and all successful uploads are
+    saved with one bulk insert and commit. A failed file does not fail the
+    batch; each file gets its own result entry, in request order.
+    """
+    # 1. Validation
+    trip_uuid = UUID(trip_id) if trip_id else None
+    
+    if trip_uuid:
+        require_member(db, GALLERY, trip_uuid, current_user.id)
+    
+    # 2. Upload to GCS concurrently
+    storage = get_storage()
+    semaphore = asyncio.Semaphore(BATCH_UPLOAD_PARALLELISM)
+    
+    async def upload_one(file: UploadFile):
+        async with semaphore:
+            await file.seek(0)
+            return await run_storage_io(
+                storage.upload_stream,
+                file_obj=file.file,
+                user_id=str(current_user.id),
+                trip_id=str(trip_uuid) if trip_uuid else "personal",
+                filename=file.filename,
+                content_type=file.content_type,
+                variant="original"
+            )
+    
+    outcomes = await asyncio.gather(*(upload_one(f) for f in files), return_exceptions=True)
+    
+    # 3. Save metadata for all successful uploads in one insert
+    results = []
+    new_media = []
+    for file, outcome in zip(files, outcomes):
+        if isinstance(outcome, Exception):
+            results.append(BatchUploadItem(
+                filename=file.filename,
+                success=False,
+                error=f"Failed to upload to GCS: {str(outcome)}"
+            ))
+            continue
+        
+        gcs_path, public_url, size_bytes, _ = outcome
+        # Assign id/timestamp up front so responses don't need a refresh per row
+        media = Media(
+            id=uuid4(),
+            user_id=current_user.id,
+            trip_id=trip_uuid,
+            gcs_path=gcs_path,
+            public_url=public_url,
+            filename=file.filename,
+            mime_type=file.content_type,
+            size_bytes=size_bytes,
+            is_favorite=False,
+            created_at=datetime.utcnow()
+        )
+        new_media.append(media)
+        results.append(BatchUploadItem(
+            filename=file.filename,
+            success=True,
+            media=PhotoResponse(
+                id=media.id,
+                trip_id=media.trip_id,
+                uploader_id=media.user_id,
+                uploader_name=current_user.name,
+                public_url=media.public_url,
+                thumbnail_url=None,
+                filename=media.filename,
+                media_type="video" if "video" in media.mime_type else "image",
+                mime_type=media.mime_type,
+                size_bytes=media.size_bytes,
+                is_favorite=False,
+                created_at=media.created_at
+            )
+        ))
+    
+    if new_media:
+        db.add_all(new_media)
+        
+        # Auto-set cover photo if not set
+        if trip_uuid:
+            trip = db.query(Trip).filter(Trip.id == trip_uuid).first()
+            if trip and not trip.cover_photo_url:
+                trip.cover_photo_url = new_media[0].public_url
+        
+        # Render thumbnails in the background
+        for media in new_media:
+            enqueue(db, "generate_thumbnails", {"media_id": str(media.id)})
+        
+        db.commit()
+    
+    return BatchUploadResponse(
+        results=results,
+        uploaded=len(new_media),
+        failed=len(results) - len(new_media)
+    )
+
+
+@router.post("/upload-url", response_model=UploadResponse)
+def create_upload_url(
+    upload_request: UploadRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Start a direct-to-bucket upload.
+    
+    Returns a signed PUT URL and records a pending media row. The client
+    uploads the bytes straight to GCS with the same Content-Type, then calls
+    POST /media/{photo_id}/complete to finalize.
+    """
+    trip_uuid = upload_request.trip_id
+    
+    if trip_uuid:
+        require_member(db, GALLERY, trip_uuid, current_user.id)
+    
+    storage = get_storage()
+    
+    try:
+        gcs_path, upload_url = storage.generate_upload_url(
+            user_id=str(current_user.id),
+            trip_id=str(trip_uuid) if trip_uuid else "personal",
+            filename=upload_request.filename,
+            content_type=upload_request.content_type
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to create upload URL: {str(e)}"
+        )
+    
+    pending_media = Media(
+        user_id=current_user.id,
+        trip_id=trip_uuid,
+        gcs_path=gcs_path,
+        public_url=storage.get_public_url(gcs_path),
+        filename=upload_request.filename,
+        mime_type=upload_request.content_type,
+        size_bytes=upload_request.size_bytes,
+        is_favorite=False,
+        status="pending"
+    )
+    
+    db.add(pending_media)
+    db.commit()
+    db.refresh(pending_media)
+    
+    return UploadResponse(
+        upload_url=upload_url,
+        public_url=pending_media.public_url,
+        gcs_path=gcs_path,
+        photo_id=pending_media.id
+    )
+
+
+@router.post("/{media_id}/complete", response_model=PhotoResponse)
+def complete_upload(
+    media_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Finalize a direct-to-bucket upload once the object is in GCS."""
+    media = db.query(Media).filter(Media.id == media_id).first()
+    
+    if not media:
+        raise HTTPException(status_code=404, detail="Media not found")
+    
+    if media.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    if media.status == "pending":
+        storage = get_storage()
+        
+        # Verify the object actually landed in the bucket
+        file_info = storage.get_file_info(media.gcs_path)
+        if not file_info:
+            raise HTTPException(status_code=400, detail="Upload not found in storage")
+        
+        try:
+            media.public_url = storage.make_public(media.gcs_path)
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to publish upload: {str(e)}"
+            )
+        
+        # Trust what GCS stored over what the client declared
+        media.size_bytes = file_info["size_bytes"]
+        if file_info["content_type"]:
+            media.mime_type = file_info["content_type"]
+        media.status = "ready"
+        enqueue(db, "generate_thumbnails", {"media_id": str(media.id)})
+        db.commit()
+        db.refresh(media)
+        
+        # Auto-set cover photo if not set
+        if media.trip_id:
+            trip = db.query(Trip).filter(Trip.id == media.trip_id).first()
+            if trip and not trip.cover_photo_url:
+                trip.cover_photo_url = media.public_url
+                db.commit()
+    
+    return PhotoResponse(
+        id=media.id,
+        trip_id=media.trip_id,
+        uploader_id=media.user_id,
+        uploader_name=current_user.name,
+        public_url=media.public_url,
+        thumbnail_url=media.thumbnail_url,
+        medium_url=media.medium_url,
+        filename=media.filename,
+        media_type="video" if "video" in media.mime_type else "image",
+        mime_type=media.mime_type,
+        size_bytes=media.size_bytes,
+        is_favorite=media.is_favorite,
+        created_at=media.created_at
     )
+
+
+def _upload_session_response(session: UploadSession) -> UploadSessionResponse:
+    return UploadSessionResponse(
+        session_id=session.id,
+        filename=session.filename,
+        size_bytes=session.size_bytes,
+        committed_bytes=session.committed_bytes,
+        chunk_size=GCS_UPLOAD_CHUNK_SIZE,
+        status=session.status,
+        media_id=session.media_id
+    )
+
+
+def _check_upload_session(upload_session: Optional[UploadSession], current_user: User) -> UploadSession:
+    if not upload_session:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    
+    if upload_session.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    return upload_session
+
+
+def _get_upload_session(session_id: UUID, db: Session, current_user: User) -> UploadSession:
+    upload_session = db.query(UploadSession).filter(UploadSession.id == session_id).first()
+    return _check_upload_session(upload_session, current_user)
+
+
+@router.post("/uploads", response_model=UploadSessionResponse, status_code=status.HTTP_201_CREATED)
+def create_upload_session(
+    upload_request: UploadRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Start a resumable upload session.
+    
+    The client then PUTs byte ranges to /media/uploads/{session_id} with a
+    Content-Range header (chunks must be multiples of 256 KB except the last),
+    can GET the session to learn the committed offset after a disconnect, and
+    POSTs /media/uploads/{session_id}/complete once all bytes are committed.
+    """
+    trip_uuid = upload_request.trip_id
+    
+    if trip_uuid:
+        require_member(db, GALLERY, trip_uuid, current_user.id)
     
-    # 3. Pagination
-    total_items = query.count()
-    total_pages = (total_items + limit - 1) // limit
+    if upload_request.size_bytes <= 0:
+        raise HTTPException(status_code=400, detail="size_bytes must be positive")
     
-    media_list = query.order_by(Media.created_at.desc()).offset((page - 1) * limit).limit(limit).all()
+    storage = get_storage()
+    
+    try:
+        gcs_path, session_url = storage.create_resumable_session(
+            user_id=str(current_user.id),
+            trip_id=str(trip_uuid) if trip_uuid else "personal",
+            filename=upload_request.filename,
+            content_type=upload_request.content_type,
+            size_bytes=upload_request.size_bytes
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to start upload session: {str(e)}"
+        )
+    
+    upload_session = UploadSession(
+        user_id=current_user.id,
+        trip_id=trip_uuid,
+        gcs_path=gcs_path,
+        session_url=session_url,
+        filename=upload_request.filename,
+        mime_type=upload_request.content_type,
+        size_bytes=upload_request.size_bytes,
+        committed_bytes=0,
+        status="active"
+    )
+    
+    db.add(upload_session)
+    db.commit()
+    db.refresh(upload_session)
+    
+    return _upload_session_response(upload_session)
+
+
+@router.get("/uploads/{session_id}", response_model=UploadSessionResponse)
+def get_upload_session(
+    session_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get upload progress; resume by sending bytes from committed_bytes on."""
+    upload_session = _get_upload_session(session_id, db, current_user)
+    
+    if upload_session.status == "active":
+        # GCS is the source of truth; we may have missed an ack before a crash
+        try:
+            committed = get_storage().get_committed_bytes(
+                upload_session.session_url,
+                upload_session.size_bytes
+            )
+        except Exception as e:
+            raise HTTPException(status_code=502, detail=f"Failed to query upload: {str(e)}")
+        
+        if committed != upload_session.committed_bytes:
+            upload_session.committed_bytes = committed
+            if committed == upload_session.size_bytes:
+                upload_session.status = "uploaded"
+            db.commit()
+    
+    return _upload_session_response(upload_session)
+
+
+@router.put("/uploads/{session_id}", response_model=UploadSessionResponse)
+async def upload_session_chunk(
+    session_id: UUID,
+    request: Request,
+    content_range: str = Header(...),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """Upload one byte range (Content-Range: bytes start-end/total)."""
+    # Async for the streamed body, so the database goes through an AsyncSession
+    upload_session = _check_upload_session(await db.get(UploadSession, session_id), current_user)
+    
+    if upload_session.status != "active":
+        raise HTTPException(status_code=409, detail="Upload already finished")
+    
+    # Parse "bytes start-end/total"
+    try:
+        unit, byte_range = content_range.split(" ", 1)
+        span, total = byte_range.split("/")
+        start, end = (int(x) for x in span.split("-"))
+        total = int(total)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Content-Range header")
+    
+    if unit != "bytes" or total != upload_session.size_bytes or end < start or end >= total:
+        raise HTTPException(status_code=400, detail="Content-Range does not match upload")
+    
+    chunk_length = end - start + 1
+    if chunk_length > MAX_UPLOAD_CHUNK_BYTES:
+        raise HTTPException(status_code=413, detail=f"Chunks may be at most {MAX_UPLOAD_CHUNK_BYTES} bytes")
+    
+    is_last_chunk = end + 1 == total
+    if not is_last_chunk and chunk_length % GCS_CHUNK_ALIGNMENT != 0:
+        raise HTTPException(status_code=400, detail=f"Chunk size must be a multiple of {GCS_CHUNK_ALIGNMENT} bytes")
+    
+    if start != upload_session.committed_bytes:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Expected chunk starting at byte {upload_session.committed_bytes}"
+        )
+    
+    # Give the connection back while the body comes in and goes to storage
+    await db.commit()
+    
+    # Read no more than the range declares: the header alone bounds nothing
+    data = bytearray()
+    async for part in request.stream():
+        data += part
+        if len(data) > chunk_length:
+            raise HTTPException(status_code=413, detail="Body is longer than Content-Range")
+    if len(data) != chunk_length:
+        raise HTTPException(status_code=400, detail="Body length does not match Content-Range")
+    data = bytes(data)
+    
+    try:
+        committed = await run_storage_io(
+            get_storage().upload_chunk,
+            upload_session.session_url,
+            data,
+            start,
+            total
+        )
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Failed to upload chunk: {str(e)}")
+    
+    upload_session.committed_bytes = committed
+    if committed == upload_session.size_bytes:
+        upload_session.status = "uploaded"
+    await db.commit()
+    
+    return _upload_session_response(upload_session)
+
+
+@router.post("/uploads/{session_id}/complete", response_model=PhotoResponse)
+def complete_upload_session(
+    session_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Finalize a fully uploaded session into a media item."""
+    upload_session = _get_upload_session(session_id, db, current_user)
+    
+    if upload_session.status == "active":
+        raise HTTPException(
+            status_code=409,
+            detail=f"Upload incomplete: {upload_session.committed_bytes}/{upload_session.size_bytes} bytes committed"
+        )
+    
+    if upload_session.status == "uploaded":
+        storage = get_storage()
+        
+        try:
+            public_url = storage.make_public(upload_session.gcs_path)
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to publish upload: {str(e)}"
+            )
+        
+        new_media = Media(
+            user_id=current_user.id,
+            trip_id=upload_session.trip_id,
+            gcs_path=upload_session.gcs_path,
+            public_url=public_url,
+            filename=upload_session.filename,
+            mime_type=upload_session.mime_type,
+            size_bytes=upload_session.size_bytes,
+            is_favorite=False
+        )
+        db.add(new_media)
+        db.flush()
+        
+        upload_session.media_id = new_media.id
+        upload_session.status = "complete"
+        
+        # Auto-set cover photo if not set
+        if upload_session.trip_id:
+            trip = db.query(Trip).filter(Trip.id == upload_session.trip_id).first()
+            if trip and not trip.cover_photo_url:
+                trip.cover_photo_url = public_url
+        
+        enqueue(db, "generate_thumbnails", {"media_id": str(new_media.id)})
+        db.commit()
+    
+    media = db.query(Media).filter(Media.id == upload_session.media_id).first()
+    if not media:
+        raise HTTPException(status_code=404, detail="Media not found")
+    
+    return PhotoResponse(
+        id=media.id,
+        trip_id=media.trip_id,
+        uploader_id=media.user_id,
+        uploader_name=current_user.name,
+        public_url=media.public_url,
+        thumbnail_url=media.thumbnail_url,
+        medium_url=media.medium_url,
+        filename=media.filename,
+        media_type="video" if "video" in media.mime_type else "image",
+        mime_type=media.mime_type,
+        size_bytes=media.size_bytes,
+        is_favorite=media.is_favorite,
+        created_at=media.created_at
+    )
+
+
+def _paginate_media(
+    db: Session,
+    query,
+    page: int,
+    limit: int,
+    cursor: Optional[str],
+    total: TotalMode
+) -> PaginatedPhotoResponse:
+    """
+    Fetch one page of a (Media, uploader_name) listing, newest first.
+
+    Pages are keyset-paginated on (created_at, id): pass the previous
+    response's next_cursor to continue. `page` without a cursor still works
+    (OFFSET) for older clients, but deep pages get slower.
+    """
+    total_items = count_rows(db, query, total)
+    media_list = _page_query(query, page, limit, cursor).all()
+    return _media_page(media_list, page, limit, total_items)
+
+
+async def _paginate_media_async(
+    db: AsyncSession,
+    statement,
+    page: int,
+    limit: int,
+    cursor: Optional[str],
+    total: TotalMode
+) -> PaginatedPhotoResponse:
+    """_paginate_media for a select(Media, uploader_name) on an async session."""
+    total_items = await count_rows_async(db, statement, total)
+    media_list = (await db.execute(_page_query(statement, page, limit, cursor))).all()
+    return _media_page(media_list, page, limit, total_items)
+
+
+def _page_query(query, page: int, limit: int, cursor: Optional[str]):
+    query = after_cursor(query, Media.created_at, Media.id, cursor)
+    if not cursor and page > 1:
+        query = query.offset((page - 1) * limit)
+    # Fetch one extra row to know whether there is a next page
+    return query.limit(limit + 1)
+
+
+def _media_page(media_list: list, page: int, limit: int, total_items: Optional[int]) -> PaginatedPhotoResponse:
+    next_cursor = None
+    if len(media_list) > limit:
+        media_list = media_list[:limit]
+        last = media_list[-1][0]
+        next_cursor = encode_cursor(last.created_at, last.id)
     
-    # 4. Map Response
     items = [
         PhotoResponse(
             id=media.id,
@@ -145,6 +675,7 @@ def get_trip_media(
             uploader_name=uploader_name if uploader_name else "Unknown",
             public_url=media.public_url,
             thumbnail_url=media.thumbnail_url,
+            medium_url=media.medium_url,
             filename=media.filename,
             media_type="video" if "video" in media.mime_type else "image",
             mime_type=media.mime_type,
@@ -160,21 +691,45 @@ def get_trip_media(
         total=total_items,
         page=page,
         size=limit,
-        pages=total_pages
+        pages=(total_items + limit - 1) // limit if total_items is not None else None,
+        next_cursor=next_cursor
     )
 
 
+@router.get("/trip/{trip_id}", response_model=PaginatedPhotoResponse, dependencies=[Depends(trip_member_async)])
+async def get_trip_media(
+    trip_id: UUID,
+    page: int = 1,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    total: TotalMode = "exact",
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get all media for a specific trip (Paginated)."""
+    # 1. Build Query (membership is checked by the trip_member_async dependency)
+    statement = select(Media, User.name.label("uploader_name")).join(User, Media.user_id == User.id).where(
+        Media.trip_id == trip_id,
+        Media.status == "ready"
+    )
+    
+    # 2. Paginate and map response
+    return await _paginate_media_async(db, statement, page, limit, cursor, total)
+
+
 @router.get("/favorites", response_model=PaginatedPhotoResponse)
 def get_user_favorites(
     page: int = 1,
     limit: int = 50,
+    cursor: Optional[str] = None,
+    total: TotalMode = "exact",
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get current user's favorite media across all trips."""
     
     query = db.query(Media, User.name.label("uploader_name")).join(User, Media.user_id == User.id).filter(
-        Media.is_favorite == True
+        Media.is_favorite == True,
+        Media.status == "ready"
     )
     
     # We should ensure user can only see favorites from trips they are in OR their own uploads?
@@ -199,36 +754,7 @@ def get_user_favorites(
         Media.trip_id.in_(user_trip_ids)
     )
 
-    total_items = query.count()
-    total_pages = (total_items + limit - 1) // limit
-    
-    media_list = query.order_by(Media.created_at.desc()).offset((page - 1) * limit).limit(limit).all()
-    
-    items = [
-        PhotoResponse(
-            id=media.id,
-            trip_id=media.trip_id,
-            uploader_id=media.user_id,
-            uploader_name=uploader_name if uploader_name else "Unknown",
-            public_url=media.public_url,
-            thumbnail_url=media.thumbnail_url,
-            filename=media.filename,
-            media_type="video" if "video" in media.mime_type else "image",
-            mime_type=media.mime_type,
-            size_bytes=media.size_bytes,
-            is_favorite=media.is_favorite,
-            created_at=media.created_at
-        )
-        for media, uploader_name in media_list
-    ]
-    
-    return PaginatedPhotoResponse(
-        items=items,
-        total=total_items,
-        page=page,
-        size=limit,
-        pages=total_pages
-    )
+    return _paginate_media(db, query, page, limit, cursor, total)
 
 
 @router.patch("/{media_id}", response_model=PhotoResponse)
@@ -239,25 +765,16 @@ def update_media(
     current_user: User = Depends(get_current_user)
 ):
     """Update media metadata (e.g., toggle favorite)."""
-    media = db.query(Media).filter(Media.id == media_id).first()
+    media, _, role = load_with_role(
+        db, GALLERY, db.query(Media).filter(Media.id == media_id), Media.trip_id, current_user.id
+    )
     
     if not media:
         raise HTTPException(status_code=404, detail="Media not found")
     
     # Check access: Owner OR Member of the trip
-    if media.user_id != current_user.id:
-        # If not owner, check if user is a trip member
-        is_member = False
-        if media.trip_id:
-            member = db.query(TripMember).filter(
-                TripMember.trip_id == media.trip_id,
-                TripMember.user_id == current_user.id
-            ).first()
-            if member:
-                is_member = True
-        
-        if not is_member:
-            raise HTTPException(status_code=403, detail="Not authorized")
+    if media.user_id != current_user.id and role is None:
+        raise HTTPException(status_code=403, detail="Not authorized")
     
     # Update fields
     if update_data.is_favorite is not None:
@@ -272,6 +789,7 @@ def update_media(
         uploader_id=media.user_id,
         public_url=media.public_url,
         thumbnail_url=media.thumbnail_url,
+        medium_url=media.medium_url,
         filename=media.filename,
         media_type="video" if "video" in media.mime_type else "image",
         mime_type=media.mime_type,
@@ -296,26 +814,21 @@ def delete_media(
     if media.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    # Delete from GCS
-    gcs_service = get_gcs_service()
-    gcs_service.delete_file(media.gcs_path)
+    # Storage cleanup and cover photo replacement run in the background,
+    # enqueued in the same transaction as the delete
+    storage = get_storage()
+    paths = [media.gcs_path]
+    for variant_url in (media.thumbnail_url, media.medium_url):
+        variant_path = storage.get_blob_path(variant_url)
+        if variant_path:
+            paths.append(variant_path)
+    enqueue(db, "delete_storage_objects", {"paths": paths})
     
-    # Delete from database
-    # Check if this was the cover photo
     if media.trip_id:
-        trip = db.query(Trip).filter(Trip.id == media.trip_id).first()
-        if trip and trip.cover_photo_url == media.public_url:
-            # Find a replacement (latest photo)
-            latest_media = db.query(Media).filter(
-                Media.trip_id == media.trip_id,
-                Media.id != media.id
-            ).order_by(Media.created_at.desc()).first()
-            
-            if latest_media:
-                trip.cover_photo_url = latest_media.public_url
-            else:
-                trip.cover_photo_url = None
-            db.add(trip) # Ensure trip update is staged
+        enqueue(db, "refresh_trip_cover", {
+            "trip_id": str(media.trip_id),
+            "removed_url": media.public_url
+        })
 
     db.delete(media)
     db.commit()
@@ -330,34 +843,29 @@ def download_media(
     current_user: User = Depends(get_current_user)
 ):
     """Download a media file via backend proxy (avoids CORS)."""
-    media = db.query(Media).filter(Media.id == media_id).first()
+    media, _, role = load_with_role(
+        db, GALLERY, db.query(Media).filter(Media.id == media_id), Media.trip_id, current_user.id
+    )
     
     if not media:
         raise HTTPException(status_code=404, detail="Media not found")
     
     # Check access: Owner OR Member of the trip
-    has_access = False
-    if media.user_id == current_user.id:
-        has_access = True
-    elif media.trip_id:
-        # Check if user is a member of the trip
-        membership = db.query(TripMember).filter(
-            TripMember.trip_id == media.trip_id,
-            TripMember.user_id == current_user.id
-        ).first()
-        if membership:
-            has_access = True
-            
-    if not has_access:
+    if media.user_id != current_user.id and role is None:
         raise HTTPException(status_code=403, detail="Not authorized to access this file")
 
-    gcs_service = get_gcs_service()
+    storage = get_storage()
+    # Determine strict filename
+    # Ensure ascii filename to prevent header injection issues, though FastAPI handles some
+    safe_filename = media.filename.encode('ascii', 'ignore').decode('ascii') or "download"
+    
+    # Files on local disk are sent as-is (sendfile where the server supports it)
+    local_path = storage.local_path(media.gcs_path)
+    if local_path:
+        return FileResponse(local_path, media_type=media.mime_type, filename=safe_filename)
+    
     try:
-        file_stream = gcs_service.get_file_stream(media.gcs_path)
-        
-        # Determine strict filename
-        # Ensure ascii filename to prevent header injection issues, though FastAPI handles some
-        safe_filename = media.filename.encode('ascii', 'ignore').decode('ascii') or "download"
+        file_stream = storage.get_file_stream(media.gcs_path)
         
         headers = {
             'Content-Disposition': f'attachment; filename="{safe_filename}"'
@@ -369,15 +877,14 @@ def download_media(
             headers=headers
         )
     except Exception as e:
-        print(f"Download failed: {e}")
+        logger.exception("Download failed: %s", e)
         raise HTTPException(status_code=500, detail="Failed to stream file")
 
 
-@router.get("/trip/{trip_id}/download-all")
+@router.get("/trip/{trip_id}/download-all", dependencies=[Depends(trip_member)])
 def download_trip_archive(
     trip_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_db)
 ):
     """
     Download all media from a trip as a ZIP archive.
@@ -385,17 +892,10 @@ def download_trip_archive(
     Note: This is a placeholder for future implementation.
     For now, returns list of download URLs.
     """
-    # Check membership
-    member = db.query(TripMember).filter(
-        TripMember.trip_id == trip_id,
-        TripMember.user_id == current_user.id
-    ).first()
-    if not member:
-        raise HTTPException(status_code=403, detail="Not a member of this trip")
-    
     # Get all media
     media_list = db.query(Media).filter(
-        Media.trip_id == trip_id
+        Media.trip_id == trip_id,
+        Media.status == "ready"
     ).all()
     
     # Return list of download URLs
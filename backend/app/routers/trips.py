@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session, joinedload
 from typing import List
+from uuid import UUID
 import random
 import string
 from ..database import get_db
@@ -8,6 +9,7 @@ from ..models.trip import Trip, TripMember
 from ..models.user import User
 from ..schemas.trip import TripCreate, TripResponse, TripJoin
 from ..deps import get_current_user
+from ..services.authz import GALLERY, require_member, invalidate_membership
 
 router = APIRouter(prefix="/trips", tags=["Trips"])
 
@@ -71,6 +73,7 @@ def create_trip(trip: TripCreate, db: Session = Depends(get_db), current_user: U
     )
     db.add(member)
     db.commit()
+    invalidate_membership(GALLERY, new_trip.id, [current_user.id])
     
     # 3. Reload trip with members and user data
     trip_with_members = db.query(Trip).options(
@@ -120,6 +123,7 @@ def join_trip(join_data: TripJoin, db: Session = Depends(get_db), current_user:
         )
         db.add(new_member)
         db.commit()
+        invalidate_membership(GALLERY, trip.id, [current_user.id])
     
     # Reload trip with members and user data
     trip_with_members = db.query(Trip).options(
@@ -148,7 +152,7 @@ def join_trip(join_data: TripJoin, db: Session = Depends(get_db), current_user:
     }
 
 @router.get("/{trip_id}", response_model=TripResponse)
-def get_trip_details(trip_id: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_trip_details(trip_id: UUID, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     from sqlalchemy.orm import joinedload
     
     trip = db.query(Trip).options(
@@ -159,13 +163,7 @@ def get_trip_details(trip_id: str, db: Session = Depends(get_db), current_user:
         raise HTTPException(status_code=404, detail="Trip not found")
         
     # Verify membership
-    member = db.query(TripMember).filter(
-        TripMember.trip_id == trip.id, 
-        TripMember.user_id == current_user.id
-    ).first()
-    
-    if not member:
-        raise HTTPException(status_code=403, detail="Not a member of this trip")
+    require_member(db, GALLERY, trip.id, current_user.id)
     
     # Format members for response
     trip_dict = {
@@ -191,7 +189,7 @@ def get_trip_details(trip_id: str, db: Session = Depends(get_db), current_user:
     return trip_dict
 
 @router.delete("/{trip_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_trip(trip_id: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def delete_trip(trip_id: UUID, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     trip = db.query(Trip).filter(Trip.id == trip_id).first()
     if not trip:
         raise HTTPException(status_code=404, detail="Trip not found")
@@ -200,6 +198,8 @@ def delete_trip(trip_id: str, db: Session = Depends(get_db), current_user: User
     if str(trip.created_by) != str(current_user.id):
         raise HTTPException(status_code=403, detail="Not authorized to delete this trip")
         
+    member_ids = [m.user_id for m in trip.members]
     db.delete(trip)
     db.commit()
+    invalidate_membership(GALLERY, trip.id, member_ids)
     return
@@ -3,8 +3,8 @@ from sqlalchemy.orm import Session
 from ..database import get_db
 from ..models.user import User
 from ..schemas.user import UserResponse, UserUpdate
-from ..deps import get_current_user
-from ..services.gcs import get_gcs_service
+from ..deps import get_current_user, invalidate_user
+from ..services.jobs import enqueue
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -28,6 +28,7 @@ def update_user_me(user_update: UserUpdate, db: Session = Depends(get_db), curre
     
     db.add(current_user)
     db.commit()
+    invalidate_user(current_user.id)
     db.refresh(current_user)
     return current_user
 
@@ -37,19 +38,15 @@ def delete_user_me(db: Session = Depends(get_db), current_user: User = Depends(g
     Delete user account and all associated data.
     
     This will:
-    1. Delete all photos from GCS
+    1. Queue deletion of all photos from GCS (drained by the job worker)
     2. Delete user from database (cascade deletes trips, expenses, etc.)
     """
-    # 1. Delete all user photos from GCS
-    try:
-        gcs_service = get_gcs_service()
-        deleted_count = gcs_service.delete_user_folder(str(current_user.id))
-        print(f"Deleted {deleted_count} files from GCS for user {current_user.id}")
-    except Exception as e:
-        print(f"Warning: Failed to delete GCS files for user {current_user.id}: {e}")
-        # Continue with account deletion even if GCS cleanup fails
+    # 1. Queue GCS cleanup in the same transaction as the account deletion
+    enqueue(db, "delete_user_storage", {"user_id": str(current_user.id)})
     
     # 2. Delete user from database (PostgreSQL cascade handles related records)
+    user_id = current_user.id
     db.delete(current_user)
     db.commit()
+    invalidate_user(user_id)
     return
@@ -2,7 +2,7 @@
 
 from pydantic import BaseModel, UUID4
 from datetime import date, time, datetime
-from typing import Optional, List
+from typing import Optional, List, Literal
 from decimal import Decimal
 
 
@@ -50,6 +50,7 @@ class ItineraryTripResponse(BaseModel):
     created_by: UUID4
     created_at: datetime
     updated_at: datetime
+    version: int = 0
     members: List[ItineraryTripMemberResponse] = []
     
     class Config:
@@ -77,6 +78,7 @@ class ItineraryDayResponse(ItineraryDayBase):
     id: UUID4
     trip_id: UUID4
     created_at: datetime
+    version: int = 0
     
     class Config:
         from_attributes = True
@@ -107,6 +109,10 @@ class ItineraryActivityCreate(ItineraryActivityBase):
     order_index: int
 
 
+class ItineraryBatchActivityCreate(ItineraryActivityCreate):
+    day_id: str  # UUID, or the ref of a day created in the same batch
+
+
 class ItineraryActivityUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
@@ -135,11 +141,22 @@ class ItineraryActivityResponse(ItineraryActivityBase):
     created_by: Optional[UUID4]
     created_at: datetime
     updated_at: datetime
+    version: int = 0
     
     class Config:
         from_attributes = True
 
 
+class ItineraryDayActivityOrder(BaseModel):
+    day_id: UUID4
+    activity_ids: List[UUID4]  # every activity of the day, in order
+
+
+class ItineraryActivityReorder(BaseModel):
+    days: List[ItineraryDayActivityOrder]
+    gaps: bool = False  # keep existing indexes where possible instead of renumbering 0..n-1
+
+
 # Packing List Schemas
 class ItineraryPackingItemBase(BaseModel):
     item: str
@@ -166,11 +183,66 @@ class ItineraryPackingItemResponse(ItineraryPackingItemBase):
     is_packed: bool
     added_by: Optional[UUID4]
     created_at: datetime
+    version: int = 0
     
     class Config:
         from_attributes = True
 
 
+# Full itinerary (GET /itinerary/trips/{id}/full)
+class ItineraryDayWithActivitiesResponse(ItineraryDayResponse):
+    activities: List[ItineraryActivityResponse] = []
+
+
+class ItineraryTripFullResponse(ItineraryTripResponse):
+    days: List[ItineraryDayWithActivitiesResponse] = []
+    packing_items: List[ItineraryPackingItemResponse] = []
+
+
+# Delta sync (GET /itinerary/trips/{id}/changes)
+class ItineraryTombstoneResponse(BaseModel):
+    entity_type: str  # day, activity, packing_item
+    entity_id: UUID4
+    version: int
+    
+    class Config:
+        from_attributes = True
+
+
+class ItineraryChangesResponse(BaseModel):
+    version: int
+    trip: Optional[ItineraryTripResponse] = None  # Set when anything changed
+    days: List[ItineraryDayResponse] = []
+    activities: List[ItineraryActivityResponse] = []
+    packing_items: List[ItineraryPackingItemResponse] = []
+    deleted: List[ItineraryTombstoneResponse] = []
+
+
 # Join Trip Schema
 class JoinTripRequest(BaseModel):
     join_code: str
+
+
+# Batch Schemas
+class ItineraryBatchOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    entity: Literal["day", "activity", "packing_item"]
+    ref: Optional[str] = None  # client id for a created row, usable as an id elsewhere in the batch
+    id: Optional[str] = None  # row to update or delete: a UUID, or the ref of a row created in the batch
+    data: dict = {}  # the fields the single-row create / update endpoint takes
+
+
+class ItineraryBatchRequest(BaseModel):
+    operations: List[ItineraryBatchOperation]
+
+
+class ItineraryBatchResult(BaseModel):
+    op: str
+    entity: str
+    id: UUID4
+    ref: Optional[str] = None
+
+
+class ItineraryBatchResponse(BaseModel):
+    version: int
+    results: List[ItineraryBatchResult]  # one per operation, in order
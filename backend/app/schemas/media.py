@@ -15,6 +15,15 @@ class UploadResponse(BaseModel):
     gcs_path: str
     photo_id: UUID
 
+class UploadSessionResponse(BaseModel):
+    session_id: UUID
+    filename: str
+    size_bytes: int
+    committed_bytes: int
+    chunk_size: int
+    status: str
+    media_id: Optional[UUID] = None
+
 class PhotoResponse(BaseModel):
     id: UUID
     trip_id: Optional[UUID]
@@ -22,6 +31,7 @@ class PhotoResponse(BaseModel):
     uploader_name: Optional[str] = "Unknown"
     public_url: str
     thumbnail_url: Optional[str] = None
+    medium_url: Optional[str] = None
     filename: str
     media_type: str = "image"
     mime_type: Optional[str] = "image/jpeg"
@@ -40,7 +50,19 @@ from typing import List
 
 class PaginatedPhotoResponse(BaseModel):
     items: List[PhotoResponse]
-    total: int
+    total: Optional[int] = None  # None when total=none was requested
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None  # Pass as ?cursor= for the next page; None on the last page
+
+class BatchUploadItem(BaseModel):
+    filename: str
+    success: bool
+    media: Optional[PhotoResponse] = None
+    error: Optional[str] = None
+
+class BatchUploadResponse(BaseModel):
+    results: List[BatchUploadItem]
+    uploaded: int
+    failed: int
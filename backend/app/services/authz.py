@@ -0,0 +1,245 @@
+"""
+Trip membership and role checks shared by the routers.
+
+Each app has its own membership table: TripMember (Galleriq),
+ExpenseTripMember (Economiq) and ItineraryTripMember (Tripify). get_role
+answers "what role does this user have on this trip" from the "membership"
+cache (see services/cache.py), falling back to one indexed lookup. Every
+write that changes or removes members must call invalidate_membership once
+it has committed.
+
+Only members' roles are cached. Without a shared cache (CACHE_URL) an
+invalidation only reaches its own process, so a cached "not a member" would
+keep a user who just joined out of the other processes. Those processes still
+serve a removed member's old role until MEMBERSHIP_CACHE_TTL runs out.
+
+Endpoints addressed by a child resource (a day, an activity, a media row)
+use load_with_role, which loads the resource and the caller's membership in
+one joined query instead of resource -> parent -> membership round-trips.
+
+Async endpoints use get_role_async / AsyncTripAccess, which share the cache.
+"""
+
+import os
+from typing import Any, Iterable, Optional, Sequence
+from uuid import UUID
+
+from fastapi import Depends, HTTPException
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session
+
+from ..database import get_db, get_async_db
+from ..deps import get_current_user, get_current_user_async
+from ..models.expense_trip import ExpenseTripMember
+from ..models.itinerary_trip import ItineraryTripMember
+from ..models.trip import TripMember
+from ..models.user import User
+from .cache import get_cache
+
+# Seconds a (trip, user) -> role answer is served from cache; 0 disables it
+MEMBERSHIP_CACHE_TTL = float(os.getenv("MEMBERSHIP_CACHE_TTL", "60"))
+
+GALLERY = "gallery"
+EXPENSE = "expense"
+ITINERARY = "itinerary"
+
+_member_models = {
+    GALLERY: TripMember,
+    EXPENSE: ExpenseTripMember,
+    ITINERARY: ItineraryTripMember,
+}
+
+# Role assumed for membership rows whose role column is NULL
+_default_roles = {
+    GALLERY: "member",
+    EXPENSE: "member",
+    ITINERARY: "editor",
+}
+
+# Roles allowed to modify an itinerary (viewers are read-only)
+ITINERARY_EDITOR_ROLES = ("owner", "editor")
+
+_membership_cache = get_cache("membership", MEMBERSHIP_CACHE_TTL)
+
+
+def _cache_key(domain: str, trip_id, user_id) -> str:
+    return f"{domain}:{trip_id}:{user_id}"
+
+
+def _remember(domain: str, trip_id, user_id, role: Optional[str]) -> None:
+    # Non-members are looked up every time (see the module docstring)
+    if role is not None and MEMBERSHIP_CACHE_TTL > 0:
+        _membership_cache.set(_cache_key(domain, trip_id, user_id), {"role": role})
+
+
+def _cached_role(domain: str, trip_id, user_id) -> Optional[dict]:
+    if MEMBERSHIP_CACHE_TTL > 0:
+        return _membership_cache.get(_cache_key(domain, trip_id, user_id))
+    return None
+
+
+def _role_query(domain: str, trip_id, user_id):
+    model = _member_models[domain]
+    return select(model.role).where(model.trip_id == trip_id, model.user_id == user_id).limit(1)
+
+
+def _resolve_role(domain: str, trip_id, user_id, row) -> Optional[str]:
+    role = (row.role or _default_roles[domain]) if row else None
+    _remember(domain, trip_id, user_id, role)
+    return role
+
+
+def get_role(db: Session, domain: str, trip_id: UUID, user_id: UUID) -> Optional[str]:
+    """
+    Get a user's role on a trip.
+
+    Args:
+        db: Database session
+        domain: GALLERY, EXPENSE or ITINERARY
+        trip_id: Trip in that domain
+        user_id: User to look up
+
+    Returns:
+        The member's role, or None if the user is not a member
+    """
+    cached = _cached_role(domain, trip_id, user_id)
+    if cached is not None:
+        return cached["role"]
+    row = db.execute(_role_query(domain, trip_id, user_id)).first()
+    return _resolve_role(domain, trip_id, user_id, row)
+
+
+async def get_role_async(db: AsyncSession, domain: str, trip_id: UUID, user_id: UUID) -> Optional[str]:
+    """get_role for async sessions."""
+    cached = _cached_role(domain, trip_id, user_id)
+    if cached is not None:
+        return cached["role"]
+    row = (await db.execute(_role_query(domain, trip_id, user_id))).first()
+    return _resolve_role(domain, trip_id, user_id, row)
+
+
+def check_role(
+    role: Optional[str],
+    roles: Optional[Sequence[str]] = None,
+    detail: str = "Not a member of this trip",
+    forbidden_detail: str = "Insufficient permissions"
+) -> str:
+    """
+    Raise 403 unless role belongs to a member holding one of `roles`.
+
+    Args:
+        role: Result of get_role / load_with_role
+        roles: Acceptable roles, or None for any member
+        detail: Error message for non-members
+        forbidden_detail: Error message for members without a required role
+
+    Returns:
+        The role
+    """
+    if role is None:
+        raise HTTPException(status_code=403, detail=detail)
+    if roles is not None and role not in roles:
+        raise HTTPException(status_code=403, detail=forbidden_detail)
+    return role
+
+
+def require_member(
+    db: Session,
+    domain: str,
+    trip_id: UUID,
+    user_id: UUID,
+    roles: Optional[Sequence[str]] = None,
+    detail: str = "Not a member of this trip"
+) -> str:
+    """get_role + check_role, for trip ids that don't come from the path."""
+    return check_role(get_role(db, domain, trip_id, user_id), roles, detail)
+
+
+def load_with_role(
+    db: Session,
+    domain: str,
+    query: Query,
+    trip_id_column,
+    user_id: UUID
+) -> tuple[Optional[Any], Optional[UUID], Optional[str]]:
+    """
+    Load one resource together with the caller's membership of its trip.
+
+    Args:
+        db: Database session
+        domain: GALLERY, EXPENSE or ITINERARY
+        query: Query for a single entity, with any joins trip_id_column needs
+        trip_id_column: Column holding the resource's trip id
+        user_id: Caller
+
+    Returns:
+        (resource, trip_id, role); role is None when the caller is not a
+        member, and everything is None when the resource doesn't exist
+    """
+    model = _member_models[domain]
+    row = query.add_columns(trip_id_column, model.user_id, model.role).outerjoin(
+        model, and_(model.trip_id == trip_id_column, model.user_id == user_id)
+    ).first()
+    if row is None:
+        return None, None, None
+
+    resource, trip_id, member_user_id, role = row
+    if trip_id is None:
+        return resource, None, None
+    role = (role or _default_roles[domain]) if member_user_id is not None else None
+    _remember(domain, trip_id, user_id, role)
+    return resource, trip_id, role
+
+
+def invalidate_membership(domain: str, trip_id: UUID, user_ids: Iterable[UUID]) -> None:
+    """Forget cached roles after members join, leave, or their trip is deleted."""
+    for user_id in user_ids:
+        _membership_cache.delete(_cache_key(domain, trip_id, user_id))
+
+
+class TripAccess:
+    """
+    Dependency that checks the caller's role on the `trip_id` in the path.
+
+    Usage:
+        @router.get("/trips/{trip_id}/days")
+        def get_trip_days(trip_id: UUID, role: str = Depends(TripAccess(ITINERARY))):
+
+    Raises 403 unless the caller is a member holding one of `roles` (any
+    member when roles is None), and returns the role.
+    """
+
+    def __init__(
+        self,
+        domain: str,
+        roles: Optional[Sequence[str]] = None,
+        detail: str = "Not a member of this trip",
+        forbidden_detail: str = "Insufficient permissions"
+    ):
+        self.domain = domain
+        self.roles = roles
+        self.detail = detail
+        self.forbidden_detail = forbidden_detail
+
+    def __call__(
+        self,
+        trip_id: UUID,
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+    ) -> str:
+        role = get_role(db, self.domain, trip_id, current_user.id)
+        return check_role(role, self.roles, self.detail, self.forbidden_detail)
+
+
+class AsyncTripAccess(TripAccess):
+    """TripAccess for async endpoints, using get_async_db."""
+
+    async def __call__(
+        self,
+        trip_id: UUID,
+        db: AsyncSession = Depends(get_async_db),
+        current_user: User = Depends(get_current_user_async)
+    ) -> str:
+        role = await get_role_async(db, self.domain, trip_id, current_user.id)
+        return check_role(role, self.roles, self.detail, self.forbidden_detail)
@@ -0,0 +1,131 @@
+"""
+Small key-value caches for hot, rarely-changing lookups.
+
+Each cache is a namespace ("users", ...) with its own TTL. By default entries
+live in a per-process TTL + LRU map, so an invalidation only reaches the
+process that made it and other processes serve the old entry until it
+expires. Setting CACHE_URL=redis://... moves every namespace to Redis, which
+all API processes and workers share, so invalidations take effect everywhere.
+Values must be JSON-serializable.
+
+A cache is only ever an optimisation: when Redis is unreachable, reads are
+misses and writes are dropped, and callers fall back to the database.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# redis://host:6379/0 to share caches between processes; unset = in-process
+CACHE_URL = os.getenv("CACHE_URL")
+# Max entries per namespace for the in-process backend
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+
+
+class LocalCache:
+    """Thread-safe in-process cache with a TTL and LRU eviction."""
+
+    def __init__(self, ttl: float, max_entries: int = CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCache:
+    """Cache namespace stored in Redis, shared by every process."""
+
+    def __init__(self, url: str, namespace: str, ttl: float):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_URL is set but the redis package is not installed (pip install redis)")
+        self._errors = redis.RedisError
+        self._client = redis.Redis.from_url(url)
+        self.prefix = f"cache:{namespace}:"
+        self.ttl = ttl
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = self._client.get(self.prefix + key)
+        except self._errors as e:
+            logger.warning("Cache read failed, treating as miss: %s", e)
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any) -> None:
+        try:
+            self._client.set(self.prefix + key, json.dumps(value), px=max(1, int(self.ttl * 1000)))
+        except self._errors as e:
+            logger.warning("Cache write failed: %s", e)
+
+    def delete(self, key: str) -> None:
+        try:
+            self._client.delete(self.prefix + key)
+        except self._errors as e:
+            logger.warning("Cache invalidation failed, entry expires with its TTL: %s", e)
+
+    def clear(self) -> None:
+        try:
+            keys = list(self._client.scan_iter(match=self.prefix + "*"))
+            if keys:
+                self._client.delete(*keys)
+        except self._errors as e:
+            logger.warning("Cache clear failed: %s", e)
+
+
+_caches: dict[str, Any] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(namespace: str, ttl: float):
+    """
+    Return the cache for a namespace, creating it on first use.
+
+    Args:
+        namespace: Name that keeps this cache's keys apart from others
+        ttl: Seconds an entry stays valid
+
+    Returns:
+        A RedisCache when CACHE_URL is set, otherwise a LocalCache
+    """
+    with _caches_lock:
+        if namespace not in _caches:
+            if CACHE_URL:
+                _caches[namespace] = RedisCache(CACHE_URL, namespace, ttl)
+            else:
+                _caches[namespace] = LocalCache(ttl)
+        return _caches[namespace]
@@ -8,21 +8,43 @@ This module handles all interactions with GCS including:
 """
 
 import os
-import uuid
+import logging
 import datetime
-from typing import Optional, BinaryIO
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Optional, BinaryIO, Callable
+import requests
 from google.cloud import storage
 from google.oauth2 import service_account
-from pathlib import Path
+
+from .storage import HashingReader, StorageBackend
+
+logger = logging.getLogger(__name__)
 
 # Environment variables (set these in .env)
 GCS_BUCKET_NAME = os.getenv("GCS_BUCKET_NAME", "galleriq-media")
 GCS_PROJECT_ID = os.getenv("GCS_PROJECT_ID", "your-project-id")
 SERVICE_ACCOUNT_KEY_PATH = os.getenv("GOOGLE_APPLICATION_CREDENTIALS", "service-account-key.json")
 
+# Chunk size for resumable uploads. GCS requires a multiple of 256 KB.
+GCS_UPLOAD_CHUNK_SIZE = int(os.getenv("GCS_UPLOAD_CHUNK_SIZE", str(8 * 1024 * 1024)))
+GCS_CHUNK_ALIGNMENT = 256 * 1024
+# Largest file sent as a single multipart request (the client library's limit)
+GCS_MULTIPART_MAX_SIZE = min(GCS_UPLOAD_CHUNK_SIZE, 8 * 1024 * 1024)
+
+# How objects are made publicly readable:
+#   "bucket" - the bucket grants allUsers:objectViewer (or uses uniform access),
+#              so uploads need no extra ACL call (see GCS_SETUP.md step 2)
+#   "object" - legacy fine-grained ACLs; every upload is followed by make_public()
+GCS_PUBLIC_ACCESS = os.getenv("GCS_PUBLIC_ACCESS", "bucket")
+
+# Bulk deletion: objects per batch request (GCS allows at most 100) and
+# how many batch requests are in flight at once
+GCS_DELETE_BATCH_SIZE = 100
+GCS_DELETE_WORKERS = int(os.getenv("GCS_DELETE_WORKERS", "8"))
+
 
-class GCSService:
-    """Service for managing Google Cloud Storage operations."""
+class GCSService(StorageBackend):
+    """Storage backend for Google Cloud Storage (STORAGE_BACKEND=gcs)."""
     
     def __init__(self):
         """Initialize GCS client with service account credentials."""
@@ -37,87 +59,102 @@ class GCSService:
             )
         else:
             # Fallback to default credentials (for local development)
-            print(f"Warning: Service account key not found at {SERVICE_ACCOUNT_KEY_PATH}")
-            print("Using default credentials. Set GOOGLE_APPLICATION_CREDENTIALS in .env")
+            logger.warning(
+                "Service account key not found at %s; using default credentials. "
+                "Set GOOGLE_APPLICATION_CREDENTIALS in .env", SERVICE_ACCOUNT_KEY_PATH
+            )
             self.client = storage.Client(project=GCS_PROJECT_ID)
         
         self.bucket = self.client.bucket(GCS_BUCKET_NAME)
+        
+        # Plain HTTP session for talking to resumable session URIs
+        self._http = requests.Session()
     
-    def _generate_blob_path(
+    def upload_stream(
         self,
+        file_obj: BinaryIO,
         user_id: str,
         trip_id: str,
         filename: str,
+        content_type: str,
         variant: str = "original"
-    ) -> str:
+    ) -> tuple[str, str, int, str]:
         """
-        Generate GCS blob path following our folder structure.
+        Stream a file to GCS in bounded chunks.
+        
+        Files larger than GCS_UPLOAD_CHUNK_SIZE are sent as a resumable upload
+        in chunks of that size, so memory use is bounded regardless of file
+        size. Size and MD5 are computed while streaming and checked against
+        what GCS stored.
         
         Args:
+            file_obj: File-like object positioned at the start of the data
             user_id: User's UUID
             trip_id: Trip's UUID
             filename: Original filename
-            variant: File variant (original, thumb, etc.)
+            content_type: MIME type (e.g., 'image/jpeg')
+            variant: File variant (original, thumb)
         
         Returns:
-            Path like: users/user_{id}/trips/trip_{id}/photo_{uuid}_{variant}.jpg
+            Tuple of (gcs_path, public_url, size_bytes, md5_hex)
         """
-        # Extract extension
-        ext = Path(filename).suffix.lower()
+        # Generate blob path
+        blob_path = self._generate_blob_path(user_id, trip_id, filename, variant)
+        
+        # Small files go up in a single multipart request; anything larger
+        # (or of unknown size) uses a chunked resumable upload
+        size = self._stream_size(file_obj)
+        if size is not None and size <= GCS_MULTIPART_MAX_SIZE:
+            blob = self.bucket.blob(blob_path)
+        else:
+            blob = self.bucket.blob(blob_path, chunk_size=GCS_UPLOAD_CHUNK_SIZE)
+        blob.content_type = content_type
         
-        # Generate unique ID for this file
-        file_uuid = str(uuid.uuid4())
+        reader = HashingReader(file_obj)
+        blob.upload_from_file(reader, content_type=content_type, size=size)
         
-        # Determine media type
-        media_type = "video" if ext in ['.mp4', '.mov', '.avi'] else "photo"
+        # GCS reports the MD5 of what it stored; make sure it matches what we sent
+        if blob.md5_hash and blob.md5_hash != reader.md5_base64:
+            self.delete_file(blob_path)
+            raise ValueError(f"Checksum mismatch uploading {blob_path}")
         
-        # Build path
-        path = f"users/user_{user_id}/trips/trip_{trip_id}/{media_type}_{file_uuid}_{variant}{ext}"
+        if GCS_PUBLIC_ACCESS == "object":
+            blob.make_public()
         
-        return path
+        return blob_path, self.get_public_url(blob_path), reader.size_bytes, reader.md5_hex
     
-    def upload_file(
+    def upload_variant(
         self,
-        file_obj: BinaryIO,
-        user_id: str,
-        trip_id: str,
-        filename: str,
-        content_type: str,
-        variant: str = "original"
+        original_path: str,
+        variant: str,
+        data: bytes,
+        content_type: str = "image/webp",
+        ext: str = ".webp"
     ) -> tuple[str, str]:
         """
-        Upload a file to GCS.
+        Upload a generated rendition (thumbnail, preview) of an original.
+        
+        Renditions never change once written, so they are cached aggressively.
         
         Args:
-            file_obj: File-like object to upload
-            user_id: User's UUID
-            trip_id: Trip's UUID
-            filename: Original filename
-            content_type: MIME type (e.g., 'image/jpeg')
-            variant: File variant (original, thumb)
+            original_path: Path of the original in bucket
+            variant: Variant name (thumb, medium)
+            data: Encoded rendition
+            content_type: MIME type of the rendition
+            ext: Extension of the rendition
         
         Returns:
             Tuple of (gcs_path, public_url)
         """
-        # Generate blob path
-        blob_path = self._generate_blob_path(user_id, trip_id, filename, variant)
-        
-        # Create blob
+        blob_path = self.variant_path(original_path, variant, ext)
         blob = self.bucket.blob(blob_path)
+        blob.cache_control = "public, max-age=31536000, immutable"
+        blob.upload_from_string(data, content_type=content_type)
         
-        # Set content type
-        blob.content_type = content_type
-        
-        # Upload file
-        blob.upload_from_file(file_obj, content_type=content_type)
+        if GCS_PUBLIC_ACCESS == "object":
+            blob.make_public()
         
-        # Make public (since we're using public bucket strategy)
-        blob.make_public()
-        
-        # Generate public URL
-        public_url = blob.public_url
-        
-        return blob_path, public_url
+        return blob_path, self.get_public_url(blob_path)
     
     def delete_file(self, blob_path: str) -> bool:
         """
@@ -127,63 +164,83 @@ class GCSService:
             blob_path: Relative path in bucket (e.g., users/user_123/trips/trip_456/photo.jpg)
         
         Returns:
-            True if deleted successfully, False otherwise
+            True if deleted (or already gone), False otherwise
         """
         try:
             blob = self.bucket.blob(blob_path)
             blob.delete()
             return True
         except Exception as e:
-            print(f"Error deleting {blob_path}: {e}")
+            if getattr(e, "code", None) == 404:
+                return True
+            logger.error("Error deleting %s: %s", blob_path, e)
             return False
     
-    def delete_user_folder(self, user_id: str) -> int:
+    def delete_prefix(
+        self,
+        prefix: str,
+        progress: Optional[Callable[[int], None]] = None
+    ) -> int:
         """
-        Delete all files for a user (when account is deleted).
+        Delete every object under a prefix using batched, parallel requests.
+        
+        Objects are listed a page at a time and deleted in batch requests of
+        GCS_DELETE_BATCH_SIZE, with up to GCS_DELETE_WORKERS batches in flight.
+        Deletion is idempotent, so an interrupted run is resumed by simply
+        calling this again: only the objects that are left get listed.
         
         Args:
-            user_id: User's UUID
+            prefix: Folder prefix (e.g., users/user_123/)
+            progress: Optional callback receiving the running deleted count
         
         Returns:
             Number of files deleted
         """
-        prefix = f"users/user_{user_id}/"
-        blobs = self.bucket.list_blobs(prefix=prefix)
-        
         deleted_count = 0
-        for blob in blobs:
-            try:
-                blob.delete()
-                deleted_count += 1
-            except Exception as e:
-                print(f"Error deleting {blob.name}: {e}")
-        
-        return deleted_count
-    
-    def delete_trip_folder(self, user_id: str, trip_id: str) -> int:
-        """
-        Delete all files for a specific trip.
+        pending = set()
         
-        Args:
-            user_id: User's UUID
-            trip_id: Trip's UUID
+        def collect(done):
+            nonlocal deleted_count
+            for future in done:
+                deleted_count += future.result()
+            if done and progress:
+                progress(deleted_count)
         
-        Returns:
-            Number of files deleted
-        """
-        prefix = f"users/user_{user_id}/trips/trip_{trip_id}/"
-        blobs = self.bucket.list_blobs(prefix=prefix)
-        
-        deleted_count = 0
-        for blob in blobs:
-            try:
-                blob.delete()
-                deleted_count += 1
-            except Exception as e:
-                print(f"Error deleting {blob.name}: {e}")
+        with ThreadPoolExecutor(max_workers=GCS_DELETE_WORKERS) as executor:
+            names = []
+            blobs = self.bucket.list_blobs(prefix=prefix, page_size=1000, fields="items(name),nextPageToken")
+            for blob in blobs:
+                names.append(blob.name)
+                if len(names) == GCS_DELETE_BATCH_SIZE:
+                    # Bound memory: don't list further ahead than the workers can delete
+                    if len(pending) >= GCS_DELETE_WORKERS * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        collect(done)
+                    pending.add(executor.submit(self._delete_batch, names))
+                    names = []
+            if names:
+                pending.add(executor.submit(self._delete_batch, names))
+            
+            done, _ = wait(pending)
+            collect(done)
         
         return deleted_count
     
+    def _delete_batch(self, names: list[str]) -> int:
+        """Delete up to GCS_DELETE_BATCH_SIZE objects in one batch request."""
+        try:
+            # Raises if the batch request or any delete in it failed
+            with self.client.batch():
+                for name in names:
+                    self.bucket.delete_blob(name)
+            return len(names)
+        except Exception as e:
+            # Which deletes failed isn't reported, so redo them one request per
+            # object; those already deleted (by this batch or an interrupted
+            # run) come back 404 and count as deleted
+            logger.warning("Batch delete failed, retrying individually: %s", e)
+            return sum(1 for name in names if self.delete_file(name))
+    
     def get_public_url(self, blob_path: str) -> str:
         """
         Get public URL for a blob.
@@ -196,6 +253,21 @@ class GCSService:
         """
         return f"https://storage.googleapis.com/{GCS_BUCKET_NAME}/{blob_path}"
 
+    def get_blob_path(self, public_url: str) -> Optional[str]:
+        """
+        Inverse of get_public_url.
+        
+        Args:
+            public_url: Public HTTPS URL of a blob in our bucket
+        
+        Returns:
+            Relative path in bucket, or None if the URL is not one of ours
+        """
+        prefix = f"https://storage.googleapis.com/{GCS_BUCKET_NAME}/"
+        if not public_url or not public_url.startswith(prefix):
+            return None
+        return public_url[len(prefix):]
+
     def generate_signed_url(self, blob_path: str, filename: str, expiration_mins: int = 15) -> str:
         """
         Generate a signed URL for a blob with content disposition.
@@ -219,31 +291,171 @@ class GCSService:
             )
             return url
         except Exception as e:
-            print(f"Error generating signed URL: {e}")
+            logger.error("Error generating signed URL: %s", e)
             # Fallback to public URL if signing fails (e.g. no credentials)
             return self.get_public_url(blob_path)
 
-    def get_file_stream(self, blob_path: str):
+    def generate_upload_url(
+        self,
+        user_id: str,
+        trip_id: str,
+        filename: str,
+        content_type: str,
+        expiration_mins: int = 15
+    ) -> tuple[str, str]:
         """
-        Get a stream of the file content.
+        Generate a V4 signed URL the client can PUT the file to directly.
+        
+        Args:
+            user_id: User's UUID
+            trip_id: Trip's UUID
+            filename: Original filename
+            content_type: MIME type the client must send with the PUT
+            expiration_mins: URL expiration in minutes
+        
+        Returns:
+            Tuple of (gcs_path, upload_url)
+        """
+        blob_path = self._generate_blob_path(user_id, trip_id, filename)
+        blob = self.bucket.blob(blob_path)
+        
+        upload_url = blob.generate_signed_url(
+            version="v4",
+            expiration=datetime.timedelta(minutes=expiration_mins),
+            method="PUT",
+            content_type=content_type
+        )
+        return blob_path, upload_url
+
+    def get_file_info(self, blob_path: str) -> Optional[dict]:
+        """
+        Fetch metadata for an uploaded object.
         
         Args:
             blob_path: Relative path in bucket
         
         Returns:
-            File-like object
+            Dict with size_bytes, content_type and md5_hash, or None if missing
+        """
+        blob = self.bucket.get_blob(blob_path)
+        if blob is None:
+            return None
+        return {
+            "size_bytes": blob.size,
+            "content_type": blob.content_type,
+            "md5_hash": blob.md5_hash,
+        }
+
+    def make_public(self, blob_path: str) -> str:
         """
+        Grant public read on an existing object.
+        
+        A no-op when the bucket itself is public (GCS_PUBLIC_ACCESS=bucket).
+        
+        Args:
+            blob_path: Relative path in bucket
+        
+        Returns:
+            Public HTTPS URL
+        """
+        if GCS_PUBLIC_ACCESS == "object":
+            self.bucket.blob(blob_path).make_public()
+        return self.get_public_url(blob_path)
+
+    def create_resumable_session(
+        self,
+        user_id: str,
+        trip_id: str,
+        filename: str,
+        content_type: str,
+        size_bytes: int
+    ) -> tuple[str, str]:
+        """
+        Open a GCS resumable upload session for a file of known size.
+        
+        Args:
+            user_id: User's UUID
+            trip_id: Trip's UUID
+            filename: Original filename
+            content_type: MIME type of the file
+            size_bytes: Total size of the file
+        
+        Returns:
+            Tuple of (gcs_path, session_url)
+        """
+        blob_path = self._generate_blob_path(user_id, trip_id, filename)
         blob = self.bucket.blob(blob_path)
-        return blob.open("rb")
+        
+        session_url = blob.create_resumable_upload_session(
+            content_type=content_type,
+            size=size_bytes
+        )
+        return blob_path, session_url
 
+    def upload_chunk(self, session_url: str, data: bytes, offset: int, total_size: int) -> int:
+        """
+        Send one chunk of a resumable upload.
+        
+        Every chunk except the last must be a multiple of 256 KB.
+        
+        Args:
+            session_url: Resumable session URI
+            data: Chunk payload
+            offset: Byte offset of the first byte of data
+            total_size: Total size of the file
+        
+        Returns:
+            Number of bytes GCS has committed after this chunk
+        """
+        end = offset + len(data) - 1
+        response = self._http.put(
+            session_url,
+            data=data,
+            headers={"Content-Range": f"bytes {offset}-{end}/{total_size}"}
+        )
+        return self._committed_bytes(response, total_size)
 
-# Singleton instance
-_gcs_service: Optional[GCSService] = None
+    def get_committed_bytes(self, session_url: str, total_size: int) -> int:
+        """
+        Ask GCS how much of a resumable upload it has committed.
+        
+        Args:
+            session_url: Resumable session URI
+            total_size: Total size of the file
+        
+        Returns:
+            Number of bytes committed so far
+        """
+        response = self._http.put(
+            session_url,
+            headers={"Content-Range": f"bytes */{total_size}"}
+        )
+        return self._committed_bytes(response, total_size)
 
+    @staticmethod
+    def _committed_bytes(response: requests.Response, total_size: int) -> int:
+        """Parse the committed offset out of a resumable upload response."""
+        if response.status_code in (200, 201):
+            return total_size
+        if response.status_code == 308:
+            # Range: bytes=0-<last committed byte>; absent means nothing yet
+            range_header = response.headers.get("Range")
+            if not range_header:
+                return 0
+            return int(range_header.split("-")[-1]) + 1
+        raise RuntimeError(
+            f"Resumable upload failed ({response.status_code}): {response.text}"
+        )
 
-def get_gcs_service() -> GCSService:
-    """Get or create GCS service singleton."""
-    global _gcs_service
-    if _gcs_service is None:
-        _gcs_service = GCSService()
-    return _gcs_service
+    def get_file_stream(self, blob_path: str):
+        """
+        Get a stream of the file content.
+        
+        Args:
+            blob_path: Relative path in bucket
+        
+        Returns:
+            File-like object
+        """
+        blob = self.bucket.blob(blob_path)
+        return blob.open("rb")
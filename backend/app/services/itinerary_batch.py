@@ -0,0 +1,331 @@
+"""
+Batched itinerary writes: POST /itinerary/trips/{id}/batch.
+
+A batch mixes creates, updates and deletes of a trip's days, activities and
+packing items, and is applied in one transaction: all of it or none. Rows
+created in the batch get their UUIDs here, so other operations can refer to
+them by the client's `ref` (an activity created on a day created in the same
+batch, say).
+
+Operations are applied by kind, not one by one: every create (days, then
+activities, then packing items), then every update, then every delete. Each
+kind is one statement per entity type (an executemany for inserts and
+per-row updates), whatever the batch size.
+
+The statements bypass the flush, so the version bump, row stamps and
+tombstones that itinerary_sync.py does for ORM writes are done here.
+
+An executemany doesn't say which of its rows broke a constraint. When one
+does, the batch is rolled back and its writes replayed row by row to find
+the operation to blame; only failed batches pay for that.
+"""
+
+import os
+import uuid
+from collections import defaultdict
+from uuid import UUID
+
+from fastapi import HTTPException
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from sqlalchemy import delete, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..models.itinerary_trip import ItineraryTrip
+from ..models.itinerary_day import ItineraryDay
+from ..models.itinerary_activity import ItineraryActivity
+from ..models.itinerary_packing import ItineraryPackingList
+from ..models.itinerary_tombstone import ItineraryTombstone
+from ..schemas.itinerary import (
+    ItineraryBatchActivityCreate, ItineraryBatchOperation,
+    ItineraryDayCreate, ItineraryDayUpdate, ItineraryActivityUpdate,
+    ItineraryPackingItemCreate, ItineraryPackingItemUpdate
+)
+from .itinerary_sync import ENTITY_TYPES, bump_version
+from .jobs import enqueue
+from .storage import get_storage
+
+# Most operations one batch may hold
+BATCH_MAX_OPERATIONS = int(os.getenv("ITINERARY_BATCH_MAX_OPERATIONS", "1000"))
+
+MODELS = {entity_type: model for model, entity_type in ENTITY_TYPES.items()}
+NOT_FOUND = {"day": "Day not found", "activity": "Activity not found", "packing_item": "Packing item not found"}
+
+# Schema of each operation's data
+SCHEMAS = {
+    ("create", "day"): ItineraryDayCreate,
+    ("create", "activity"): ItineraryBatchActivityCreate,
+    ("create", "packing_item"): ItineraryPackingItemCreate,
+    ("update", "day"): ItineraryDayUpdate,
+    ("update", "activity"): ItineraryActivityUpdate,
+    ("update", "packing_item"): ItineraryPackingItemUpdate,
+}
+
+# Order entities are inserted in (activities need their day)
+CREATE_ORDER = ("day", "activity", "packing_item")
+
+
+def _fail(index: int, detail: str, status_code: int = 400):
+    raise HTTPException(status_code=status_code, detail=f"Operation {index}: {detail}")
+
+
+def _parse(operations: list[ItineraryBatchOperation]) -> list:
+    """Validate each operation's data; returns the parsed models (None for deletes)."""
+    parsed = []
+    refs = set()
+    for index, operation in enumerate(operations):
+        if operation.op == "create":
+            if operation.id is not None:
+                _fail(index, "create takes a ref, not an id")
+            if operation.ref is not None:
+                if operation.ref in refs:
+                    _fail(index, f"ref {operation.ref!r} is used twice")
+                refs.add(operation.ref)
+        elif operation.id is None:
+            _fail(index, f"{operation.op} needs an id")
+
+        schema = SCHEMAS.get((operation.op, operation.entity))
+        if schema is None:
+            parsed.append(None)
+            continue
+        try:
+            parsed.append(schema.model_validate(operation.data))
+        except ValidationError as e:
+            raise RequestValidationError([
+                {**error, "loc": ("body", "operations", index, "data", *error["loc"])}
+                for error in e.errors(include_url=False)
+            ])
+    return parsed
+
+
+def _violation(error: IntegrityError) -> tuple[int, str]:
+    """Status code and message for a constraint a batch broke."""
+    orig = error.orig
+    diag = getattr(orig, "diag", None)  # psycopg2
+    if diag is not None:
+        code, constraint, column = getattr(orig, "pgcode", None), diag.constraint_name, diag.column_name
+    else:
+        # SQLite only puts it in the message, e.g. "NOT NULL constraint failed: itinerary_days.title"
+        message = str(orig)
+        code = "23502" if message.startswith("NOT NULL") else "23503" if message.startswith("FOREIGN KEY") else None
+        constraint = "uq_trip_day_number" if "itinerary_days.trip_id, itinerary_days.day_number" in message else None
+        column = message.rsplit(".", 1)[-1] if code == "23502" else None
+    if constraint == "uq_trip_day_number":
+        return 409, "the trip already has a day with this day number"
+    if code == "23502":
+        return 422, f"{column} cannot be null"
+    if code == "23503":
+        return 422, "refers to a row that does not exist"
+    return 422, "breaks a constraint of the trip's rows"
+
+
+def _find_failing(db: Session, trip_id: UUID, statements: list, error: IntegrityError) -> tuple:
+    """
+    Replay a failed batch's writes one row at a time to find the operation that failed.
+
+    Runs in a transaction of its own, which the caller rolls back.
+
+    Returns:
+        (index of the operation, its error), or (None, the original error) if
+        every row goes in (a concurrent write changed the rows in between)
+    """
+    # Holds off other writers as the batch did; also a write, so SQLite
+    # begins the transaction (a savepoint on its own would commit)
+    bump_version(db, trip_id)
+    for statement, rows, indexes in statements:
+        for row, index in zip(rows, indexes):
+            try:
+                with db.begin_nested():
+                    db.execute(statement, [row])
+            except IntegrityError as e:
+                return index, e
+    return None, error
+
+
+def _existing(db: Session, trip_id: UUID, wanted: dict) -> dict:
+    """Of the ids wanted per entity type, those that belong to the trip."""
+    found = {}
+    if wanted["day"]:
+        found["day"] = set(db.scalars(
+            select(ItineraryDay.id).where(ItineraryDay.trip_id == trip_id, ItineraryDay.id.in_(wanted["day"]))
+        ))
+    if wanted["activity"]:
+        found["activity"] = set(db.scalars(
+            select(ItineraryActivity.id).join(ItineraryDay, ItineraryActivity.day_id == ItineraryDay.id).where(
+                ItineraryDay.trip_id == trip_id, ItineraryActivity.id.in_(wanted["activity"])
+            )
+        ))
+    if wanted["packing_item"]:
+        found["packing_item"] = set(db.scalars(
+            select(ItineraryPackingList.id).where(
+                ItineraryPackingList.trip_id == trip_id, ItineraryPackingList.id.in_(wanted["packing_item"])
+            )
+        ))
+    return found
+
+
+def apply_batch(
+    db: Session,
+    trip_id: UUID,
+    user_id: UUID,
+    operations: list[ItineraryBatchOperation]
+) -> tuple[int, list[dict]]:
+    """
+    Apply a batch to a trip and commit it.
+
+    Args:
+        db: Database session
+        trip_id: Trip the caller may edit
+        user_id: Caller, recorded as creator of new activities and items
+        operations: The batch
+
+    Returns:
+        (new trip version, one result per operation with its row's id)
+
+    Raises:
+        HTTPException: 400 for an invalid operation, 404 for a row not in
+            the trip, 409 for a day number the trip already has, 422 for an
+            operation that breaks another constraint (a required field set
+            to null); nothing is written
+        RequestValidationError: an operation's data is invalid
+    """
+    if len(operations) > BATCH_MAX_OPERATIONS:
+        raise HTTPException(status_code=400, detail=f"A batch may hold at most {BATCH_MAX_OPERATIONS} operations")
+    if not operations:
+        return db.scalar(select(ItineraryTrip.version).where(ItineraryTrip.id == trip_id)), []
+    parsed = _parse(operations)
+
+    # Ids for the rows to create, so other operations can use them
+    created = {}  # ref -> (entity, id)
+    ids = []
+    for operation in operations:
+        if operation.op == "create":
+            new_id = uuid.uuid4()
+            if operation.ref is not None:
+                created[operation.ref] = (operation.entity, new_id)
+            ids.append(new_id)
+        else:
+            ids.append(None)
+
+    def resolve(index: int, value: str, entity: str):
+        """Id a value stands for: a ref from this batch, or a UUID of an existing row."""
+        if value in created:
+            ref_entity, ref_id = created[value]
+            if ref_entity != entity:
+                _fail(index, f"ref {value!r} is not a {entity}")
+            return ref_id, False
+        try:
+            return UUID(value), True
+        except ValueError:
+            _fail(index, f"unknown ref {value!r}")
+
+    # Rows outside the batch that operations name, checked against the trip at once
+    wanted = defaultdict(set)
+    named = []  # (index, entity, id) of existing rows
+    activity_days = {}  # index of an activity create -> its day's id
+    for index, (operation, data) in enumerate(zip(operations, parsed)):
+        if operation.op == "create":
+            if operation.entity == "activity":
+                day_id, existing = resolve(index, data.day_id, "day")
+                activity_days[index] = day_id
+                if existing:
+                    named.append((index, "day", day_id))
+        else:
+            row_id, existing = resolve(index, operation.id, operation.entity)
+            ids[index] = row_id
+            if existing:
+                named.append((index, operation.entity, row_id))
+    for _, entity, row_id in named:
+        wanted[entity].add(row_id)
+
+    # Taken first: holds off other writers to the trip until commit
+    version = bump_version(db, trip_id)
+    found = _existing(db, trip_id, wanted)
+    for index, entity, row_id in named:
+        if row_id not in found[entity]:
+            _fail(index, NOT_FOUND[entity], status_code=404)
+
+    inserts = defaultdict(list)
+    updates = defaultdict(dict)  # entity -> id -> values; later updates of a row win field by field
+    deletes = defaultdict(set)
+    row_indexes = defaultdict(list)  # entity -> operation index per insert row
+    update_indexes = defaultdict(dict)  # entity -> id -> last operation updating the row
+    for index, (operation, data) in enumerate(zip(operations, parsed)):
+        row_id = ids[index]
+        if operation.op == "create":
+            row = {"id": row_id, "version": version, **data.model_dump()}
+            if operation.entity == "activity":
+                row.update(day_id=activity_days[index], created_by=user_id)
+            else:
+                row["trip_id"] = trip_id
+                if operation.entity == "packing_item":
+                    row["added_by"] = user_id
+            inserts[operation.entity].append(row)
+            row_indexes[operation.entity].append(index)
+        elif operation.op == "update":
+            values = updates[operation.entity].setdefault(row_id, {"id": row_id, "version": version})
+            values.update(data.model_dump(exclude_unset=True))
+            update_indexes[operation.entity][row_id] = index
+        else:
+            deletes[operation.entity].add(row_id)
+
+    # (statement, rows, operation index per row), in the order they run
+    statements = [
+        (insert(MODELS[entity]), inserts[entity], row_indexes[entity]) for entity in CREATE_ORDER if inserts[entity]
+    ] + [
+        (update(MODELS[entity]), list(rows.values()), list(update_indexes[entity].values()))
+        for entity, rows in updates.items()
+    ]
+    try:
+        for statement, rows, _ in statements:
+            db.execute(statement, rows)
+        _delete(db, trip_id, version, deletes)
+        db.commit()
+    except IntegrityError as error:
+        db.rollback()
+        try:
+            index, error = _find_failing(db, trip_id, statements, error)
+        finally:
+            db.rollback()
+        status_code, detail = _violation(error)
+        if index is None:
+            raise HTTPException(status_code=status_code, detail=f"An operation {detail}")
+        _fail(index, detail, status_code=status_code)
+
+    results = [
+        {"op": operation.op, "entity": operation.entity, "id": ids[index], "ref": operation.ref}
+        for index, operation in enumerate(operations)
+    ]
+    return version, results
+
+
+def _delete(db: Session, trip_id: UUID, version: int, deletes: dict):
+    """Delete rows, leaving tombstones and queueing removal of activity photos."""
+    day_ids = deletes["day"]
+    # A day's activities go with it
+    activities = db.execute(
+        select(ItineraryActivity.id, ItineraryActivity.image_url).where(
+            or_(ItineraryActivity.id.in_(deletes["activity"]), ItineraryActivity.day_id.in_(day_ids))
+        )
+    ).all() if deletes["activity"] or day_ids else []
+    activity_ids = {row.id for row in activities}
+
+    gone = [("activity", activity_ids), ("day", day_ids), ("packing_item", deletes["packing_item"])]
+    for entity, row_ids in gone:
+        if row_ids:
+            model = MODELS[entity]
+            db.execute(delete(model).where(model.id.in_(row_ids)).execution_options(synchronize_session=False))
+    tombstones = [
+        {"trip_id": trip_id, "entity_type": entity, "entity_id": row_id, "version": version}
+        for entity, row_ids in gone for row_id in row_ids
+    ]
+    if tombstones:
+        db.execute(insert(ItineraryTombstone), tombstones)
+
+    image_urls = [row.image_url for row in activities if row.image_url]
+    if image_urls:
+        storage = get_storage()
+        paths = [path for path in map(storage.get_blob_path, image_urls) if path]
+        if paths:
+            enqueue(db, "delete_storage_objects", {"paths": paths})
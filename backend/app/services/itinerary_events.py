@@ -0,0 +1,201 @@
+"""
+Push notifications of itinerary changes.
+
+When a transaction that changed an itinerary trip commits, its new version
+(see itinerary_sync.py) is published to everyone watching the trip through
+GET /itinerary/trips/{id}/events. Messages carry only the version; clients
+fetch the rows themselves from /changes, with their own access check, so a
+notification never reveals more than that something changed.
+
+Watchers subscribe to an in-process hub. Publishing goes through a broker:
+
+- local (default): delivers straight to this process's hub. Enough for a
+  single API process; watchers connected to other processes miss the change
+  until they next sync.
+- Redis (EVENTS_URL=redis://..., defaulting to CACHE_URL): publishes to a
+  Redis channel that every API process listens on, so a change reaches
+  watchers whichever process they are connected to.
+
+Watchers only ever need the latest version, so messages for a slow watcher
+are merged rather than queued: memory per watcher is constant, whatever the
+write rate.
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from typing import Optional
+
+from .cache import CACHE_URL
+
+logger = logging.getLogger(__name__)
+
+# redis://host:6379/0 to fan changes out to every API process; unset = in-process
+EVENTS_URL = os.getenv("EVENTS_URL", CACHE_URL)
+EVENTS_CHANNEL = "itinerary:events"
+# Seconds of silence after which a stream sends a comment, so proxies keep it open
+# and a dropped client is noticed
+EVENTS_KEEPALIVE_SECONDS = float(os.getenv("EVENTS_KEEPALIVE_SECONDS", "15"))
+# Seconds between reconnection attempts when the Redis listener loses its connection
+EVENTS_RECONNECT_DELAY = 1.0
+
+
+class Subscription:
+    """One watcher of a trip, consumed from the event loop that created it."""
+
+    def __init__(self, hub: "EventHub", trip_id: str):
+        self.hub = hub
+        self.trip_id = trip_id
+        self._loop = asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+        self._pending: Optional[dict] = None
+
+    def _push(self, message: dict) -> None:
+        # Runs on the subscription's loop; keeps the newest version only
+        pending = self._pending
+        if (pending is None or message.get("deleted")
+                or (not pending.get("deleted") and message["version"] > pending["version"])):
+            self._pending = message
+        self._ready.set()
+
+    def deliver(self, message: dict) -> None:
+        """Queue a message for this watcher; safe to call from any thread."""
+        self._loop.call_soon_threadsafe(self._push, message)
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        """The next message, or None if none arrives within `timeout` seconds."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self._ready.clear()
+        message, self._pending = self._pending, None
+        return message
+
+    def close(self) -> None:
+        self.hub.unsubscribe(self)
+
+
+class EventHub:
+    """This process's watchers, by trip id."""
+
+    def __init__(self):
+        self._subscriptions: dict[str, set] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, trip_id) -> Subscription:
+        subscription = Subscription(self, str(trip_id))
+        with self._lock:
+            self._subscriptions[subscription.trip_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            watchers = self._subscriptions.get(subscription.trip_id)
+            if watchers is not None:
+                watchers.discard(subscription)
+                if not watchers:
+                    del self._subscriptions[subscription.trip_id]
+
+    def deliver(self, trip_id: str, message: dict) -> None:
+        with self._lock:
+            watchers = list(self._subscriptions.get(trip_id, ()))
+        for subscription in watchers:
+            try:
+                subscription.deliver(message)
+            except RuntimeError:
+                # Its event loop has shut down
+                self.unsubscribe(subscription)
+
+
+class LocalBroker:
+    """Delivers to watchers in this process only."""
+
+    def __init__(self, hub: EventHub):
+        self.hub = hub
+
+    def start(self) -> None:
+        pass
+
+    def publish(self, trip_id: str, message: dict) -> None:
+        self.hub.deliver(trip_id, message)
+
+
+class RedisBroker:
+    """Fans messages out to every process through a Redis pub/sub channel."""
+
+    def __init__(self, url: str, hub: EventHub):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("EVENTS_URL is set but the redis package is not installed (pip install redis)")
+        self._errors = redis.RedisError
+        self._client = redis.Redis.from_url(url)
+        self.hub = hub
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start listening to the channel (once, on the first subscription)."""
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._listen, daemon=True, name="itinerary-events").start()
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(EVENTS_CHANNEL)
+                for raw in pubsub.listen():
+                    event = json.loads(raw["data"])
+                    self.hub.deliver(event["trip_id"], event["message"])
+            except self._errors as e:
+                logger.warning("Itinerary event listener lost Redis, reconnecting: %s", e)
+                time.sleep(EVENTS_RECONNECT_DELAY)
+            except Exception:
+                logger.exception("Itinerary event listener failed, reconnecting")
+                time.sleep(EVENTS_RECONNECT_DELAY)
+
+    def publish(self, trip_id: str, message: dict) -> None:
+        try:
+            self._client.publish(EVENTS_CHANNEL, json.dumps({"trip_id": trip_id, "message": message}))
+        except self._errors as e:
+            # Other processes' watchers catch up on their next sync
+            logger.warning("Itinerary event publish failed, delivering locally only: %s", e)
+            self.hub.deliver(trip_id, message)
+
+
+hub = EventHub()
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Return the process's broker, creating it on first use."""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = RedisBroker(EVENTS_URL, hub) if EVENTS_URL else LocalBroker(hub)
+        return _broker
+
+
+def subscribe(trip_id) -> Subscription:
+    """Watch a trip; call close() on the result when done. Must run on an event loop."""
+    get_broker().start()
+    return hub.subscribe(trip_id)
+
+
+def publish_version(trip_id, version: int) -> None:
+    """Tell a trip's watchers it is now at `version`."""
+    get_broker().publish(str(trip_id), {"version": version})
+
+
+def publish_deleted(trip_id) -> None:
+    """Tell a trip's watchers it was deleted."""
+    get_broker().publish(str(trip_id), {"deleted": True})
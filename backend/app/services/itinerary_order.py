@@ -0,0 +1,94 @@
+"""
+Order indexes for a day's activities.
+
+Activities are listed by order_index. Dense ordering numbers a day 0..n-1,
+so moving one activity renumbers every activity between its old and new
+position. Gap ordering spaces indexes ORDER_INDEX_GAP apart instead, and
+a moved activity takes an index between its new neighbours: as long as
+there is room, a move rewrites that one row. When there is no room left,
+the day is renumbered with fresh gaps.
+"""
+
+from typing import Hashable, Optional, Sequence
+
+ORDER_INDEX_GAP = 1024
+
+
+def _longest_increasing(values: Sequence[Optional[int]]) -> set:
+    """Positions of a longest strictly increasing run of the non-None values."""
+    # tails[k]: position ending the best run of length k + 1 found so far
+    tails: list[int] = []
+    previous: dict[int, Optional[int]] = {}
+    for position, value in enumerate(values):
+        if value is None:
+            continue
+        low, high = 0, len(tails)
+        while low < high:
+            middle = (low + high) // 2
+            if values[tails[middle]] < value:
+                low = middle + 1
+            else:
+                high = middle
+        previous[position] = tails[low - 1] if low else None
+        if low == len(tails):
+            tails.append(position)
+        else:
+            tails[low] = position
+
+    kept = set()
+    position = tails[-1] if tails else None
+    while position is not None:
+        kept.add(position)
+        position = previous[position]
+    return kept
+
+
+def plan_order(
+    ids: Sequence[Hashable],
+    current: dict,
+    gaps: bool = False
+) -> list[int]:
+    """
+    New order indexes for a day's activities.
+
+    Args:
+        ids: The day's activities, in their new order
+        current: Current order_index of the activities already in this day
+            (moved-in activities are absent)
+        gaps: Use gap ordering, keeping as many current indexes as possible
+
+    Returns:
+        order_index for each id, strictly increasing
+    """
+    if not gaps:
+        return list(range(len(ids)))
+
+    indexes = [current.get(id_) for id_ in ids]
+    kept = _longest_increasing(indexes)
+    planned: list[Optional[int]] = [indexes[i] if i in kept else None for i in range(len(ids))]
+
+    position = 0
+    while position < len(ids):
+        if planned[position] is not None:
+            position += 1
+            continue
+        # A run of activities to place between two kept neighbours
+        end = position
+        while end < len(ids) and planned[end] is None:
+            end += 1
+        count = end - position
+        low = planned[position - 1] if position else None
+        high = planned[end] if end < len(ids) else None
+        if high is None:
+            start = -ORDER_INDEX_GAP if low is None else low
+            values = [start + ORDER_INDEX_GAP * (k + 1) for k in range(count)]
+        else:
+            if low is None:
+                low = min(-1, high - ORDER_INDEX_GAP * (count + 1))
+            if high - low - 1 < count:
+                # No room between the neighbours: renumber the whole day
+                return [ORDER_INDEX_GAP * i for i in range(len(ids))]
+            values = [low + (high - low) * (k + 1) // (count + 1) for k in range(count)]
+        planned[position:end] = values
+        position = end
+    return planned
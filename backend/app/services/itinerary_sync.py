@@ -0,0 +1,139 @@
+"""
+Per-trip change versions for itinerary delta sync.
+
+Every flush that creates, changes or deletes an itinerary trip's rows (the
+trip itself, members, days, activities, packing items) increments the trip's
+`version` once and stamps each created or changed row with the new value;
+each deleted day, activity or packing item leaves an ItineraryTombstone with
+it. GET /itinerary/trips/{id}/changes?since=N then only has to return rows
+whose version is above N.
+
+The increment is an UPDATE ... SET version = version + 1 on the trip row, so
+concurrent writers to one trip queue on that row lock until commit and
+versions become visible in order: a client that has seen version N has seen
+every change up to N.
+
+Bulk insert()/update() statements don't go through the flush; code that
+uses them must call bump_version() and stamp the rows itself.
+
+Once the transaction commits, each trip's final version is published to the
+trip's watchers (itinerary_events.py).
+"""
+
+from collections import defaultdict
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+
+from ..models.itinerary_trip import ItineraryTrip, ItineraryTripMember
+from ..models.itinerary_day import ItineraryDay
+from ..models.itinerary_activity import ItineraryActivity
+from ..models.itinerary_packing import ItineraryPackingList
+from ..models.itinerary_tombstone import ItineraryTombstone
+from . import itinerary_events
+
+# Tombstone entity_type per model
+ENTITY_TYPES = {
+    ItineraryDay: "day",
+    ItineraryActivity: "activity",
+    ItineraryPackingList: "packing_item",
+}
+
+# session.info keys: trip id -> version to publish on commit, and deleted trip ids
+PENDING_VERSIONS = "itinerary_versions"
+PENDING_DELETES = "itinerary_deleted_trips"
+
+
+def bump_version(session: Session, trip_id: UUID) -> Optional[int]:
+    """Increment a trip's version; returns the new value (None if the trip is gone)."""
+    version = session.execute(
+        update(ItineraryTrip).where(ItineraryTrip.id == trip_id).values(
+            version=ItineraryTrip.version + 1
+        ).returning(ItineraryTrip.version)
+    ).scalar()
+    if version is not None:
+        session.info.setdefault(PENDING_VERSIONS, {})[trip_id] = version
+    return version
+
+
+def _day_trip_ids(session: Session, day_ids: set) -> dict:
+    """trip_id of each day, from the session where possible."""
+    trip_ids = {}
+    for obj in list(session.new) + list(session.identity_map.values()):
+        if isinstance(obj, ItineraryDay) and obj.id in day_ids and "trip_id" in obj.__dict__:
+            trip_ids[obj.id] = obj.trip_id
+    missing = day_ids - trip_ids.keys()
+    if missing:
+        trip_ids.update(session.execute(
+            select(ItineraryDay.id, ItineraryDay.trip_id).where(ItineraryDay.id.in_(missing))
+        ).all())
+    return trip_ids
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_itinerary_changes(session, flush_context, instances):
+    changed = [(obj, False) for obj in session.new] + [
+        (obj, False) for obj in session.dirty if session.is_modified(obj, include_collections=False)
+    ] + [(obj, True) for obj in session.deleted]
+
+    deleted_trips = {obj.id for obj, deleted in changed if deleted and isinstance(obj, ItineraryTrip)}
+    if deleted_trips:
+        session.info.setdefault(PENDING_DELETES, set()).update(deleted_trips)
+    day_ids = {
+        obj.day_id for obj, _ in changed
+        if isinstance(obj, ItineraryActivity) and obj.day_id is not None
+    }
+    day_trips = _day_trip_ids(session, day_ids) if day_ids else {}
+
+    # trip_id -> [(row, deleted)]
+    by_trip = defaultdict(list)
+    for obj, deleted in changed:
+        if isinstance(obj, ItineraryTrip):
+            # A new trip starts at version 0; a deleted one takes its rows with it
+            if obj.id is not None and not deleted and obj not in session.new:
+                by_trip[obj.id]
+        elif isinstance(obj, (ItineraryTripMember, ItineraryDay, ItineraryPackingList)):
+            by_trip[obj.trip_id].append((obj, deleted))
+        elif isinstance(obj, ItineraryActivity):
+            trip_id = day_trips.get(obj.day_id)
+            if trip_id is None and obj.day is not None:
+                trip_id = obj.day.trip_id
+            by_trip[trip_id].append((obj, deleted))
+
+    for trip_id, rows in by_trip.items():
+        if trip_id is None or trip_id in deleted_trips:
+            continue
+        version = bump_version(session, trip_id)
+        if version is None:
+            continue
+        for obj, deleted in rows:
+            entity_type = ENTITY_TYPES.get(type(obj))
+            if entity_type is None:
+                continue
+            if deleted:
+                session.add(ItineraryTombstone(
+                    trip_id=trip_id, entity_type=entity_type, entity_id=obj.id, version=version
+                ))
+            else:
+                obj.version = version
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_itinerary_changes(session):
+    versions = session.info.pop(PENDING_VERSIONS, {})
+    deleted = session.info.pop(PENDING_DELETES, set())
+    for trip_id, version in versions.items():
+        if trip_id not in deleted:
+            itinerary_events.publish_version(trip_id, version)
+    for trip_id in deleted:
+        itinerary_events.publish_deleted(trip_id)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_itinerary_changes(session, transaction):
+    # Rolled back: nothing to announce
+    if transaction.parent is None:
+        session.info.pop(PENDING_VERSIONS, None)
+        session.info.pop(PENDING_DELETES, None)
@@ -0,0 +1,63 @@
+"""
+Handlers for background jobs.
+
+Each handler is called as handler(db, **payload) by the job worker. Handlers
+should be idempotent: a job may run more than once if a worker dies after
+doing the work but before recording it as done.
+"""
+
+import logging
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from ..models.media import Media
+from ..models.trip import Trip
+from .gcs import GCS_DELETE_BATCH_SIZE
+from .storage import get_storage
+from .jobs import job_handler
+from .thumbnails import generate_thumbnails
+
+logger = logging.getLogger(__name__)
+
+
+@job_handler("generate_thumbnails")
+def handle_generate_thumbnails(db: Session, media_id: str):
+    generate_thumbnails(db, UUID(media_id))
+
+
+@job_handler("delete_storage_objects")
+def handle_delete_storage_objects(db: Session, paths: list[str]):
+    storage = get_storage()
+    failed = [path for path in paths if not storage.delete_file(path)]
+    if failed:
+        # Retried with backoff; the paths already deleted count as done next time
+        raise RuntimeError(f"Could not delete {len(failed)} of {len(paths)} objects, e.g. {failed[0]}")
+
+
+@job_handler("delete_user_storage")
+def handle_delete_user_storage(db: Session, user_id: str):
+    # Safe to retry after a crash: a rerun only lists what is left
+    def report(deleted_count: int):
+        if deleted_count % 5000 < GCS_DELETE_BATCH_SIZE:
+            logger.info("Deleting GCS files for user %s: %s so far", user_id, deleted_count)
+
+    deleted_count = get_storage().delete_user_folder(user_id, progress=report)
+    logger.info("Deleted %s files from GCS for user %s", deleted_count, user_id)
+
+
+@job_handler("refresh_trip_cover")
+def handle_refresh_trip_cover(db: Session, trip_id: str, removed_url: str):
+    """Replace a trip's cover photo if it pointed at removed media."""
+    trip = db.query(Trip).filter(Trip.id == UUID(trip_id)).first()
+    if not trip or trip.cover_photo_url != removed_url:
+        return
+
+    # Find a replacement (latest photo)
+    latest_media = db.query(Media).filter(
+        Media.trip_id == trip.id,
+        Media.status == "ready"
+    ).order_by(Media.created_at.desc()).first()
+
+    trip.cover_photo_url = latest_media.public_url if latest_media else None
+    db.commit()
@@ -0,0 +1,194 @@
+"""
+Database-backed background job queue.
+
+Routers enqueue work into the `jobs` table as part of their own transaction,
+so a job exists if and only if the request's write committed. Worker
+processes (`python -m app.worker`) claim jobs with SELECT ... FOR UPDATE
+SKIP LOCKED, run the registered handler, and retry failures with exponential
+backoff. A claimed job stays invisible to other workers for
+JOB_VISIBILITY_TIMEOUT seconds, and its worker renews that lease while the
+handler runs; if the worker dies the lease runs out and the job is picked up
+again.
+"""
+
+import os
+import time
+import logging
+import threading
+import traceback
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import or_, and_, update
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models.job import Job
+
+logger = logging.getLogger(__name__)
+
+JOB_VISIBILITY_TIMEOUT = int(os.getenv("JOB_VISIBILITY_TIMEOUT", "300"))  # seconds
+JOB_BACKOFF_BASE = int(os.getenv("JOB_BACKOFF_BASE", "10"))  # seconds
+JOB_BACKOFF_MAX = int(os.getenv("JOB_BACKOFF_MAX", "3600"))  # seconds
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))  # seconds
+# A running job's lease is renewed this often, well within the timeout
+JOB_HEARTBEAT_INTERVAL = JOB_VISIBILITY_TIMEOUT / 3  # seconds
+
+# Job kind -> handler(db, **payload)
+_handlers: dict[str, Callable] = {}
+
+
+def job_handler(kind: str):
+    """Register a function as the handler for a job kind."""
+    def decorator(func: Callable) -> Callable:
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+def enqueue(db: Session, kind: str, payload: dict, delay: int = 0, max_attempts: int = 5) -> Job:
+    """
+    Add a job to the caller's session.
+
+    The job is not committed here; it is written atomically with whatever
+    else the caller commits.
+
+    Args:
+        db: Request's database session
+        kind: Registered handler name
+        payload: JSON-serializable keyword arguments for the handler
+        delay: Seconds before the job becomes eligible
+        max_attempts: Attempts before the job is marked failed
+
+    Returns:
+        The pending Job
+    """
+    job = Job(
+        kind=kind,
+        payload=payload,
+        status="queued",
+        max_attempts=max_attempts,
+        run_at=datetime.utcnow() + timedelta(seconds=delay)
+    )
+    db.add(job)
+    return job
+
+
+def claim_next(db: Session) -> Optional[Job]:
+    """
+    Claim the next eligible job, or return None if there is none.
+
+    Eligible means queued and due, or running with an expired visibility
+    timeout (its worker died or stalled).
+    """
+    now = datetime.utcnow()
+    job = db.query(Job).filter(
+        or_(
+            and_(Job.status == "queued", Job.run_at <= now),
+            and_(Job.status == "running", Job.locked_until < now)
+        )
+    ).order_by(Job.run_at).with_for_update(skip_locked=True).first()
+
+    if not job:
+        db.rollback()
+        return None
+
+    job.status = "running"
+    job.attempts += 1
+    job.locked_until = now + timedelta(seconds=JOB_VISIBILITY_TIMEOUT)
+    db.commit()
+    return job
+
+
+def _heartbeat(job_id, attempt: int, stop_event: threading.Event):
+    """Renew a running job's lease until stop_event is set."""
+    while not stop_event.wait(JOB_HEARTBEAT_INTERVAL):
+        # Own session: the handler's is not shared across threads
+        db = SessionLocal()
+        try:
+            # Only while this attempt still holds the job
+            renewed = db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == "running", Job.attempts == attempt)
+                .values(locked_until=datetime.utcnow() + timedelta(seconds=JOB_VISIBILITY_TIMEOUT))
+            ).rowcount
+            db.commit()
+            if not renewed:
+                return
+        except Exception as e:
+            db.rollback()
+            logger.warning("Could not renew lease of job %s: %s", job_id, e)
+        finally:
+            db.close()
+
+
+def run_job(db: Session, job: Job) -> bool:
+    """
+    Run a claimed job and record the outcome.
+
+    Returns:
+        True if the handler succeeded
+    """
+    handler = _handlers.get(job.kind)
+    stop_heartbeat = threading.Event()
+    threading.Thread(
+        target=_heartbeat, args=(job.id, job.attempts, stop_heartbeat), daemon=True, name=f"job-heartbeat-{job.id}"
+    ).start()
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job kind '{job.kind}'")
+        try:
+            handler(db, **(job.payload or {}))
+        finally:
+            stop_heartbeat.set()
+        job.status = "done"
+        job.last_error = None
+        job.locked_until = None
+        db.commit()
+        return True
+    except Exception:
+        db.rollback()
+        job.last_error = traceback.format_exc()[-4000:]
+        job.locked_until = None
+        if job.attempts >= job.max_attempts:
+            job.status = "failed"
+        else:
+            backoff = min(JOB_BACKOFF_BASE * 2 ** (job.attempts - 1), JOB_BACKOFF_MAX)
+            job.status = "queued"
+            job.run_at = datetime.utcnow() + timedelta(seconds=backoff)
+        db.commit()
+        logger.warning("Job %s (%s) attempt %s failed; status=%s", job.id, job.kind, job.attempts, job.status)
+        return False
+
+
+def run_pending(limit: Optional[int] = None) -> int:
+    """
+    Drain eligible jobs until none are left (or limit is reached).
+
+    Returns:
+        Number of jobs processed
+    """
+    processed = 0
+    db = SessionLocal()
+    try:
+        while limit is None or processed < limit:
+            job = claim_next(db)
+            if job is None:
+                break
+            run_job(db, job)
+            processed += 1
+    finally:
+        db.close()
+    return processed
+
+
+def run_worker(stop_event: Optional[threading.Event] = None):
+    """Poll for and run jobs until stop_event is set."""
+    stop_event = stop_event or threading.Event()
+    while not stop_event.is_set():
+        try:
+            if run_pending() == 0:
+                stop_event.wait(JOB_POLL_INTERVAL)
+        except Exception as e:
+            logger.exception("Job worker error: %s", e)
+            time.sleep(JOB_POLL_INTERVAL)
@@ -0,0 +1,327 @@
+"""
+Local-disk storage backend (STORAGE_BACKEND=local).
+
+Objects are files under LOCAL_STORAGE_ROOT at their blob path. The API
+serves them itself from /files (routers/files.py) with file responses, which
+the server sends with sendfile where it supports it, so bytes go from the
+page cache to the socket without passing through Python.
+
+What GCS does with signed URLs is done with HMAC-signed links to that same
+route: GET links for downloads, PUT links for direct uploads. Resumable
+uploads are written to a ".part" file next to the target and renamed into
+place when the last byte arrives. Every write lands in a temporary file
+first and is renamed, so readers never see a partial object.
+"""
+
+import os
+import hmac
+import time
+import uuid
+import shutil
+import hashlib
+import logging
+import mimetypes
+from pathlib import Path
+from typing import Optional, BinaryIO, Callable
+from urllib.parse import urlencode
+
+from .storage import HashingReader, StorageBackend
+from ..utils.security import SECRET_KEY
+
+logger = logging.getLogger(__name__)
+
+LOCAL_STORAGE_ROOT = os.getenv("LOCAL_STORAGE_ROOT", "./storage")
+# Public base URL of the /files route, as clients reach it
+LOCAL_STORAGE_BASE_URL = os.getenv("LOCAL_STORAGE_BASE_URL", "http://localhost:8000/files").rstrip("/")
+# Key for signed download/upload links; defaults to the JWT secret
+LOCAL_STORAGE_SIGNING_KEY = os.getenv("LOCAL_STORAGE_SIGNING_KEY", SECRET_KEY)
+
+SESSION_SCHEME = "local-upload://"
+PART_SUFFIX = ".part"
+COPY_BUFFER_SIZE = 1024 * 1024
+# delete_prefix reports progress after this many files
+DELETE_PROGRESS_INTERVAL = 100
+
+
+def sign(method: str, blob_path: str, expires: int, extra: str = "") -> str:
+    """Signature of a /files link; `extra` binds the filename or content type."""
+    message = f"{method}\n{blob_path}\n{expires}\n{extra}".encode()
+    return hmac.new(LOCAL_STORAGE_SIGNING_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+
+def verify(method: str, blob_path: str, expires: int, signature: str, extra: str = "") -> bool:
+    """Whether a /files link was signed by us and has not expired."""
+    if expires < time.time():
+        return False
+    return hmac.compare_digest(sign(method, blob_path, expires, extra), signature)
+
+
+class LocalStorage(StorageBackend):
+    """Storage backend keeping objects as files under LOCAL_STORAGE_ROOT."""
+
+    serves_files = True
+
+    def __init__(self, root: str = LOCAL_STORAGE_ROOT, base_url: str = LOCAL_STORAGE_BASE_URL):
+        self.root = Path(root).resolve()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.base_url = base_url.rstrip("/")
+
+    def _path(self, blob_path: str) -> Path:
+        """Filesystem path of a blob; rejects paths that escape the root."""
+        path = (self.root / blob_path).resolve()
+        if path == self.root or self.root not in path.parents:
+            raise ValueError(f"Invalid blob path {blob_path!r}")
+        return path
+
+    def _write(self, blob_path: str, file_obj: BinaryIO):
+        """Copy a stream into place atomically."""
+        path = self._path(blob_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(tmp_path, "wb") as out:
+                shutil.copyfileobj(file_obj, out, COPY_BUFFER_SIZE)
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def upload_stream(
+        self,
+        file_obj: BinaryIO,
+        user_id: str,
+        trip_id: str,
+        filename: str,
+        content_type: str,
+        variant: str = "original"
+    ) -> tuple[str, str, int, str]:
+        """
+        Stream a file to disk.
+
+        Returns:
+            Tuple of (blob_path, public_url, size_bytes, md5_hex)
+        """
+        blob_path = self._generate_blob_path(user_id, trip_id, filename, variant)
+        reader = HashingReader(file_obj)
+        self._write(blob_path, reader)
+        return blob_path, self.get_public_url(blob_path), reader.size_bytes, reader.md5_hex
+
+    def save(self, blob_path: str, file_obj: BinaryIO) -> int:
+        """
+        Store a stream at a given path (the target of a signed PUT link).
+
+        Returns:
+            Number of bytes written
+        """
+        reader = HashingReader(file_obj)
+        self._write(blob_path, reader)
+        return reader.size_bytes
+
+    def upload_variant(
+        self,
+        original_path: str,
+        variant: str,
+        data: bytes,
+        content_type: str = "image/webp",
+        ext: str = ".webp"
+    ) -> tuple[str, str]:
+        """
+        Store a generated rendition next to its original.
+
+        Returns:
+            Tuple of (blob_path, public_url)
+        """
+        blob_path = self.variant_path(original_path, variant, ext)
+        path = self._path(blob_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        return blob_path, self.get_public_url(blob_path)
+
+    def delete_file(self, blob_path: str) -> bool:
+        """
+        Delete a single file.
+
+        Returns:
+            True if deleted (or already gone), False if it could not be removed
+        """
+        try:
+            self._path(blob_path).unlink()
+            return True
+        except FileNotFoundError:
+            return True
+        except (OSError, ValueError) as e:
+            logger.error("Error deleting %s: %s", blob_path, e)
+            return False
+
+    def delete_prefix(
+        self,
+        prefix: str,
+        progress: Optional[Callable[[int], None]] = None
+    ) -> int:
+        """
+        Delete every file whose blob path starts with prefix, then the
+        directories left empty.
+
+        Returns:
+            Number of files deleted
+        """
+        # Walk the deepest directory that contains every match
+        directory = self._path(prefix.rstrip("/")) if prefix.endswith("/") else self._path(prefix).parent
+        if not directory.is_dir():
+            return 0
+
+        deleted_count = 0
+        for dirpath, dirnames, filenames in os.walk(directory, topdown=False):
+            for name in filenames:
+                path = Path(dirpath) / name
+                if not path.relative_to(self.root).as_posix().startswith(prefix):
+                    continue
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    continue
+                deleted_count += 1
+                if progress and deleted_count % DELETE_PROGRESS_INTERVAL == 0:
+                    progress(deleted_count)
+            if Path(dirpath) != self.root:
+                try:
+                    os.rmdir(dirpath)
+                except OSError:
+                    pass  # not empty
+        if progress:
+            progress(deleted_count)
+        return deleted_count
+
+    def get_public_url(self, blob_path: str) -> str:
+        """URL of the file under the /files route."""
+        return f"{self.base_url}/{blob_path}"
+
+    def get_blob_path(self, public_url: str) -> Optional[str]:
+        """Inverse of get_public_url; None if the URL is not one of ours."""
+        prefix = f"{self.base_url}/"
+        if not public_url or not public_url.startswith(prefix):
+            return None
+        return public_url[len(prefix):]
+
+    def generate_signed_url(self, blob_path: str, filename: str, expiration_mins: int = 15) -> str:
+        """Expiring /files link that downloads the file as `filename`."""
+        expires = int(time.time()) + expiration_mins * 60
+        query = urlencode({
+            "filename": filename,
+            "expires": expires,
+            "signature": sign("GET", blob_path, expires, filename),
+        })
+        return f"{self.get_public_url(blob_path)}?{query}"
+
+    def generate_upload_url(
+        self,
+        user_id: str,
+        trip_id: str,
+        filename: str,
+        content_type: str,
+        expiration_mins: int = 15
+    ) -> tuple[str, str]:
+        """
+        Expiring /files link the client can PUT the file to, with the same
+        Content-Type.
+
+        Returns:
+            Tuple of (blob_path, upload_url)
+        """
+        blob_path = self._generate_blob_path(user_id, trip_id, filename)
+        expires = int(time.time()) + expiration_mins * 60
+        query = urlencode({"expires": expires, "signature": sign("PUT", blob_path, expires, content_type)})
+        return blob_path, f"{self.get_public_url(blob_path)}?{query}"
+
+    def get_file_info(self, blob_path: str) -> Optional[dict]:
+        """
+        Size and content type (from the extension) of a stored file.
+
+        MD5 is not stored, so md5_hash is always None.
+        """
+        try:
+            size = self._path(blob_path).stat().st_size
+        except (FileNotFoundError, ValueError):
+            return None
+        return {
+            "size_bytes": size,
+            "content_type": mimetypes.guess_type(blob_path)[0],
+            "md5_hash": None,
+        }
+
+    def make_public(self, blob_path: str) -> str:
+        """Files are always served publicly; returns the public URL."""
+        return self.get_public_url(blob_path)
+
+    def create_resumable_session(
+        self,
+        user_id: str,
+        trip_id: str,
+        filename: str,
+        content_type: str,
+        size_bytes: int
+    ) -> tuple[str, str]:
+        """
+        Start a chunked upload into a ".part" file.
+
+        Returns:
+            Tuple of (blob_path, session_url)
+        """
+        blob_path = self._generate_blob_path(user_id, trip_id, filename)
+        part_path = self._part_path(blob_path)
+        part_path.parent.mkdir(parents=True, exist_ok=True)
+        part_path.touch()
+        return blob_path, f"{SESSION_SCHEME}{blob_path}"
+
+    def _part_path(self, blob_path: str) -> Path:
+        path = self._path(blob_path)
+        return path.with_name(path.name + PART_SUFFIX)
+
+    def _session_blob_path(self, session_url: str) -> str:
+        if not session_url.startswith(SESSION_SCHEME):
+            raise ValueError(f"Not a local upload session: {session_url}")
+        return session_url[len(SESSION_SCHEME):]
+
+    def upload_chunk(self, session_url: str, data: bytes, offset: int, total_size: int) -> int:
+        """
+        Write one chunk at `offset`; the file is moved into place once all
+        total_size bytes are there.
+
+        Returns:
+            Number of bytes committed after this chunk
+        """
+        blob_path = self._session_blob_path(session_url)
+        part_path = self._part_path(blob_path)
+        with open(part_path, "r+b") as part:
+            committed = part.seek(0, os.SEEK_END)
+            if offset > committed:
+                raise RuntimeError(f"Chunk at byte {offset} would leave a gap after byte {committed}")
+            part.seek(offset)
+            part.write(data)
+            part.truncate()
+            committed = part.tell()
+        if committed == total_size:
+            os.replace(part_path, self._path(blob_path))
+        return committed
+
+    def get_committed_bytes(self, session_url: str, total_size: int) -> int:
+        """Bytes of a resumable upload written so far."""
+        blob_path = self._session_blob_path(session_url)
+        try:
+            return self._part_path(blob_path).stat().st_size
+        except FileNotFoundError:
+            return total_size if self._path(blob_path).exists() else 0
+
+    def get_file_stream(self, blob_path: str) -> BinaryIO:
+        """Open the file for reading."""
+        return open(self._path(blob_path), "rb")
+
+    def local_path(self, blob_path: str) -> Optional[str]:
+        """Filesystem path of the file, or None if it does not exist."""
+        try:
+            path = self._path(blob_path)
+        except ValueError:
+            return None
+        return str(path) if path.is_file() else None
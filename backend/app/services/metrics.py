@@ -0,0 +1,304 @@
+"""
+Request instrumentation, exposed at /metrics in the Prometheus text format.
+
+MetricsMiddleware times every HTTP request and, through a context variable,
+collects what the request did: SQL statements (cursor events on every
+engine, sync and async) and storage calls (get_storage() returns the
+backend wrapped in InstrumentedStorage). Per route it records histograms of
+latency, statement count, SQL time, storage calls and storage time. Requests
+slower than SLOW_REQUEST_MS are logged with the statements they ran.
+
+Metrics live in process memory: each worker process reports its own.
+"""
+
+import os
+import time
+import logging
+import functools
+import threading
+from contextvars import ContextVar
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Requests slower than this are logged with their SQL statements; 0 disables
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+# Statements kept per request for the slow-request log
+SLOW_REQUEST_MAX_STATEMENTS = 50
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+INF_LABEL = 'le="+Inf"'
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence[Any], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_label_text(self.labelnames, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative histogram with labels."""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float):
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, series in sorted(self._values.items()):
+                for bound, value in zip(self.buckets, series):
+                    le = f'le="{_number(bound)}"'
+                    lines.append(f"{self.name}_bucket{_label_text(self.labelnames, labels, le)} {value}")
+                lines.append(f"{self.name}_bucket{_label_text(self.labelnames, labels, INF_LABEL)} {series[-2]}")
+                lines.append(f"{self.name}_sum{_label_text(self.labelnames, labels)} {_number(series[-1])}")
+                lines.append(f"{self.name}_count{_label_text(self.labelnames, labels)} {series[-2]}")
+        return lines
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "Request latency", ("method", "route", "status"), LATENCY_BUCKETS
+)
+request_db_statements = Histogram(
+    "http_request_db_statements", "SQL statements executed per request", ("method", "route"), COUNT_BUCKETS
+)
+request_db_seconds = Histogram(
+    "http_request_db_seconds", "Time spent in SQL statements per request", ("method", "route"), LATENCY_BUCKETS
+)
+request_storage_calls = Histogram(
+    "http_request_storage_calls", "Storage calls per request", ("method", "route"), COUNT_BUCKETS
+)
+request_storage_seconds = Histogram(
+    "http_request_storage_seconds", "Time spent in storage calls per request", ("method", "route"), LATENCY_BUCKETS
+)
+storage_calls = Counter("storage_calls_total", "Storage calls, including background jobs", ("operation",))
+storage_seconds = Counter("storage_call_seconds_total", "Time spent in storage calls", ("operation",))
+slow_requests = Counter("http_slow_requests_total", "Requests slower than SLOW_REQUEST_MS", ("method", "route"))
+
+_metrics = [
+    request_duration, request_db_statements, request_db_seconds,
+    request_storage_calls, request_storage_seconds,
+    storage_calls, storage_seconds, slow_requests,
+]
+
+
+class RequestStats:
+    """What one request spent its time on."""
+
+    def __init__(self):
+        self.statement_count = 0
+        self.sql_seconds = 0.0
+        self.statements: list[tuple[float, str]] = []
+        self.storage_calls = 0
+        self.storage_seconds = 0.0
+
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Stats of the request being handled, or None outside a request."""
+    return _current_request.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_request.get() is not None:
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_request.get()
+    started = conn.info.get("metrics_started")
+    if stats is None or not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    stats.statement_count += 1
+    stats.sql_seconds += elapsed
+    if len(stats.statements) < SLOW_REQUEST_MAX_STATEMENTS:
+        stats.statements.append((elapsed, statement))
+
+
+class InstrumentedStorage:
+    """
+    Wraps a storage service and times its I/O methods.
+
+    Calls count towards the current request (when there is one) and the
+    process-wide storage_calls_total. Pure helpers that only build paths or
+    URLs are passed through untimed.
+    """
+
+    UNTIMED = frozenset({"get_public_url", "get_blob_path", "variant_path", "local_path"})
+
+    def __init__(self, service):
+        self._service = service
+
+    def __getattr__(self, name):
+        attr = getattr(self._service, name)
+        if name.startswith("_") or name in self.UNTIMED or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                record_storage_call(name, time.perf_counter() - start)
+
+        return timed
+
+
+def record_storage_call(operation: str, seconds: float):
+    storage_calls.inc((operation,))
+    storage_seconds.inc((operation,), seconds)
+    stats = _current_request.get()
+    if stats is not None:
+        stats.storage_calls += 1
+        stats.storage_seconds += seconds
+
+
+def _record_request(method: str, route: str, status: int, seconds: float, stats: RequestStats):
+    request_duration.observe((method, route, str(status)), seconds)
+    request_db_statements.observe((method, route), stats.statement_count)
+    request_db_seconds.observe((method, route), stats.sql_seconds)
+    request_storage_calls.observe((method, route), stats.storage_calls)
+    request_storage_seconds.observe((method, route), stats.storage_seconds)
+
+    if SLOW_REQUEST_MS > 0 and seconds * 1000 >= SLOW_REQUEST_MS:
+        slow_requests.inc((method, route))
+        queries = "".join(
+            f"\n  {elapsed * 1000:8.1f} ms  {' '.join(statement.split())[:500]}"
+            for elapsed, statement in stats.statements
+        )
+        if stats.statement_count > len(stats.statements):
+            queries += f"\n  ... {stats.statement_count - len(stats.statements)} more"
+        logger.warning(
+            "Slow request %s %s -> %s in %.0f ms: %d SQL statements (%.0f ms), %d storage calls (%.0f ms)%s",
+            method, route, status, seconds * 1000,
+            stats.statement_count, stats.sql_seconds * 1000,
+            stats.storage_calls, stats.storage_seconds * 1000, queries
+        )
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route metrics for every HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        status = 500
+        streaming = False
+
+        async def send_with_status(message):
+            nonlocal status, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                streaming = any(
+                    name == b"content-type" and value.startswith(b"text/event-stream")
+                    for name, value in message.get("headers", ())
+                )
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current_request.reset(token)
+            if streaming:
+                # Event streams stay open as long as the client watches; their
+                # duration would only pollute the latency histograms
+                return
+            # The route template, not the raw path, keeps label values bounded
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            _record_request(scope["method"], route, status, elapsed, stats)
+
+
+def _pool_lines() -> list[str]:
+    from ..database import get_pool_status, pool_stats
+
+    status = get_pool_status()
+    gauges = [
+        ("db_pool_checked_out", "Connections currently checked out of the sync pool", status.get("checked_out")),
+        ("db_pool_overflow", "Overflow connections open in the sync pool", status.get("overflow")),
+    ]
+    counters = [
+        ("db_pool_checkouts_total", "Pool checkouts", pool_stats.checkouts),
+        ("db_pool_checkout_timeouts_total", "Pool checkouts that timed out", pool_stats.timeouts),
+        ("db_pool_checkout_wait_seconds_total", "Time spent waiting for a pooled connection", pool_stats.wait_total),
+    ]
+    lines = []
+    for kind, metrics in (("gauge", gauges), ("counter", counters)):
+        for name, help, value in metrics:
+            if value is not None:
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}", f"{name} {_number(value)}"]
+    return lines
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in _metrics:
+        lines += metric.render()
+    lines += _pool_lines()
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,159 @@
+"""
+Opt-in sampling profiler for live requests.
+
+A request is profiled when it carries `X-Profile-Token: <PROFILE_TOKEN>`, or
+at random for a PROFILE_SAMPLE_RATE fraction of requests. While it runs, a
+background thread snapshots every busy thread's Python stack each
+PROFILE_INTERVAL_MS; threads parked in a wait (idle pool workers, the event
+loop in select) are skipped. Sync endpoints run on threadpool workers and
+async ones on the event loop, so both are covered, but so is anything else
+the process does meanwhile: each stack is rooted at its thread's name to
+tell them apart.
+
+The result is stored in "collapsed stack" form (one "frame;frame;frame count"
+line per distinct stack), which flamegraph.pl, speedscope and inferno read
+directly, under the request id returned in the X-Request-ID header:
+
+    curl -H "X-Profile-Token: $TOKEN" https://api/trips/ -D - | grep X-Request-ID
+    curl -H "X-Profile-Token: $TOKEN" https://api/debug/profiles/<id> > trips.folded
+    flamegraph.pl trips.folded > trips.svg
+
+Profiles go to the "profiles" cache namespace (shared through Redis when
+CACHE_URL is set) for PROFILE_RETENTION_SECONDS.
+"""
+
+import os
+import sys
+import time
+import uuid
+import hmac
+import random
+import logging
+import threading
+from collections import Counter
+from typing import Optional
+
+from .cache import get_cache
+
+logger = logging.getLogger(__name__)
+
+# Secret that enables profiling a request (X-Profile-Token) and reading
+# profiles back; unset disables both
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+# Fraction of all requests to profile (0-1); these are stored like the others
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_RETENTION_SECONDS = float(os.getenv("PROFILE_RETENTION_SECONDS", "86400"))
+
+PROFILE_TOKEN_HEADER = "x-profile-token"
+REQUEST_ID_HEADER = "x-request-id"
+
+# A thread whose innermost Python frame is in one of these modules is waiting, not working
+_IDLE_MODULES = ("threading.py", "selectors.py", "queue.py")
+
+_profiles = get_cache("profiles", PROFILE_RETENTION_SECONDS)
+
+
+def is_authorized(token: Optional[str]) -> bool:
+    """Whether a token matches PROFILE_TOKEN."""
+    return bool(PROFILE_TOKEN and token and hmac.compare_digest(token, PROFILE_TOKEN))
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class Sampler:
+    """Background thread collecting stack samples until stopped."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or frame.f_code.co_filename.endswith(_IDLE_MODULES):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def get_profile(request_id: str) -> Optional[str]:
+    """Collapsed stacks recorded for a request, or None."""
+    entry = _profiles.get(request_id)
+    return entry["folded"] if entry else None
+
+
+class ProfilerMiddleware:
+    """
+    ASGI middleware that tags every response with X-Request-ID and profiles
+    the requests selected by token or sample rate.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        request_id = headers.get(REQUEST_ID_HEADER.encode(), b"").decode("latin-1")[:64] or uuid.uuid4().hex
+        profile = not scope["path"].startswith("/debug/profiles") and (
+            is_authorized(headers.get(PROFILE_TOKEN_HEADER.encode(), b"").decode("latin-1"))
+            or (PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE)
+        )
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (REQUEST_ID_HEADER.encode(), request_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        if not profile:
+            await self.app(scope, receive, send_with_id)
+            return
+
+        sampler = Sampler(PROFILE_INTERVAL_MS / 1000)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            sampler.stop()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            _profiles.set(request_id, {
+                "method": scope["method"],
+                "path": scope["path"],
+                "duration_ms": round(elapsed_ms, 1),
+                "samples": sampler.samples,
+                "folded": sampler.folded(),
+            })
+            logger.info(
+                "Profiled %s %s (%.0f ms, %d samples) as request %s",
+                scope["method"], scope["path"], elapsed_ms, sampler.samples, request_id
+            )
@@ -0,0 +1,307 @@
+"""
+Storage backend interface and selection.
+
+Media, activity images and generated renditions go through a StorageBackend.
+Two implementations exist, chosen with STORAGE_BACKEND:
+
+- "gcs" (default): Google Cloud Storage (services/gcs.py)
+- "local": a directory on local disk (services/local_storage.py), served by
+  the API itself under /files with zero-copy file responses. For on-prem
+  deployments, and for measuring the API without a network storage round
+  trip.
+
+Callers use get_storage(), never a backend class directly.
+"""
+
+import os
+import uuid
+import base64
+import hashlib
+from pathlib import Path, PurePosixPath
+from typing import Optional, BinaryIO, Callable
+
+from .metrics import InstrumentedStorage
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "gcs").lower()
+
+
+class HashingReader:
+    """
+    File-like wrapper that tracks size and MD5 of everything read through it.
+
+    Lets us stream an upload straight from the request spool to storage while
+    still knowing the final size and checksum, without buffering the file.
+    """
+
+    def __init__(self, file_obj: BinaryIO):
+        self._file = file_obj
+        self._md5 = hashlib.md5()
+        self._pos = 0
+        self.size_bytes = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._file.read(size)
+        start = self._pos
+        self._pos += len(chunk)
+        # A resumable upload may rewind to re-send a chunk; only hash new bytes
+        if self._pos > self.size_bytes:
+            self._md5.update(chunk[self.size_bytes - start:])
+            self.size_bytes = self._pos
+        return chunk
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        self._pos = self._file.seek(offset, whence)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    @property
+    def md5_hex(self) -> str:
+        return self._md5.hexdigest()
+
+    @property
+    def md5_base64(self) -> str:
+        return base64.b64encode(self._md5.digest()).decode("ascii")
+
+
+class StorageBackend:
+    """
+    Operations the API needs from object storage.
+
+    Objects are addressed by a relative, "/"-separated path (stored as
+    Media.gcs_path). Subclasses implement the I/O; path layout and the
+    helpers built on the primitives are shared.
+    """
+
+    # Whether the API itself serves the objects (GET/PUT /files)
+    serves_files = False
+
+    def _generate_blob_path(
+        self,
+        user_id: str,
+        trip_id: str,
+        filename: str,
+        variant: str = "original"
+    ) -> str:
+        """
+        Generate a blob path following our folder structure.
+
+        Args:
+            user_id: User's UUID
+            trip_id: Trip's UUID
+            filename: Original filename
+            variant: File variant (original, thumb, etc.)
+
+        Returns:
+            Path like: users/user_{id}/trips/trip_{id}/photo_{uuid}_{variant}.jpg
+        """
+        # Extract extension
+        ext = Path(filename).suffix.lower()
+
+        # Generate unique ID for this file
+        file_uuid = str(uuid.uuid4())
+
+        # Determine media type
+        media_type = "video" if ext in ['.mp4', '.mov', '.avi'] else "photo"
+
+        # Build path
+        path = f"users/user_{user_id}/trips/trip_{trip_id}/{media_type}_{file_uuid}_{variant}{ext}"
+
+        return path
+
+    @staticmethod
+    def _stream_size(file_obj: BinaryIO) -> Optional[int]:
+        """Remaining bytes in a seekable stream, or None if it can't seek."""
+        try:
+            position = file_obj.tell()
+            end = file_obj.seek(0, os.SEEK_END)
+            file_obj.seek(position)
+            return end - position
+        except (AttributeError, OSError, ValueError):
+            return None
+
+    def variant_path(self, original_path: str, variant: str, ext: str = ".webp") -> str:
+        """
+        Path of a derived rendition stored next to its original.
+
+        Args:
+            original_path: e.g. users/user_1/trips/trip_2/photo_abc_original.jpg
+            variant: Variant name (thumb, medium)
+            ext: Extension of the rendition
+
+        Returns:
+            Path like: users/user_1/trips/trip_2/photo_abc_thumb.webp
+        """
+        base = str(PurePosixPath(original_path).with_suffix(""))
+        if base.endswith("_original"):
+            base = base[:-len("_original")]
+        return f"{base}_{variant}{ext}"
+
+    def upload_file(
+        self,
+        file_obj: BinaryIO,
+        user_id: str,
+        trip_id: str,
+        filename: str,
+        content_type: str,
+        variant: str = "original"
+    ) -> tuple[str, str]:
+        """
+        Upload a file.
+
+        Returns:
+            Tuple of (blob_path, public_url)
+        """
+        blob_path, public_url, _, _ = self.upload_stream(
+            file_obj, user_id, trip_id, filename, content_type, variant
+        )
+        return blob_path, public_url
+
+    def delete_user_folder(self, user_id: str, progress: Optional[Callable[[int], None]] = None) -> int:
+        """
+        Delete all files for a user (when account is deleted).
+
+        Args:
+            user_id: User's UUID
+            progress: Optional callback receiving the running deleted count
+
+        Returns:
+            Number of files deleted
+        """
+        return self.delete_prefix(f"users/user_{user_id}/", progress)
+
+    def delete_trip_folder(
+        self,
+        user_id: str,
+        trip_id: str,
+        progress: Optional[Callable[[int], None]] = None
+    ) -> int:
+        """
+        Delete all files for a specific trip.
+
+        Args:
+            user_id: User's UUID
+            trip_id: Trip's UUID
+            progress: Optional callback receiving the running deleted count
+
+        Returns:
+            Number of files deleted
+        """
+        return self.delete_prefix(f"users/user_{user_id}/trips/trip_{trip_id}/", progress)
+
+    def local_path(self, blob_path: str) -> Optional[str]:
+        """
+        Filesystem path of an object, for backends that keep objects on local
+        disk, so it can be sent with a file response; None otherwise.
+        """
+        return None
+
+    # Implemented by each backend
+
+    def upload_stream(
+        self,
+        file_obj: BinaryIO,
+        user_id: str,
+        trip_id: str,
+        filename: str,
+        content_type: str,
+        variant: str = "original"
+    ) -> tuple[str, str, int, str]:
+        """Stream a file in; returns (blob_path, public_url, size_bytes, md5_hex)."""
+        raise NotImplementedError
+
+    def upload_variant(
+        self,
+        original_path: str,
+        variant: str,
+        data: bytes,
+        content_type: str = "image/webp",
+        ext: str = ".webp"
+    ) -> tuple[str, str]:
+        """Store a rendition next to its original; returns (blob_path, public_url)."""
+        raise NotImplementedError
+
+    def delete_file(self, blob_path: str) -> bool:
+        """Delete one object; False if it could not be deleted (one already gone counts as deleted)."""
+        raise NotImplementedError
+
+    def delete_prefix(self, prefix: str, progress: Optional[Callable[[int], None]] = None) -> int:
+        """Delete every object under a prefix; returns how many were deleted."""
+        raise NotImplementedError
+
+    def get_public_url(self, blob_path: str) -> str:
+        """URL the object is publicly readable at."""
+        raise NotImplementedError
+
+    def get_blob_path(self, public_url: str) -> Optional[str]:
+        """Inverse of get_public_url; None for URLs that aren't ours."""
+        raise NotImplementedError
+
+    def generate_signed_url(self, blob_path: str, filename: str, expiration_mins: int = 15) -> str:
+        """Expiring download URL that saves the object as `filename`."""
+        raise NotImplementedError
+
+    def generate_upload_url(
+        self,
+        user_id: str,
+        trip_id: str,
+        filename: str,
+        content_type: str,
+        expiration_mins: int = 15
+    ) -> tuple[str, str]:
+        """Expiring URL a client can PUT a new file to; returns (blob_path, upload_url)."""
+        raise NotImplementedError
+
+    def get_file_info(self, blob_path: str) -> Optional[dict]:
+        """Dict with size_bytes, content_type and md5_hash, or None if missing."""
+        raise NotImplementedError
+
+    def make_public(self, blob_path: str) -> str:
+        """Make an existing object publicly readable; returns its public URL."""
+        raise NotImplementedError
+
+    def create_resumable_session(
+        self,
+        user_id: str,
+        trip_id: str,
+        filename: str,
+        content_type: str,
+        size_bytes: int
+    ) -> tuple[str, str]:
+        """Start a chunked upload of known size; returns (blob_path, session_url)."""
+        raise NotImplementedError
+
+    def upload_chunk(self, session_url: str, data: bytes, offset: int, total_size: int) -> int:
+        """Write one chunk of a resumable upload; returns the bytes committed."""
+        raise NotImplementedError
+
+    def get_committed_bytes(self, session_url: str, total_size: int) -> int:
+        """Bytes of a resumable upload committed so far."""
+        raise NotImplementedError
+
+    def get_file_stream(self, blob_path: str) -> BinaryIO:
+        """Readable file-like object with the object's content."""
+        raise NotImplementedError
+
+
+# Singleton instance
+_storage: Optional[StorageBackend] = None
+
+
+def _create_backend() -> StorageBackend:
+    if STORAGE_BACKEND == "local":
+        from .local_storage import LocalStorage
+        return LocalStorage()
+    if STORAGE_BACKEND == "gcs":
+        from .gcs import GCSService
+        return GCSService()
+    raise ValueError(f"Unknown STORAGE_BACKEND {STORAGE_BACKEND!r} (expected 'gcs' or 'local')")
+
+
+def get_storage() -> StorageBackend:
+    """Get or create the configured backend (wrapped so its calls show up in /metrics)."""
+    global _storage
+    if _storage is None:
+        _storage = _create_backend()
+    return InstrumentedStorage(_storage)
@@ -0,0 +1,143 @@
+"""
+Image rendition pipeline for Galleriq media.
+
+After an image is uploaded we render smaller WebP variants so gallery pages
+don't have to download full-resolution originals:
+- thumb:  grid thumbnails (fills Media.thumbnail_url)
+- medium: lightbox/preview size (fills Media.medium_url)
+
+Decoding and resizing is CPU-bound, so it runs in a process pool; the
+storage round-trips around it run in the job worker that called it. The
+original reaches the pool as a file path, never as bytes: a local-disk
+original is read in place, anything else is streamed to a temporary file.
+"""
+
+import io
+import os
+import shutil
+import logging
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from uuid import UUID
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+from sqlalchemy.orm import Session
+
+from ..models.media import Media
+from .storage import StorageBackend, get_storage
+
+logger = logging.getLogger(__name__)
+
+# Longest edge in pixels for each variant
+VARIANT_SIZES = {
+    "thumb": 320,
+    "medium": 1280,
+}
+WEBP_QUALITY = int(os.getenv("THUMBNAIL_WEBP_QUALITY", "80"))
+THUMBNAIL_WORKERS = int(os.getenv("THUMBNAIL_WORKERS", "2"))
+# Originals larger than this get no variants (pages fall back to the original)
+THUMBNAIL_MAX_SOURCE_BYTES = int(os.getenv("THUMBNAIL_MAX_SOURCE_BYTES", str(100 * 1024 * 1024)))
+
+# Refuse decompression bombs well above any camera resolution
+Image.MAX_IMAGE_PIXELS = 200_000_000
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """Create the process pool lazily so importing the app doesn't fork."""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=THUMBNAIL_WORKERS)
+    return _process_pool
+
+
+def render_variants(path: str) -> dict[str, bytes]:
+    """
+    Render every variant of an image.
+
+    Runs inside a worker process, so it takes a path and returns bytes.
+
+    Args:
+        path: File holding the encoded original image
+
+    Returns:
+        Dict of variant name -> encoded WebP bytes
+    """
+    with Image.open(path) as image:
+        # Ask JPEG decoders for a reduced-size decode; much cheaper than full size
+        image.draft("RGB", (VARIANT_SIZES["medium"], VARIANT_SIZES["medium"]))
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+        variants = {}
+        # Largest first, so each smaller variant resizes from the previous one
+        for variant, edge in sorted(VARIANT_SIZES.items(), key=lambda item: -item[1]):
+            image.thumbnail((edge, edge), Image.LANCZOS)
+            buffer = io.BytesIO()
+            image.save(buffer, format="WEBP", quality=WEBP_QUALITY, method=4)
+            variants[variant] = buffer.getvalue()
+        return variants
+
+
+@contextmanager
+def _source_path(storage: StorageBackend, blob_path: str) -> Iterator[str]:
+    """Path of a file with the object's content, for as long as the block runs."""
+    path = storage.local_path(blob_path)
+    if path is not None:
+        yield path
+        return
+    with tempfile.NamedTemporaryFile(prefix="thumbnail-source-") as spooled:
+        with storage.get_file_stream(blob_path) as stream:
+            shutil.copyfileobj(stream, spooled)
+        spooled.flush()
+        yield spooled.name
+
+
+def generate_thumbnails(db: Session, media_id: UUID) -> bool:
+    """
+    Render and store the variants for one media item.
+
+    Runs as a background job; failures raise so the job is retried, except
+    for originals that retrying can't fix (missing, too large, not a
+    readable image), which are logged and skipped.
+
+    Args:
+        db: Database session
+        media_id: Media row to process
+
+    Returns:
+        True if variants were generated, False if there was nothing to do
+    """
+    media = db.query(Media).filter(Media.id == media_id).first()
+    if not media or not media.mime_type.startswith("image/") or media.thumbnail_url:
+        return False
+
+    storage = get_storage()
+
+    info = storage.get_file_info(media.gcs_path)
+    if info is None:
+        logger.warning("No variants for media %s: original %s is missing", media_id, media.gcs_path)
+        return False
+    if info["size_bytes"] > THUMBNAIL_MAX_SOURCE_BYTES:
+        logger.warning("No variants for media %s: original is %s bytes", media_id, info["size_bytes"])
+        return False
+
+    with _source_path(storage, media.gcs_path) as path:
+        try:
+            variants = _get_process_pool().submit(render_variants, path).result()
+        except (UnidentifiedImageError, Image.DecompressionBombError) as e:
+            logger.warning("No variants for media %s: %s", media_id, e)
+            return False
+
+    urls = {}
+    for variant, data in variants.items():
+        _, urls[variant] = storage.upload_variant(media.gcs_path, variant, data)
+
+    media.thumbnail_url = urls["thumb"]
+    media.medium_url = urls["medium"]
+    db.commit()
+    return True
@@ -0,0 +1,46 @@
+"""
+Helpers for running blocking work from async request handlers.
+
+The google-cloud-storage client is synchronous, so calling it directly from an
+`async def` endpoint stalls the event loop for the whole request. Storage calls
+are instead dispatched to a dedicated, bounded thread pool so slow uploads can
+neither freeze the worker nor starve FastAPI's default threadpool that serves
+the sync endpoints.
+"""
+
+import os
+import asyncio
+import functools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+# Max concurrent blocking storage calls per worker process
+STORAGE_IO_WORKERS = int(os.getenv("STORAGE_IO_WORKERS", "16"))
+
+_storage_executor = ThreadPoolExecutor(
+    max_workers=STORAGE_IO_WORKERS,
+    thread_name_prefix="storage-io"
+)
+
+
+async def run_storage_io(func: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Run a blocking storage call in the storage thread pool.
+
+    Args:
+        func: Blocking callable (e.g. a GCSService method)
+        *args, **kwargs: Arguments passed through to func
+
+    Returns:
+        Whatever func returns
+    """
+    loop = asyncio.get_running_loop()
+    # Carry the request's context along, so the call is attributed to it in /metrics
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        _storage_executor,
+        functools.partial(context.run, func, *args, **kwargs)
+    )
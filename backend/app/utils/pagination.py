@@ -0,0 +1,108 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Listings are ordered by (created_at, id) descending. Instead of an OFFSET,
+each page carries an opaque cursor encoding the sort key of its last row, and
+the next page starts strictly after it. With an index on the filter columns
+followed by (created_at, id), fetching page N costs the same as page 1.
+
+Counting every matching row is the other linear cost of a listing, so the
+total is optional: "exact" runs COUNT(*), "approximate" reads the planner's
+row estimate (PostgreSQL only; other databases fall back to an exact count),
+and "none" skips it.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Literal, Optional
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session
+
+TotalMode = Literal["exact", "approximate", "none"]
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    """Encode a row's sort key as an opaque, URL-safe cursor."""
+    raw = json.dumps([created_at.isoformat(), str(row_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def after_cursor(query: Query | Select, created_at_column, id_column, cursor: Optional[str]) -> Query | Select:
+    """
+    Order a query newest first and, if a cursor is given, start after it.
+
+    Args:
+        query: Query (or 2.0-style Select) to paginate
+        created_at_column: Timestamp column of the sort key
+        id_column: Primary key column, the tie-breaker
+        cursor: Cursor of the previous page's last row, or None for the first page
+
+    Returns:
+        The ordered (and filtered) query; the caller applies the limit
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(created_at_column, id_column) < tuple_(created_at, row_id))
+    return query.order_by(created_at_column.desc(), id_column.desc())
+
+
+def count_rows(db: Session, query: Query, mode: TotalMode) -> Optional[int]:
+    """
+    Count the rows a query matches.
+
+    Args:
+        db: Database session
+        query: Unordered, unpaginated listing query
+        mode: "exact", "approximate" or "none"
+
+    Returns:
+        Row count, the planner's estimate, or None when mode is "none"
+    """
+    if mode == "none":
+        return None
+    if mode == "approximate" and db.get_bind().dialect.name == "postgresql":
+        return _estimate_rows(db, query.statement)
+    return query.count()
+
+
+async def count_rows_async(db: AsyncSession, statement: Select, mode: TotalMode) -> Optional[int]:
+    """count_rows for async sessions and 2.0-style Select statements."""
+    if mode == "none":
+        return None
+    if mode == "approximate" and db.get_bind().dialect.name == "postgresql":
+        return await db.run_sync(_estimate_rows, statement)
+    return await db.scalar(select(func.count()).select_from(statement.order_by(None).subquery()))
+
+
+def _estimate_rows(db: Session, statement) -> int:
+    """The PostgreSQL planner's row estimate for a statement."""
+    dialect = db.get_bind().dialect
+    compiled = statement.compile(dialect=dialect)
+    params = compiled.params
+    if compiled.positional:
+        # asyncpg takes $1, $2... parameters as a tuple
+        params = tuple(params[name] for name in compiled.positiontup)
+    plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
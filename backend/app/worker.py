@@ -0,0 +1,49 @@
+"""
+Background job worker.
+
+Run one or more of these alongside the API to drain the job queue:
+
+    python -m app.worker [--processes 4]
+
+Each process polls the `jobs` table independently; scale by adding processes
+or containers.
+"""
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import argparse
+import multiprocessing
+import signal
+import threading
+
+from .main import app  # noqa: F401  (registers models/tables)
+from .services import job_handlers  # noqa: F401  (registers handlers)
+from .services.jobs import run_worker
+
+
+def _worker_process():
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    run_worker(stop_event)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run background job workers")
+    parser.add_argument("--processes", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.processes == 1:
+        _worker_process()
+        return
+
+    processes = [multiprocessing.Process(target=_worker_process) for _ in range(args.processes)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
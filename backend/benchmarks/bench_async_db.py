@@ -0,0 +1,164 @@
+"""
+Throughput of the async read endpoints against their old sync versions.
+
+Mounts the previous threadpool (sync Session) implementations of
+GET /media/trip/{id}, /expenses/trip/{id}, /itinerary/trips and
+/itinerary/trips/{id}/days under /sync, then fires the same concurrent load
+at both and reports latency and requests/second per endpoint. The sync
+handlers hold one of the threadpool's threads (40 by default) for the whole
+request; the async ones only hold a pooled connection while a query runs.
+
+SQLite serialises everything, so point BENCH_DATABASE_URL at an empty
+PostgreSQL database (async endpoints then use asyncpg) for meaningful numbers.
+
+Usage (from backend/):
+    BENCH_DATABASE_URL=postgresql://... python -m benchmarks.bench_async_db [--requests 2000] [--concurrency 100]
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+import httpx
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from .harness import app, SessionLocal, authenticate_as, summarize
+from app.database import get_db
+from app.deps import get_current_user
+from app.models.user import User
+from app.models.trip import Trip, TripMember
+from app.models.media import Media
+from app.models.expense import Expense
+from app.models.expense_trip import ExpenseTrip, ExpenseTripMember
+from app.models.itinerary_trip import ItineraryTrip, ItineraryTripMember
+from app.models.itinerary_day import ItineraryDay
+from app.routers.media import _paginate_media
+from app.schemas.expense import ExpenseResponse
+from app.schemas.itinerary import ItineraryDayResponse, ItineraryTripResponse
+from app.schemas.media import PaginatedPhotoResponse
+from app.services.authz import EXPENSE, GALLERY, ITINERARY, TripAccess
+from app.utils.pagination import TotalMode
+
+sync_router = APIRouter(prefix="/sync")
+
+
+@sync_router.get("/media/trip/{trip_id}", response_model=PaginatedPhotoResponse, dependencies=[Depends(TripAccess(GALLERY))])
+def get_trip_media(trip_id: uuid.UUID, limit: int = 50, cursor: Optional[str] = None,
+                   total: TotalMode = "exact", db: Session = Depends(get_db)):
+    query = db.query(Media, User.name.label("uploader_name")).join(User, Media.user_id == User.id).filter(
+        Media.trip_id == trip_id,
+        Media.status == "ready"
+    )
+    return _paginate_media(db, query, 1, limit, cursor, total)
+
+
+@sync_router.get("/expenses/trip/{trip_id}", response_model=List[ExpenseResponse], dependencies=[Depends(TripAccess(EXPENSE))])
+def get_trip_expenses(trip_id: uuid.UUID, db: Session = Depends(get_db)):
+    return db.query(Expense).filter(Expense.trip_id == trip_id).order_by(Expense.date.desc()).all()
+
+
+@sync_router.get("/itinerary/trips", response_model=List[ItineraryTripResponse])
+def get_user_trips(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    return db.query(ItineraryTrip).join(ItineraryTripMember).filter(ItineraryTripMember.user_id == current_user.id).all()
+
+
+@sync_router.get("/itinerary/trips/{trip_id}/days", response_model=List[ItineraryDayResponse], dependencies=[Depends(TripAccess(ITINERARY))])
+def get_trip_days(trip_id: uuid.UUID, db: Session = Depends(get_db)):
+    return db.query(ItineraryDay).filter(ItineraryDay.trip_id == trip_id).order_by(ItineraryDay.day_number).all()
+
+
+def seed(rows: int):
+    """One user who is a member of a trip in each app, each holding `rows` rows."""
+    db = SessionLocal()
+    user = User(id=uuid.uuid4(), email="bench@example.com", password_hash="x", name="Bench")
+    trip = Trip(id=uuid.uuid4(), name="Bench trip", created_by=user.id, join_code="BENCH1")
+    expense_trip = ExpenseTrip(id=uuid.uuid4(), name="Bench budget", created_by=user.id)
+    itinerary_trips = [
+        ItineraryTrip(id=uuid.uuid4(), name=f"Plan {i}", start_date=date(2026, 1, 1),
+                      end_date=date(2026, 1, 30), created_by=user.id)
+        for i in range(10)
+    ]
+    db.add_all([user, trip, expense_trip, *itinerary_trips])
+    db.flush()
+    db.add(TripMember(trip_id=trip.id, user_id=user.id, role="admin"))
+    db.add(ExpenseTripMember(trip_id=expense_trip.id, user_id=user.id))
+    db.add_all(ItineraryTripMember(trip_id=t.id, user_id=user.id, role="owner") for t in itinerary_trips)
+    db.add_all(
+        Media(user_id=user.id, trip_id=trip.id, gcs_path=f"seed/{i}.jpg",
+              public_url=f"https://example.invalid/seed/{i}.jpg", filename=f"{i}.jpg",
+              mime_type="image/jpeg", size_bytes=1024)
+        for i in range(rows)
+    )
+    db.add_all(
+        Expense(trip_id=expense_trip.id, payer_id=user.id, amount=10, description=f"Expense {i}",
+                date=datetime(2026, 1, 1) + timedelta(hours=i))
+        for i in range(min(rows, 100))
+    )
+    db.add_all(
+        ItineraryDay(trip_id=itinerary_trips[0].id, day_number=n, date=date(2026, 1, 1) + timedelta(days=n - 1))
+        for n in range(1, 31)
+    )
+    db.commit()
+    ids = user.id, trip.id, expense_trip.id, itinerary_trips[0].id
+    db.close()
+    return ids
+
+
+async def load(client: httpx.AsyncClient, path: str, requests: int, concurrency: int):
+    """Send `requests` GETs with at most `concurrency` in flight; return (latencies, elapsed)."""
+    samples = []
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.get(path)
+            samples.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, time.perf_counter() - start
+
+
+async def run(requests: int, concurrency: int, rows: int):
+    app.include_router(sync_router)
+    user_id, trip_id, expense_trip_id, itinerary_trip_id = seed(rows)
+    authenticate_as(user_id)
+
+    paths = {
+        "GET /media/trip/{id}": f"/media/trip/{trip_id}?limit=50",
+        "GET /expenses/trip/{id}": f"/expenses/trip/{expense_trip_id}",
+        "GET /itinerary/trips": "/itinerary/trips",
+        "GET /itinerary/trips/{id}/days": f"/itinerary/trips/{itinerary_trip_id}/days",
+    }
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up both engines' pools and the caches
+        for path in paths.values():
+            await client.get(path)
+            await client.get("/sync" + path)
+
+        print(f"{requests} requests per endpoint, {concurrency} concurrent, {SessionLocal.kw['bind'].dialect.name}")
+        for name, path in paths.items():
+            for label, prefix in (("sync ", "/sync"), ("async", "")):
+                samples, elapsed = await load(client, prefix + path, requests, concurrency)
+                print(summarize(f"{label} {name}", samples, elapsed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000, help="requests per endpoint and mode")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--rows", type=int, default=500, help="media rows in the benchmark trip")
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.concurrency, args.rows))
+
+
+if __name__ == "__main__":
+    main()
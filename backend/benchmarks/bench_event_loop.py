@@ -0,0 +1,118 @@
+"""
+Event-loop responsiveness under concurrent uploads.
+
+Runs 50 concurrent POST /media/upload requests against FakeGCSService while a
+prober keeps hitting /health and /media/trip/{id}, then reports prober
+latency with and without the upload load. If storage calls block the event
+loop, the loaded p99 grows with the number of uploads; with storage offloaded
+it should stay close to the idle numbers.
+
+Usage (from backend/):
+    python -m benchmarks.bench_event_loop [--uploads 50] [--latency 0.2]
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+
+from .harness import app, SessionLocal, install_fake_storage, authenticate_as, summarize
+from app.models.user import User
+from app.models.trip import Trip, TripMember
+from app.models.media import Media
+
+
+def seed(photos: int = 200):
+    """Create one user with one trip holding `photos` media rows."""
+    db = SessionLocal()
+    user = User(id=uuid.uuid4(), email="bench@example.com", password_hash="x", name="Bench")
+    trip = Trip(id=uuid.uuid4(), name="Bench trip", created_by=user.id, join_code="BENCH1")
+    db.add_all([user, trip])
+    db.flush()
+    db.add(TripMember(trip_id=trip.id, user_id=user.id, role="admin"))
+    db.add_all([
+        Media(
+            user_id=user.id,
+            trip_id=trip.id,
+            gcs_path=f"seed/{i}.jpg",
+            public_url=f"https://example.invalid/seed/{i}.jpg",
+            filename=f"{i}.jpg",
+            mime_type="image/jpeg",
+            size_bytes=1024,
+        )
+        for i in range(photos)
+    ])
+    db.commit()
+    ids = user.id, trip.id
+    db.close()
+    return ids
+
+
+async def probe(client: httpx.AsyncClient, trip_id, stop: asyncio.Event, results: dict):
+    """Hit the probe endpoints back to back until stop is set."""
+    paths = {"/health": "/health", "/media/trip/{id}": f"/media/trip/{trip_id}?limit=50"}
+    while not stop.is_set():
+        for name, path in paths.items():
+            start = time.perf_counter()
+            response = await client.get(path)
+            results[name].append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+        await asyncio.sleep(0.005)
+
+
+async def upload(client: httpx.AsyncClient, trip_id, payload: bytes):
+    response = await client.post(
+        "/media/upload",
+        data={"trip_id": str(trip_id)},
+        files={"file": ("bench.jpg", payload, "image/jpeg")},
+    )
+    assert response.status_code == 200, response.text
+
+
+async def run(uploads: int, latency: float, size_kb: int, idle_seconds: float):
+    install_fake_storage(latency=latency)
+    user_id, trip_id = seed()
+    authenticate_as(user_id)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Idle baseline
+        idle = {"/health": [], "/media/trip/{id}": []}
+        stop = asyncio.Event()
+        prober = asyncio.create_task(probe(client, trip_id, stop, idle))
+        await asyncio.sleep(idle_seconds)
+        stop.set()
+        await prober
+
+        # Under upload load
+        loaded = {"/health": [], "/media/trip/{id}": []}
+        stop = asyncio.Event()
+        prober = asyncio.create_task(probe(client, trip_id, stop, loaded))
+        payload = b"\xff" * (size_kb * 1024)
+        start = time.perf_counter()
+        await asyncio.gather(*(upload(client, trip_id, payload) for _ in range(uploads)))
+        upload_elapsed = time.perf_counter() - start
+        stop.set()
+        await prober
+
+    print(f"{uploads} uploads of {size_kb} KB, storage latency {latency * 1000:.0f} ms/request")
+    print(f"uploads finished in {upload_elapsed:.2f}s")
+    for name in idle:
+        print(summarize(f"idle   {name}", idle[name]))
+        print(summarize(f"loaded {name}", loaded[name]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--uploads", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per fake storage request")
+    parser.add_argument("--size-kb", type=int, default=512)
+    parser.add_argument("--idle-seconds", type=float, default=2.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.uploads, args.latency, args.size_kb, args.idle_seconds))
+
+
+if __name__ == "__main__":
+    main()
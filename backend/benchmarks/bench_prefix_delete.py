@@ -0,0 +1,103 @@
+"""
+Bulk prefix deletion throughput.
+
+Seeds a FakeGCSServer bucket with many objects under one user folder and
+deletes them through the real GCSService:
+- legacy: list + one DELETE per object (the old delete_user_folder loop),
+  run on a smaller sample because it is slow
+- batched: GCSService.delete_user_folder (batched + parallel)
+It also interrupts a batched run midway and resumes it, checking that the
+second call deletes exactly what was left.
+
+Usage (from backend/):
+    python -m benchmarks.bench_prefix_delete [--objects 50000] [--latency 0.01]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from .fake_gcs_server import FakeGCSServer
+
+
+class Interrupted(Exception):
+    pass
+
+
+def seed(server: FakeGCSServer, bucket: str, user_id: str, count: int):
+    for i in range(count):
+        server.put_object(bucket, f"users/user_{user_id}/trips/trip_{i % 50}/photo_{i:06d}_original.jpg")
+
+
+def legacy_delete(service, prefix: str) -> int:
+    deleted_count = 0
+    for blob in service.bucket.list_blobs(prefix=prefix):
+        blob.delete()
+        deleted_count += 1
+    return deleted_count
+
+
+def run(objects: int, legacy_objects: int, latency: float):
+    server = FakeGCSServer(latency=latency).start()
+    os.environ["STORAGE_EMULATOR_HOST"] = server.url
+    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "/nonexistent"
+
+    from app.services import gcs
+
+    service = gcs.GCSService()
+    bucket = gcs.GCS_BUCKET_NAME
+    print(f"storage latency {latency * 1000:.0f} ms/request, {gcs.GCS_DELETE_WORKERS} workers, "
+          f"{gcs.GCS_DELETE_BATCH_SIZE} objects/batch")
+
+    # Legacy one-by-one loop
+    seed(server, bucket, "legacy", legacy_objects)
+    server.reset_counts()
+    start = time.perf_counter()
+    deleted = legacy_delete(service, "users/user_legacy/")
+    elapsed = time.perf_counter() - start
+    print(f"legacy   deleted={deleted:<7} time={elapsed:7.2f}s rate={deleted / elapsed:9.0f} obj/s "
+          f"requests={server.calls['total']}")
+
+    # Batched + parallel
+    seed(server, bucket, "bench", objects)
+    server.reset_counts()
+    start = time.perf_counter()
+    deleted = service.delete_user_folder("bench")
+    elapsed = time.perf_counter() - start
+    print(f"batched  deleted={deleted:<7} time={elapsed:7.2f}s rate={deleted / elapsed:9.0f} obj/s "
+          f"requests={server.calls['total']}")
+
+    # Interrupt halfway, then resume
+    seed(server, bucket, "resume", objects)
+
+    def interrupt(deleted_count):
+        if deleted_count >= objects // 2:
+            raise Interrupted()
+
+    try:
+        service.delete_user_folder("resume", progress=interrupt)
+    except Interrupted:
+        pass
+    remaining = server.count(bucket, "users/user_resume/")
+    resumed = service.delete_user_folder("resume")
+    left = server.count(bucket, "users/user_resume/")
+    print(f"resume   interrupted with {remaining} left, resumed run deleted {resumed}, {left} remain")
+
+    server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--objects", type=int, default=50000)
+    parser.add_argument("--legacy-objects", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.01, help="seconds per fake storage request")
+    args = parser.parse_args()
+    run(args.objects, args.legacy_objects, args.latency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Storage API requests per upload.
+
+Runs the real GCSService against FakeGCSServer and counts the HTTP requests
+each upload makes under both GCS_PUBLIC_ACCESS modes, plus the wall time per
+upload when every request carries a simulated network round-trip.
+
+Usage (from backend/):
+    python -m benchmarks.bench_storage_calls [--uploads 20] [--latency 0.02]
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from .fake_gcs_server import FakeGCSServer
+
+
+def run(uploads: int, latency: float, sizes_kb: list[int]):
+    server = FakeGCSServer(latency=latency).start()
+    os.environ["STORAGE_EMULATOR_HOST"] = server.url
+    os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = "/nonexistent"
+
+    from app.services import gcs
+
+    service = gcs.GCSService()
+    # Warm-up: the client library fetches bucket metadata once per client
+    service.upload_stream(io.BytesIO(b"warmup"), "bench", "bench", "warmup.jpg", "image/jpeg")
+    time.sleep(0.5)
+    print(f"{'mode':<8} {'size':>8} {'requests/upload':>16} {'acl/upload':>11} {'ms/upload':>10}")
+    for mode in ("object", "bucket"):
+        gcs.GCS_PUBLIC_ACCESS = mode
+        for size_kb in sizes_kb:
+            payload = os.urandom(size_kb * 1024)
+            server.reset_counts()
+            start = time.perf_counter()
+            for _ in range(uploads):
+                service.upload_stream(io.BytesIO(payload), "bench", "bench", "photo.jpg", "image/jpeg")
+            elapsed = time.perf_counter() - start
+            print(
+                f"{mode:<8} {size_kb:>6}KB {server.calls['total'] / uploads:>16.1f} "
+                f"{server.calls['acl'] / uploads:>11.1f} {elapsed / uploads * 1000:>10.1f}"
+            )
+    server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--uploads", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per fake storage request")
+    parser.add_argument("--sizes-kb", type=int, nargs="+", default=[512, 20 * 1024])
+    args = parser.parse_args()
+    run(args.uploads, args.latency, args.sizes_kb)
+
+
+if __name__ == "__main__":
+    main()
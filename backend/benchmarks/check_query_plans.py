@@ -0,0 +1,233 @@
+"""
+Query plan check for the hot listing and membership queries.
+
+Builds a throwaway database with `alembic upgrade head` (so the migrations
+are exercised too), seeds it, and EXPLAINs the query each endpoint runs.
+A check fails unless the plan reads the index that migration 0003 added for
+it. On PostgreSQL sequential scans are disabled for the EXPLAIN, so the
+check asks "can the planner use the index" rather than depending on how
+much data was seeded; SQLite uses EXPLAIN QUERY PLAN.
+
+Point BENCH_DATABASE_URL at an empty PostgreSQL database for the real
+check; its tables are dropped first.
+
+Usage (from backend/):
+    BENCH_DATABASE_URL=postgresql://... python -m benchmarks.check_query_plans [--rows 2000]
+"""
+
+import argparse
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+os.environ["DB_AUTO_CREATE"] = "false"
+
+from .harness import BACKEND_DIR, SessionLocal  # noqa: E402
+
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app.database import Base, engine  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.models.trip import Trip, TripMember  # noqa: E402
+from app.models.media import Media  # noqa: E402
+from app.models.expense import Expense  # noqa: E402
+from app.models.expense_trip import ExpenseTrip, ExpenseTripMember  # noqa: E402
+from app.models.itinerary_trip import ItineraryTrip, ItineraryTripMember  # noqa: E402
+from app.models.itinerary_day import ItineraryDay  # noqa: E402
+from app.models.itinerary_activity import ItineraryActivity  # noqa: E402
+from app.models.itinerary_packing import ItineraryPackingList  # noqa: E402
+from app.utils.pagination import after_cursor  # noqa: E402
+
+
+def migrate():
+    """Recreate the schema from the migrations."""
+    if engine.dialect.name == "postgresql":
+        Base.metadata.drop_all(bind=engine)
+        with engine.begin() as connection:
+            connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
+    command.upgrade(Config(str(BACKEND_DIR / "alembic.ini")), "head")
+
+
+def seed(db, rows: int) -> dict:
+    """Insert a spread of users, trips and content; return ids to query with."""
+    users = [User(email=f"plan{i}@example.com", password_hash="x", name=f"User {i}") for i in range(20)]
+    db.add_all(users)
+    db.flush()
+
+    trips = [Trip(name=f"Trip {i}", created_by=users[i % len(users)].id) for i in range(40)]
+    expense_trips = [ExpenseTrip(name=f"Budget {i}", created_by=users[i % len(users)].id) for i in range(40)]
+    itinerary_trips = [
+        ItineraryTrip(
+            name=f"Plan {i}", start_date=date(2026, 1, 1), end_date=date(2026, 1, 10),
+            created_by=users[i % len(users)].id
+        )
+        for i in range(40)
+    ]
+    db.add_all(trips + expense_trips + itinerary_trips)
+    db.flush()
+
+    for i, user in enumerate(users):
+        for j in range(4):
+            k = (i * 2 + j) % 40
+            db.add(TripMember(trip_id=trips[k].id, user_id=user.id))
+            db.add(ExpenseTripMember(trip_id=expense_trips[k].id, user_id=user.id))
+            db.add(ItineraryTripMember(trip_id=itinerary_trips[k].id, user_id=user.id))
+
+    start = datetime(2026, 1, 1)
+    db.add_all(
+        Media(
+            user_id=users[i % len(users)].id,
+            trip_id=trips[i % len(trips)].id,
+            gcs_path=f"plan/{i}.jpg",
+            public_url=f"https://example.com/plan/{i}.jpg",
+            filename=f"{i}.jpg",
+            mime_type="image/jpeg",
+            size_bytes=1000,
+            is_favorite=i % 50 == 0,
+            created_at=start + timedelta(minutes=i)
+        )
+        for i in range(rows)
+    )
+    db.add_all(
+        Expense(
+            trip_id=expense_trips[i % len(expense_trips)].id,
+            payer_id=users[i % len(users)].id,
+            amount=10,
+            description=f"Expense {i}",
+            date=start + timedelta(minutes=i)
+        )
+        for i in range(rows)
+    )
+
+    days = [
+        ItineraryDay(trip_id=trip.id, day_number=n, date=date(2026, 1, n))
+        for trip in itinerary_trips for n in range(1, 11)
+    ]
+    db.add_all(days)
+    db.flush()
+    db.add_all(
+        ItineraryActivity(day_id=days[i % len(days)].id, title=f"Activity {i}", order_index=i // len(days))
+        for i in range(rows)
+    )
+    db.add_all(
+        ItineraryPackingList(trip_id=itinerary_trips[i % len(itinerary_trips)].id, item=f"Item {i}")
+        for i in range(rows)
+    )
+    db.commit()
+
+    return {
+        "user": users[0],
+        "trip": trips[0],
+        "expense_trip": expense_trips[0],
+        "itinerary_trip": itinerary_trips[0],
+        "day": days[0],
+    }
+
+
+def build_checks(db, ids: dict) -> list:
+    """
+    Queries shaped like the ones the routers run.
+
+    Each entry is (endpoint, query, acceptable index names). Indexes backing
+    a primary key or unique constraint are named differently on SQLite.
+    """
+    user, trip = ids["user"], ids["trip"]
+
+    trip_media = db.query(Media, User.name.label("uploader_name")).join(User, Media.user_id == User.id).filter(
+        Media.trip_id == trip.id,
+        Media.status == "ready"
+    )
+    user_trip_ids = db.query(TripMember.trip_id).filter(TripMember.user_id == user.id).subquery()
+    favorites = db.query(Media, User.name.label("uploader_name")).join(User, Media.user_id == User.id).filter(
+        Media.is_favorite == True,
+        Media.status == "ready",
+        Media.trip_id.in_(user_trip_ids)
+    )
+
+    return [
+        ("GET /media/trip/{id}",
+         after_cursor(trip_media, Media.created_at, Media.id, None).limit(51),
+         ("ix_media_trip_created_id",)),
+        ("GET /media/favorites",
+         after_cursor(favorites, Media.created_at, Media.id, None).limit(51),
+         ("ix_media_favorite_trip_created_id",)),
+        ("trip membership check",
+         db.query(TripMember).filter(TripMember.trip_id == trip.id, TripMember.user_id == user.id).limit(1),
+         ("trip_members_pkey", "sqlite_autoindex_trip_members")),
+        ("GET /trips/",
+         db.query(Trip).join(TripMember).filter(TripMember.user_id == user.id),
+         ("ix_trip_members_user_id",)),
+        ("GET /expenses/trip/{id}",
+         db.query(Expense).filter(Expense.trip_id == ids["expense_trip"].id).order_by(Expense.date.desc()),
+         ("ix_expenses_trip_date",)),
+        ("expense membership check",
+         db.query(ExpenseTripMember).filter(
+             ExpenseTripMember.trip_id == ids["expense_trip"].id,
+             ExpenseTripMember.user_id == user.id
+         ).limit(1),
+         ("ix_expense_trip_members_trip_user",)),
+        ("GET /itinerary/trips",
+         db.query(ItineraryTripMember).filter(ItineraryTripMember.user_id == user.id),
+         ("ix_itinerary_trip_members_user_id",)),
+        ("GET /itinerary/trips/{id}/days",
+         db.query(ItineraryDay).filter(
+             ItineraryDay.trip_id == ids["itinerary_trip"].id
+         ).order_by(ItineraryDay.day_number),
+         ("uq_trip_day_number", "sqlite_autoindex_itinerary_days")),
+        ("GET /itinerary/days/{id}/activities",
+         db.query(ItineraryActivity).filter(
+             ItineraryActivity.day_id == ids["day"].id
+         ).order_by(ItineraryActivity.order_index),
+         ("ix_itinerary_activities_day_order",)),
+        ("GET /itinerary/trips/{id}/packing",
+         db.query(ItineraryPackingList).filter(ItineraryPackingList.trip_id == ids["itinerary_trip"].id),
+         ("ix_itinerary_packing_lists_trip_id",)),
+    ]
+
+
+def explain(db, query) -> str:
+    """Return the plan of a query as text."""
+    dialect = db.get_bind().dialect
+    sql = str(query.statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+    if dialect.name == "postgresql":
+        rows = db.execute(text(f"EXPLAIN {sql}")).all()
+        return "\n".join(row[0] for row in rows)
+    rows = db.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+def run(rows: int) -> bool:
+    migrate()
+    db = SessionLocal()
+    try:
+        ids = seed(db, rows)
+        db.execute(text("ANALYZE"))
+        db.commit()
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(text("SET enable_seqscan = off"))
+
+        print(f"{engine.dialect.name}, {rows} rows per content table")
+        ok = True
+        for endpoint, query, index_names in build_checks(db, ids):
+            plan = explain(db, query)
+            used = next((name for name in index_names if name in plan), None)
+            print(f"{'ok' if used else 'FAIL':<5} {endpoint:<38} {used or index_names[0]}")
+            if not used:
+                ok = False
+                print("      " + plan.replace("\n", "\n      "))
+        return ok
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2000, help="rows per media/expense/activity/packing table")
+    args = parser.parse_args()
+    sys.exit(0 if run(args.rows) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+Minimal local GCS JSON API server for benchmarks.
+
+Implements just enough of the storage API for the real GCSService (via
+google-cloud-storage pointed at STORAGE_EMULATOR_HOST) to upload, publish,
+inspect, list and delete objects, and counts every request it receives so
+benchmarks can report storage API calls per operation.
+
+Usage:
+    server = FakeGCSServer().start()
+    os.environ["STORAGE_EMULATOR_HOST"] = server.url
+    ...
+    print(server.calls)
+    server.stop()
+"""
+
+import base64
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import Counter
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, unquote
+
+import google_crc32c
+
+
+def _object_resource(bucket: str, name: str, data: bytes, content_type: str = None) -> dict:
+    return {
+        "kind": "storage#object",
+        "bucket": bucket,
+        "name": name,
+        "id": f"{bucket}/{name}/1",
+        "generation": "1",
+        "metageneration": "1",
+        "size": str(len(data)),
+        "contentType": content_type or "application/octet-stream",
+        "md5Hash": base64.b64encode(hashlib.md5(data).digest()).decode(),
+        "crc32c": base64.b64encode(google_crc32c.value(data).to_bytes(4, "big")).decode(),
+    }
+
+
+class FakeGCSServer:
+    """Threaded in-memory GCS stand-in listening on localhost."""
+
+    def __init__(self, latency: float = 0.0):
+        """
+        Args:
+            latency: Seconds added to every request, to mimic network round-trips
+        """
+        self.latency = latency
+        self.objects: dict[tuple[str, str], tuple[bytes, str]] = {}
+        self.sessions: dict[str, dict] = {}
+        self.calls: Counter = Counter()
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeGCSServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def reset_counts(self):
+        with self._lock:
+            self.calls.clear()
+
+    def put_object(self, bucket: str, name: str, data: bytes = b"", content_type: str = None):
+        """Seed an object directly, without counting a request."""
+        with self._lock:
+            self.objects[(bucket, name)] = (data, content_type)
+
+    def count(self, bucket: str, prefix: str = "") -> int:
+        with self._lock:
+            return sum(1 for b, n in self.objects if b == bucket and n.startswith(prefix))
+
+    def _record(self, kind: str, in_batch: bool = False):
+        """Count a call; sub-requests of a batch aren't separate HTTP requests."""
+        with self._lock:
+            self.calls[kind] += 1
+            if not in_batch:
+                self.calls["total"] += 1
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            # --- helpers -------------------------------------------------
+            def _body(self) -> bytes:
+                length = int(self.headers.get("Content-Length") or 0)
+                return self.rfile.read(length) if length else b""
+
+            def _send(self, status: int, payload=None, headers: dict = None):
+                body = json.dumps(payload).encode() if payload is not None else b""
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                if payload is not None:
+                    self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _dispatch(self, method: str):
+                if server.latency:
+                    time.sleep(server.latency)
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                parts = url.path.strip("/").split("/")
+                body = self._body()
+
+                # /upload/storage/v1/b/{bucket}/o
+                if parts[:3] == ["upload", "storage", "v1"]:
+                    return self._upload(method, parts[4], query, body)
+                # /download/storage/v1/b/{bucket}/o/{name}
+                if parts[:3] == ["download", "storage", "v1"]:
+                    server._record("download")
+                    data, content_type = server.objects[(parts[4], unquote("/".join(parts[6:])))]
+                    self.send_response(200)
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    return self.wfile.write(data)
+                # /batch/storage/v1
+                if parts[:1] == ["batch"]:
+                    return self._batch(body)
+                # /storage/v1/b/{bucket}/o[/{name}[/acl]]
+                if parts[:3] == ["storage", "v1", "b"]:
+                    status, payload = server._object_call(method, parts[3:], query, body)
+                    return self._send(status, payload)
+                self._send(404, {"error": {"code": 404, "message": self.path}})
+
+            def _upload(self, method: str, bucket: str, query: dict, body: bytes):
+                upload_type = query.get("uploadType", [""])[0]
+                if method == "POST" and upload_type == "multipart":
+                    server._record("upload")
+                    message = BytesParser(policy=HTTP).parsebytes(
+                        b"Content-Type: " + self.headers["Content-Type"].encode() + b"\r\n\r\n" + body
+                    )
+                    metadata_part, media_part = list(message.iter_parts())
+                    metadata = json.loads(metadata_part.get_payload(decode=True))
+                    data = media_part.get_payload(decode=True)
+                    server.put_object(bucket, metadata["name"], data, metadata.get("contentType"))
+                    return self._send(200, _object_resource(bucket, metadata["name"], data))
+                if method == "POST" and upload_type == "resumable":
+                    server._record("upload")
+                    metadata = json.loads(body or b"{}")
+                    name = metadata.get("name") or query["name"][0]
+                    upload_id = uuid.uuid4().hex
+                    server.sessions[upload_id] = {"bucket": bucket, "name": name, "data": bytearray()}
+                    location = f"{server.url}/upload/storage/v1/b/{bucket}/o?uploadType=resumable&upload_id={upload_id}"
+                    return self._send(200, {}, {"Location": location})
+                if method == "PUT" and "upload_id" in query:
+                    server._record("upload")
+                    session = server.sessions[query["upload_id"][0]]
+                    content_range = self.headers.get("Content-Range", "")
+                    span, total = content_range.replace("bytes ", "").split("/")
+                    if span != "*":
+                        start = int(span.split("-")[0])
+                        session["data"][start:start + len(body)] = body
+                    if total != "*" and len(session["data"]) == int(total):
+                        data = bytes(session["data"])
+                        server.put_object(session["bucket"], session["name"], data)
+                        return self._send(200, _object_resource(session["bucket"], session["name"], data))
+                    headers = {"Range": f"bytes=0-{len(session['data']) - 1}"} if session["data"] else {}
+                    return self._send(308, None, headers)
+                self._send(400, {"error": {"code": 400, "message": "unsupported upload"}})
+
+            def _batch(self, body: bytes):
+                message = BytesParser(policy=HTTP).parsebytes(
+                    b"Content-Type: " + self.headers["Content-Type"].encode() + b"\r\n\r\n" + body
+                )
+                server._record("batch")
+                boundary = "batch_" + uuid.uuid4().hex
+                chunks = []
+                for index, part in enumerate(message.iter_parts()):
+                    request_line = part.get_payload(decode=True).splitlines()[0].decode()
+                    sub_method, sub_path, _ = request_line.split(" ")
+                    sub_url = urlparse(sub_path)
+                    sub_parts = sub_url.path.strip("/").split("/")
+                    status, payload = server._object_call(
+                        sub_method, sub_parts[3:], parse_qs(sub_url.query), b"", in_batch=True
+                    )
+                    content = json.dumps(payload) if payload is not None else ""
+                    chunks.append(
+                        f"--{boundary}\r\nContent-Type: application/http\r\n"
+                        f"Content-ID: <response-{index + 1}>\r\n\r\n"
+                        f"HTTP/1.1 {status} OK\r\nContent-Type: application/json\r\n"
+                        f"Content-Length: {len(content)}\r\n\r\n{content}\r\n"
+                    )
+                payload = ("".join(chunks) + f"--{boundary}--\r\n").encode()
+                self.send_response(200)
+                self.send_header("Content-Type", f"multipart/mixed; boundary={boundary}")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+            def do_PUT(self):
+                self._dispatch("PUT")
+
+            def do_PATCH(self):
+                self._dispatch("PATCH")
+
+            def do_DELETE(self):
+                self._dispatch("DELETE")
+
+        return Handler
+
+    def _object_call(self, method: str, parts: list[str], query: dict, body: bytes, in_batch: bool = False):
+        """Handle /storage/v1/b/{bucket}[/o[/{name}[/acl]]] (also used by batch)."""
+        bucket = parts[0]
+        not_found = (404, {"error": {"code": 404, "message": "Not Found"}})
+        if len(parts) == 1:
+            # Bucket metadata; the client library fetches and caches this once
+            self._record("bucket", in_batch)
+            return 200, {"kind": "storage#bucket", "id": bucket, "name": bucket, "location": "US"}
+        if len(parts) == 2:
+            self._record("list", in_batch)
+            prefix = query.get("prefix", [""])[0]
+            max_results = int(query.get("maxResults", ["1000"])[0])
+            token = query.get("pageToken", [""])[0]
+            with self._lock:
+                names = sorted(n for b, n in self.objects if b == bucket and n.startswith(prefix) and n > token)
+                page = names[:max_results]
+                items = [_object_resource(bucket, n, *self.objects[(bucket, n)]) for n in page]
+            payload = {"kind": "storage#objects", "items": items}
+            if len(names) > max_results:
+                payload["nextPageToken"] = page[-1]
+            return 200, payload
+
+        if parts[-1] == "acl":
+            self._record("acl", in_batch)
+            return 200, {"items": []}
+
+        name = unquote("/".join(parts[2:]))
+        key = (bucket, name)
+        if method == "DELETE":
+            self._record("delete", in_batch)
+            with self._lock:
+                if self.objects.pop(key, None) is None:
+                    return not_found
+            return 204, None
+        if method == "PATCH":
+            self._record("acl", in_batch)
+        else:
+            self._record("metadata", in_batch)
+        with self._lock:
+            if key not in self.objects:
+                return not_found
+            data, content_type = self.objects[key]
+        return 200, _object_resource(bucket, name, data, content_type)
@@ -0,0 +1,138 @@
+"""
+In-process stand-in for GCSService used by the benchmarks.
+
+It keeps objects in memory and simulates the round-trip latency of the real
+storage API with a blocking sleep, so code that calls storage on the event
+loop shows up in the numbers exactly as it would against GCS.
+"""
+
+import io
+import time
+import hashlib
+import threading
+from collections import Counter
+from typing import Optional, BinaryIO
+
+from app.services import gcs
+from app.services.storage import StorageBackend
+
+
+class FakeGCSService(StorageBackend):
+    """Drop-in replacement for app.services.gcs.GCSService."""
+
+    def __init__(self, latency: float = 0.05, bucket_name: str = "bench-bucket"):
+        """
+        Args:
+            latency: Seconds each simulated storage API request blocks for
+            bucket_name: Bucket name used when building public URLs
+        """
+        self.latency = latency
+        self.bucket_name = bucket_name
+        self.objects: dict[str, bytes] = {}
+        self.calls: Counter = Counter()
+        self._sessions: dict[str, bytearray] = {}
+        self._lock = threading.Lock()
+
+    def _request(self, kind: str):
+        """Account for (and wait on) one storage API request."""
+        with self._lock:
+            self.calls[kind] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def upload_stream(
+        self,
+        file_obj: BinaryIO,
+        user_id: str,
+        trip_id: str,
+        filename: str,
+        content_type: str,
+        variant: str = "original"
+    ) -> tuple[str, str, int, str]:
+        blob_path = self._generate_blob_path(user_id, trip_id, filename, variant)
+        data = file_obj.read()
+        self._request("upload")
+        if gcs.GCS_PUBLIC_ACCESS == "object":
+            self._request("acl")
+        with self._lock:
+            self.objects[blob_path] = data
+        return blob_path, self.get_public_url(blob_path), len(data), hashlib.md5(data).hexdigest()
+
+    def upload_variant(self, original_path: str, variant: str, data: bytes,
+                       content_type: str = "image/webp", ext: str = ".webp") -> tuple[str, str]:
+        blob_path = self.variant_path(original_path, variant, ext)
+        self._request("upload")
+        if gcs.GCS_PUBLIC_ACCESS == "object":
+            self._request("acl")
+        with self._lock:
+            self.objects[blob_path] = data
+        return blob_path, self.get_public_url(blob_path)
+
+    def delete_file(self, blob_path: str) -> bool:
+        self._request("delete")
+        with self._lock:
+            return self.objects.pop(blob_path, None) is not None
+
+    def delete_prefix(self, prefix: str, progress=None) -> int:
+        self._request("list")
+        names = [name for name in list(self.objects) if name.startswith(prefix)]
+        for name in names:
+            self.delete_file(name)
+        if progress:
+            progress(len(names))
+        return len(names)
+
+    def get_public_url(self, blob_path: str) -> str:
+        return f"https://storage.googleapis.com/{self.bucket_name}/{blob_path}"
+
+    def get_blob_path(self, public_url: str) -> Optional[str]:
+        prefix = f"https://storage.googleapis.com/{self.bucket_name}/"
+        if not public_url or not public_url.startswith(prefix):
+            return None
+        return public_url[len(prefix):]
+
+    def generate_signed_url(self, blob_path: str, filename: str, expiration_mins: int = 15) -> str:
+        return self.get_public_url(blob_path)
+
+    def generate_upload_url(self, user_id: str, trip_id: str, filename: str,
+                            content_type: str, expiration_mins: int = 15) -> tuple[str, str]:
+        blob_path = self._generate_blob_path(user_id, trip_id, filename)
+        return blob_path, f"https://fake-upload.invalid/{self.bucket_name}/{blob_path}"
+
+    def get_file_info(self, blob_path: str) -> Optional[dict]:
+        self._request("metadata")
+        data = self.objects.get(blob_path)
+        if data is None:
+            return None
+        return {"size_bytes": len(data), "content_type": None, "md5_hash": None}
+
+    def make_public(self, blob_path: str) -> str:
+        if gcs.GCS_PUBLIC_ACCESS == "object":
+            self._request("acl")
+        return self.get_public_url(blob_path)
+
+    def create_resumable_session(self, user_id: str, trip_id: str, filename: str,
+                                 content_type: str, size_bytes: int) -> tuple[str, str]:
+        self._request("upload")
+        blob_path = self._generate_blob_path(user_id, trip_id, filename)
+        with self._lock:
+            self._sessions[blob_path] = bytearray()
+        return blob_path, f"fake-session://{blob_path}"
+
+    def upload_chunk(self, session_url: str, data: bytes, offset: int, total_size: int) -> int:
+        self._request("upload")
+        blob_path = session_url[len("fake-session://"):]
+        with self._lock:
+            buffer = self._sessions[blob_path]
+            buffer[offset:offset + len(data)] = data
+            if len(buffer) == total_size:
+                self.objects[blob_path] = bytes(buffer)
+            return len(buffer)
+
+    def get_committed_bytes(self, session_url: str, total_size: int) -> int:
+        self._request("upload")
+        return len(self._sessions[session_url[len("fake-session://"):]])
+
+    def get_file_stream(self, blob_path: str):
+        self._request("download")
+        return io.BytesIO(self.objects[blob_path])
@@ -0,0 +1,107 @@
+"""
+Shared setup for the benchmark scripts.
+
+Importing this module points the app at a throwaway database (SQLite unless
+BENCH_DATABASE_URL is set) before the app is imported, and
+install_fake_storage() swaps the storage backend for FakeGCSService (or
+install_local_storage() for LocalStorage in a scratch directory), so
+benchmarks never touch real infrastructure.
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL", "sqlite:///./bench.db")
+os.environ.setdefault("DB_AUTO_CREATE", "true")
+
+if os.environ["DATABASE_URL"].startswith("sqlite:///"):
+    db_file = Path(os.environ["DATABASE_URL"][len("sqlite:///"):])
+    if db_file.exists():
+        db_file.unlink()
+
+from app.services import storage  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.deps import get_current_user, get_current_user_async  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+from .fakes import FakeGCSService  # noqa: E402
+
+
+def install_fake_storage(latency: float = 0.05) -> FakeGCSService:
+    """Replace the storage backend with an in-memory fake."""
+    fake = FakeGCSService(latency=latency)
+    storage._storage = fake
+    return fake
+
+
+def install_local_storage(root: str = None):
+    """Replace the storage backend with LocalStorage in `root` (a new temporary directory by default)."""
+    import tempfile
+    from app.services.local_storage import LocalStorage
+
+    backend = LocalStorage(root or tempfile.mkdtemp(prefix="bench-storage-"), "http://bench/files")
+    storage._storage = backend
+    return backend
+
+
+def authenticate_as(user_id):
+    """Make every request run as the given user, skipping JWT handling."""
+    from fastapi import Depends
+    from app.database import get_db, get_async_db
+
+    def _current_user(db=Depends(get_db)):
+        return db.get(User, user_id)
+
+    async def _current_user_async(db=Depends(get_async_db)):
+        return await db.get(User, user_id)
+
+    app.dependency_overrides[get_current_user] = _current_user
+    app.dependency_overrides[get_current_user_async] = _current_user_async
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of samples (seconds)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(name: str, samples: list[float], elapsed: float = None) -> str:
+    """Format a one-line latency summary in milliseconds."""
+    line = (
+        f"{name:<40} n={len(samples):<6} "
+        f"p50={percentile(samples, 50) * 1000:8.2f}ms "
+        f"p99={percentile(samples, 99) * 1000:8.2f}ms "
+        f"max={max(samples, default=0) * 1000:8.2f}ms"
+    )
+    if elapsed:
+        line += f" rps={len(samples) / elapsed:8.1f}"
+    return line
+
+
+class Timer:
+    """Context manager that appends the elapsed time to a list."""
+
+    def __init__(self, samples: list[float]):
+        self.samples = samples
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.samples.append(time.perf_counter() - self.start)
+
+
+__all__ = [
+    "app", "SessionLocal", "install_fake_storage", "install_local_storage", "authenticate_as",
+    "percentile", "summarize", "Timer",
+]
@@ -0,0 +1,65 @@
+"""
+Shared fixtures. Tests run against a throwaway SQLite database, set up here
+before the app's modules read DATABASE_URL.
+"""
+
+import os
+import tempfile
+import uuid
+from datetime import date
+
+import pytest
+
+_database_dir = tempfile.mkdtemp(prefix="tests-db-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_database_dir}/test.db"
+os.environ.setdefault("STORAGE_BACKEND", "local")
+os.environ.setdefault("LOCAL_STORAGE_ROOT", os.path.join(_database_dir, "storage"))
+os.environ.setdefault("JOB_WORKER_EMBEDDED", "false")
+
+from app import models  # noqa: E402,F401  (registers every table)
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models.itinerary_trip import ItineraryTrip  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def tables():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def trip(db):
+    trip = ItineraryTrip(name="Trip", start_date=date(2026, 1, 1), end_date=date(2026, 1, 14), created_by=uuid.uuid4())
+    db.add(trip)
+    db.commit()
+    return trip
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+    return TestClient(app)
+
+
+@pytest.fixture
+def user(client, db):
+    """A registered user; `user.headers` authenticates as them."""
+    email = f"{uuid.uuid4().hex}@example.com"
+    token = client.post(
+        "/auth/register", json={"email": email, "password": "password123", "name": "Tester"}
+    ).json()["access_token"]
+    user = db.query(User).filter(User.email == email).one()
+    user.headers = {"Authorization": f"Bearer {token}"}
+    return user
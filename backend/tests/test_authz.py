@@ -0,0 +1,14 @@
+import uuid
+
+from app.models.itinerary_trip import ItineraryTripMember
+from app.services.authz import ITINERARY, get_role
+
+
+def test_non_members_are_not_cached(db, trip):
+    user_id = uuid.uuid4()
+    assert get_role(db, ITINERARY, trip.id, user_id) is None
+
+    # Joining in another process invalidates only that process's cache
+    db.add(ItineraryTripMember(trip_id=trip.id, user_id=user_id, role="viewer"))
+    db.commit()
+    assert get_role(db, ITINERARY, trip.id, user_id) == "viewer"
@@ -0,0 +1,111 @@
+import uuid
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+from fastapi.exceptions import RequestValidationError
+
+from app.models.itinerary_activity import ItineraryActivity
+from app.models.itinerary_day import ItineraryDay
+from app.models.itinerary_tombstone import ItineraryTombstone
+from app.models.itinerary_trip import ItineraryTrip
+from app.schemas.itinerary import ItineraryBatchOperation
+from app.services.itinerary_batch import _existing, apply_batch
+
+USER_ID = uuid.uuid4()
+
+
+def ops(*operations):
+    return [ItineraryBatchOperation(**operation) for operation in operations]
+
+
+def create_day(ref=None, day_number=1):
+    return {"op": "create", "entity": "day", "ref": ref, "data": {"day_number": day_number, "date": "2026-01-01"}}
+
+
+def create_activity(day_id, ref=None, title="Museum"):
+    return {"op": "create", "entity": "activity", "ref": ref, "data": {"day_id": day_id, "title": title, "order_index": 0}}
+
+
+def batch_error(db, trip, *operations) -> HTTPException:
+    with pytest.raises(HTTPException) as raised:
+        apply_batch(db, trip.id, USER_ID, ops(*operations))
+    return raised.value
+
+
+def test_refs_resolve_within_the_batch(db, trip):
+    version, results = apply_batch(db, trip.id, USER_ID, ops(create_day("d1"), create_activity("d1", "a1")))
+    day_id, activity_id = results[0]["id"], results[1]["id"]
+    assert db.get(ItineraryActivity, activity_id).day_id == day_id
+    assert db.get(ItineraryDay, day_id).version == version
+
+
+def test_unknown_ref(db, trip):
+    error = batch_error(db, trip, create_activity("nope"))
+    assert (error.status_code, error.detail) == (400, "Operation 0: unknown ref 'nope'")
+
+
+def test_duplicate_ref(db, trip):
+    error = batch_error(db, trip, create_day("d"), create_day("d", day_number=2))
+    assert (error.status_code, error.detail) == (400, "Operation 1: ref 'd' is used twice")
+
+
+def test_ref_of_another_entity(db, trip):
+    error = batch_error(db, trip, create_day("d1"), {"op": "delete", "entity": "activity", "id": "d1"})
+    assert (error.status_code, error.detail) == (400, "Operation 1: ref 'd1' is not a activity")
+
+
+def test_create_with_id_and_update_without(db, trip):
+    assert batch_error(db, trip, {"op": "create", "entity": "day", "id": str(uuid.uuid4())}).status_code == 400
+    assert batch_error(db, trip, {"op": "update", "entity": "day", "data": {}}).detail == "Operation 0: update needs an id"
+
+
+def test_invalid_data_points_at_the_operation(db, trip):
+    with pytest.raises(RequestValidationError) as raised:
+        apply_batch(db, trip.id, USER_ID, ops(create_day("d1"), {"op": "create", "entity": "day", "data": {}}))
+    assert raised.value.errors()[0]["loc"][:4] == ("body", "operations", 1, "data")
+
+
+def test_delete_of_a_row_created_in_the_same_batch(db, trip):
+    version, results = apply_batch(db, trip.id, USER_ID, ops(
+        create_day("d1"), create_activity("d1", "a1"), {"op": "delete", "entity": "activity", "id": "a1"}
+    ))
+    activity_id = results[1]["id"]
+    assert results[2]["id"] == activity_id
+    assert db.get(ItineraryActivity, activity_id) is None
+    tombstone = db.query(ItineraryTombstone).filter_by(entity_type="activity", entity_id=activity_id).one()
+    assert tombstone.version == version
+
+
+def test_existing_only_finds_the_trips_rows(db, trip):
+    _, results = apply_batch(db, trip.id, USER_ID, ops(create_day("d1"), create_activity("d1", "a1")))
+    day_id, activity_id = results[0]["id"], results[1]["id"]
+    other = ItineraryTrip(name="Other", start_date=date(2026, 1, 1), end_date=date(2026, 1, 2), created_by=USER_ID)
+    db.add(other)
+    db.commit()
+
+    unknown = uuid.uuid4()
+    wanted = {"day": {day_id, unknown}, "activity": {activity_id}, "packing_item": set()}
+    assert _existing(db, trip.id, wanted) == {"day": {day_id}, "activity": {activity_id}}
+    assert _existing(db, other.id, wanted) == {"day": set(), "activity": set()}
+
+    error = batch_error(db, other, {"op": "update", "entity": "activity", "id": str(activity_id), "data": {}})
+    assert (error.status_code, error.detail) == (404, "Operation 0: Activity not found")
+
+
+def test_duplicate_day_number_is_a_conflict(db, trip):
+    apply_batch(db, trip.id, USER_ID, ops(create_day(day_number=1)))
+    error = batch_error(db, trip, create_day(day_number=2), create_day(day_number=1))
+    assert (error.status_code, error.detail) == (409, "Operation 1: the trip already has a day with this day number")
+    assert db.query(ItineraryDay).filter_by(trip_id=trip.id).count() == 1
+
+
+def test_other_constraints_name_the_operation(db, trip):
+    _, results = apply_batch(db, trip.id, USER_ID, ops(create_day("d1"), create_activity("d1", "a1")))
+    version = db.get(ItineraryTrip, trip.id).version
+    error = batch_error(db, trip, create_day(day_number=2), {
+        "op": "update", "entity": "activity", "id": str(results[1]["id"]), "data": {"title": None}
+    })
+    assert (error.status_code, error.detail) == (422, "Operation 1: title cannot be null")
+    db.expire_all()
+    assert db.get(ItineraryTrip, trip.id).version == version
@@ -0,0 +1,73 @@
+import random
+
+from app.services.itinerary_order import ORDER_INDEX_GAP, plan_order
+
+
+def assert_increasing(indexes):
+    assert all(a < b for a, b in zip(indexes, indexes[1:])), indexes
+
+
+def test_dense_numbers_from_zero():
+    assert plan_order(["a", "b", "c"], {"a": 5, "b": 1, "c": 9}) == [0, 1, 2]
+
+
+def test_gaps_unchanged_order_keeps_indexes():
+    current = {"a": 0, "b": 1024, "c": 2048}
+    assert plan_order(["a", "b", "c"], current, gaps=True) == [0, 1024, 2048]
+
+
+def test_gaps_move_rewrites_only_the_moved_activity():
+    current = {"a": 0, "b": 1024, "c": 2048, "d": 3072}
+    planned = plan_order(["a", "d", "b", "c"], current, gaps=True)
+    assert planned[0] == 0 and planned[2:] == [1024, 2048]
+    assert 0 < planned[1] < 1024
+
+
+def test_gaps_move_to_front_goes_below_first():
+    current = {"a": 0, "b": 1024, "c": 2048}
+    planned = plan_order(["c", "a", "b"], current, gaps=True)
+    assert planned[1:] == [0, 1024]
+    assert planned[0] < 0
+
+
+def test_gaps_exhausted_renumbers_the_day():
+    # Nothing fits between 0 and 1
+    current = {"a": 0, "b": 1, "c": 2}
+    planned = plan_order(["a", "c", "b"], current, gaps=True)
+    assert planned == [0, ORDER_INDEX_GAP, 2 * ORDER_INDEX_GAP]
+
+
+def test_gaps_run_too_long_for_its_gap_renumbers_the_day():
+    current = {"a": 0, "b": 3}
+    planned = plan_order(["a", "x", "y", "z", "b"], current, gaps=True)
+    assert planned == [ORDER_INDEX_GAP * i for i in range(5)]
+
+
+def test_cross_day_move_in_takes_a_slot_between_neighbours():
+    # "x" comes from another day, so the target day has no index for it
+    current = {"a": 0, "b": 1024}
+    planned = plan_order(["a", "x", "b"], current, gaps=True)
+    assert planned[0] == 0 and planned[2] == 1024
+    assert 0 < planned[1] < 1024
+
+
+def test_cross_day_move_in_appended_and_into_empty_day():
+    assert plan_order(["a", "x"], {"a": 2048}, gaps=True) == [2048, 2048 + ORDER_INDEX_GAP]
+    assert_increasing(plan_order(["x", "y"], {}, gaps=True))
+
+
+def test_cross_day_move_out_leaves_the_rest_alone():
+    current = {"a": 0, "b": 1024, "c": 2048}
+    assert plan_order(["a", "c"], current, gaps=True) == [0, 2048]
+
+
+def test_gaps_any_order_is_increasing():
+    rng = random.Random(0)
+    for _ in range(200):
+        count = rng.randint(1, 30)
+        current = dict(zip(range(count), sorted(rng.sample(range(-50, 5000), count))))
+        ids = list(range(count)) + [f"new{k}" for k in range(rng.randint(0, 5))]
+        rng.shuffle(ids)
+        planned = plan_order(ids, current, gaps=True)
+        assert len(planned) == len(ids)
+        assert_increasing(planned)
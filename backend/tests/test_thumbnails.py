@@ -0,0 +1,69 @@
+import io
+import os
+import uuid
+from contextlib import contextmanager
+
+from PIL import Image
+
+from app.models.media import Media
+from app.services import thumbnails
+from app.services.local_storage import LOCAL_STORAGE_ROOT
+
+
+def stored_media(db, content: bytes) -> Media:
+    blob_path = f"users/user_test/trips/trip_test/{uuid.uuid4()}.jpg"
+    path = os.path.join(LOCAL_STORAGE_ROOT, blob_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(content)
+    media = Media(
+        user_id=uuid.uuid4(), gcs_path=blob_path, public_url=f"http://test/{blob_path}",
+        filename="photo.jpg", mime_type="image/jpeg", size_bytes=len(content)
+    )
+    db.add(media)
+    db.commit()
+    return media
+
+
+def jpeg(width=2000, height=1500) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "teal").save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def test_renders_variants(db):
+    media = stored_media(db, jpeg())
+    assert thumbnails.generate_thumbnails(db, media.id)
+    db.refresh(media)
+    assert media.thumbnail_url and media.medium_url
+
+
+def test_unreadable_image_is_skipped_not_retried(db):
+    media = stored_media(db, b"not an image")
+    assert thumbnails.generate_thumbnails(db, media.id) is False
+    db.refresh(media)
+    assert media.thumbnail_url is None
+
+
+def test_oversized_original_is_not_read(db, monkeypatch):
+    media = stored_media(db, jpeg())
+    monkeypatch.setattr(thumbnails, "THUMBNAIL_MAX_SOURCE_BYTES", 100)
+    monkeypatch.setattr(thumbnails, "_source_path", None)  # would fail if called
+    assert thumbnails.generate_thumbnails(db, media.id) is False
+
+
+def test_remote_original_is_spooled_to_a_file():
+    content = jpeg(10, 10)
+
+    class RemoteStorage:
+        def local_path(self, blob_path):
+            return None
+
+        @contextmanager
+        def get_file_stream(self, blob_path):
+            yield io.BytesIO(content)
+
+    with thumbnails._source_path(RemoteStorage(), "photo.jpg") as path:
+        with open(path, "rb") as f:
+            assert f.read() == content
+    assert not os.path.exists(path)
@@ -0,0 +1,54 @@
+from app.models.media import Media
+from app.models.upload_session import UploadSession
+
+GIB = 1024 ** 3
+
+
+def uploaded_session(db, user, size_bytes: int) -> UploadSession:
+    upload_session = UploadSession(
+        user_id=user.id, gcs_path=f"users/user_{user.id}/trips/personal/video.mp4",
+        session_url="unused", filename="video.mp4", mime_type="video/mp4",
+        size_bytes=size_bytes, committed_bytes=size_bytes, status="uploaded"
+    )
+    db.add(upload_session)
+    db.commit()
+    return upload_session
+
+
+def test_complete_session_over_2_gib(client, db, user):
+    size_bytes = 3 * GIB
+    upload_session = uploaded_session(db, user, size_bytes)
+
+    response = client.post(f"/media/uploads/{upload_session.id}/complete", headers=user.headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["size_bytes"] == size_bytes
+
+    db.refresh(upload_session)
+    assert upload_session.status == "complete"
+    assert db.get(Media, upload_session.media_id).size_bytes == size_bytes
+
+
+def test_chunked_upload_flow(client, user):
+    created = client.post("/media/uploads", json={
+        "filename": "a.jpg", "content_type": "image/jpeg", "size_bytes": 10
+    }, headers=user.headers)
+    assert created.status_code == 201, created.text
+    url = f"/media/uploads/{created.json()['session_id']}"
+    headers = {**user.headers, "Content-Range": "bytes 0-9/10"}
+
+    def oversized():
+        for _ in range(100):
+            yield b"x" * 65536
+
+    assert client.put(url, content=oversized(), headers=headers).status_code == 413
+    assert client.put(url, content=b"x" * 5, headers=headers).status_code == 400
+    assert client.post(f"{url}/complete", headers=user.headers).status_code == 409
+
+    chunk = client.put(url, content=b"x" * 10, headers=headers)
+    assert chunk.status_code == 200, chunk.text
+    assert chunk.json()["status"] == "uploaded"
+    assert client.get(url, headers=user.headers).json()["committed_bytes"] == 10
+
+    completed = client.post(f"{url}/complete", headers=user.headers)
+    assert completed.status_code == 200, completed.text
+    assert client.get(url, headers=user.headers).json()["media_id"] == completed.json()["id"]
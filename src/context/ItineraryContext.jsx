@@ -4,6 +4,16 @@ import { usePhotos } from './PhotoContext';
 
 const ItineraryContext = createContext();
 
+// Replace updated rows, append new ones and drop deleted ones
+const mergeRows = (rows, updates, deletedIds) => {
+    const updated = new Map(updates.map(row => [row.id, row]));
+    const known = new Set(rows.map(row => row.id));
+    return [
+        ...rows.filter(row => !deletedIds.has(row.id)).map(row => updated.get(row.id) || row),
+        ...updates.filter(row => !known.has(row.id))
+    ];
+};
+
 export const ItineraryProvider = ({ children }) => {
     const { currentUser } = usePhotos();
     const [trips, setTrips] = useState([]);
@@ -27,14 +37,16 @@ export const ItineraryProvider = ({ children }) => {
         }
     };
 
-    // Load trip details
+    // Load trip details, days, activities and packing list in one request
     const loadTrip = async (tripId) => {
         try {
             setLoading(true);
-            const response = await itinerary.getTrip(tripId);
-            setCurrentTrip(response.data);
-            await loadTripDays(tripId);
-            await loadPackingList(tripId);
+            const response = await itinerary.getTripFull(tripId);
+            const { days: tripDays, packing_items, ...trip } = response.data;
+            setCurrentTrip(trip);
+            setDays(tripDays.map(({ activities, ...day }) => day));
+            setActivities(Object.fromEntries(tripDays.map(day => [day.id, day.activities])));
+            setPackingList(packing_items);
         } catch (error) {
             console.error('Failed to load trip', error);
         } finally {
@@ -42,41 +54,54 @@ export const ItineraryProvider = ({ children }) => {
         }
     };
 
-    // Load days for trip
-    const loadTripDays = async (tripId) => {
-        try {
-            const response = await itinerary.getTripDays(tripId);
-            setDays(response.data);
-
-            // Load activities for each day
-            for (const day of response.data) {
-                await loadDayActivities(day.id);
-            }
-        } catch (error) {
-            console.error('Failed to load days', error);
+    // Apply what changed since the loaded version of the trip
+    const syncTrip = async (tripId) => {
+        if (currentTrip?.id !== tripId) {
+            return loadTrip(tripId);
         }
-    };
-
-    // Load activities for a day
-    const loadDayActivities = async (dayId) => {
         try {
-            const response = await itinerary.getDayActivities(dayId);
-            setActivities(prev => ({
-                ...prev,
-                [dayId]: response.data
-            }));
+            const response = await itinerary.getTripChanges(tripId, currentTrip.version);
+            const changes = response.data;
+            if (!changes.trip) return;
+
+            const deleted = new Set(changes.deleted.map(tombstone => tombstone.entity_id));
+            const changedActivities = new Set(changes.activities.map(activity => activity.id));
+            setCurrentTrip(changes.trip);
+            setDays(prev => mergeRows(prev, changes.days, deleted).sort((a, b) => a.day_number - b.day_number));
+            setActivities(prev => {
+                const next = {};
+                for (const [dayId, list] of Object.entries(prev)) {
+                    if (!deleted.has(dayId)) {
+                        next[dayId] = list.filter(a => !deleted.has(a.id) && !changedActivities.has(a.id));
+                    }
+                }
+                // An activity may have moved to another day
+                for (const activity of changes.activities) {
+                    (next[activity.day_id] ||= []).push(activity);
+                }
+                for (const list of Object.values(next)) {
+                    list.sort((a, b) => a.order_index - b.order_index);
+                }
+                return next;
+            });
+            setPackingList(prev => mergeRows(prev, changes.packing_items, deleted));
         } catch (error) {
-            console.error('Failed to load activities', error);
+            if (error.response?.status === 409) {
+                return loadTrip(tripId);
+            }
+            console.error('Failed to sync trip', error);
         }
     };
 
-    // Load packing list
-    const loadPackingList = async (tripId) => {
+    // Apply a batch of changes (e.g. a whole imported itinerary), then pull in the new rows
+    const applyBatch = async (tripId, operations) => {
         try {
-            const response = await itinerary.getPackingList(tripId);
-            setPackingList(response.data);
+            const response = await itinerary.applyBatch(tripId, operations);
+            await syncTrip(tripId);
+            return response.data;
         } catch (error) {
-            console.error('Failed to load packing list', error);
+            console.error('Failed to apply batch', error);
+            throw error;
         }
     };
 
@@ -204,6 +229,22 @@ export const ItineraryProvider = ({ children }) => {
         }
     };
 
+    // Reorder activities, possibly moving them between days: [{ day_id, activity_ids }]
+    const reorderActivities = async (tripId, dayOrders) => {
+        try {
+            const response = await itinerary.reorderActivities(tripId, dayOrders);
+            const next = Object.fromEntries(dayOrders.map(day => [day.day_id, []]));
+            for (const activity of response.data) {
+                next[activity.day_id].push(activity);
+            }
+            setActivities(prev => ({ ...prev, ...next }));
+            return response.data;
+        } catch (error) {
+            console.error('Failed to reorder activities', error);
+            throw error;
+        }
+    };
+
     // Delete activity
     const deleteActivity = async (activityId, dayId) => {
         try {
@@ -269,6 +310,8 @@ export const ItineraryProvider = ({ children }) => {
             loading,
             loadTrips,
             loadTrip,
+            syncTrip,
+            applyBatch,
             createTrip,
             joinTrip,
             updateTrip,
@@ -278,6 +321,7 @@ export const ItineraryProvider = ({ children }) => {
             deleteDay,
             addActivity,
             updateActivity,
+            reorderActivities,
             deleteActivity,
             addPackingItem,
             togglePacked,
@@ -23,29 +23,42 @@ const CollectionDetailsPage = () => {
     const [isLimitOpen, setIsLimitOpen] = useState(false);
     const [totalItems, setTotalItems] = useState(0);
     const [totalPages, setTotalPages] = useState(1);
+    // cursorsRef.current[n] is the cursor that fetches page n + 1
+    const cursorsRef = useRef([null]);
     const [localPhotos, setLocalPhotos] = useState([]);
     const [isLoadingPhotos, setIsLoadingPhotos] = useState(true);
 
+    // Cursors belong to one trip; start over when navigating to another
+    React.useEffect(() => {
+        cursorsRef.current = [null];
+        setPage(1);
+    }, [id]);
+
     const loadPaginatedPhotos = React.useCallback(async () => {
         if (!id) return;
         setIsLoadingPhotos(true);
         try {
-            const response = await media.getByTrip(id, page, limit);
-            const { items, total, pages } = response.data;
+            const response = await media.getByTrip(id, page, limit, cursorsRef.current[page - 1]);
+            const { items, total, pages, next_cursor } = response.data;
+            cursorsRef.current[page] = next_cursor;
             setLocalPhotos(items.map(p => ({
                 id: p.id,
                 uploader: p.uploader_name || 'Fetched User',
                 collectionId: p.trip_id,
                 file: null,
                 previewUrl: p.public_url,
+                thumbnailUrl: p.thumbnail_url || p.public_url,
                 timestamp: p.created_at,
                 description: '',
                 name: p.filename,
                 type: p.mime_type,
                 isFavorite: p.is_favorite
             })));
-            setTotalItems(total);
-            setTotalPages(pages);
+            // Later pages skip the count; keep the one from page 1
+            if (total !== null) {
+                setTotalItems(total);
+                setTotalPages(pages);
+            }
         } catch (error) {
             console.error("Failed to load paginated photos", error);
             toast.error("Failed to load photos");
@@ -485,6 +498,7 @@ const CollectionDetailsPage = () => {
                                                         onClick={() => {
                                                             setLimit(value);
                                                             setPage(1);
+                                                            cursorsRef.current = [null];
                                                             setIsLimitOpen(false);
                                                         }}
                                                         className={`w-full text-center py-2 px-3 text-xs font-medium transition-colors ${limit === value ? 'bg-blue-50 text-blue-600' : 'text-gray-700 hover:bg-gray-50'}`}
@@ -510,8 +524,8 @@ const CollectionDetailsPage = () => {
                                     <ChevronLeft size={14} />
                                 </button>
                                 <button
-                                    onClick={() => setPage(p => Math.min(totalPages, p + 1))}
-                                    disabled={page === totalPages}
+                                    onClick={() => setPage(p => p + 1)}
+                                    disabled={!cursorsRef.current[page]}
                                     className="p-1.5 rounded-lg hover:bg-gray-50 disabled:opacity-30 disabled:hover:bg-transparent transition-colors"
                                 >
                                     <ChevronRight size={14} />
@@ -574,7 +588,7 @@ const CollectionDetailsPage = () => {
                                             </div>
                                         </div>
                                     ) : (
-                                        <img src={photo.previewUrl} alt={photo.name} className={`w-full h-full object-cover transition-transform duration-300 ${isSelected ? 'rounded-md' : 'group-hover:scale-105'}`} loading="lazy" />
+                                        <img src={photo.thumbnailUrl || photo.previewUrl} alt={photo.name} className={`w-full h-full object-cover transition-transform duration-300 ${isSelected ? 'rounded-md' : 'group-hover:scale-105'}`} loading="lazy" />
                                     )}
                                     <div className={`absolute inset-0 transition-colors ${isSelected ? 'bg-blue-500/10' : 'bg-black/0 group-hover:bg-black/20'}`} />
 
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useState, useRef } from 'react';
 import { usePhotos } from '../context/PhotoContext';
 import { media } from '../services/api';
 import Lightbox from '../components/Lightbox';
@@ -17,6 +17,8 @@ const FavoritesPage = () => {
     const [isLimitOpen, setIsLimitOpen] = useState(false);
     const [totalItems, setTotalItems] = useState(0);
     const [totalPages, setTotalPages] = useState(1);
+    // cursorsRef.current[n] is the cursor that fetches page n + 1
+    const cursorsRef = useRef([null]);
     const [localPhotos, setLocalPhotos] = useState([]);
     const [isLoadingPhotos, setIsLoadingPhotos] = useState(true);
 
@@ -31,22 +33,27 @@ const FavoritesPage = () => {
     const loadPaginatedFavorites = React.useCallback(async () => {
         setIsLoadingPhotos(true);
         try {
-            const response = await media.getFavorites(page, limit);
-            const { items, total, pages } = response.data;
+            const response = await media.getFavorites(page, limit, cursorsRef.current[page - 1]);
+            const { items, total, pages, next_cursor } = response.data;
+            cursorsRef.current[page] = next_cursor;
             setLocalPhotos(items.map(p => ({
                 id: p.id,
                 uploader: p.uploader_name || 'Fetched User',
                 collectionId: p.trip_id,
                 file: null,
                 previewUrl: p.public_url,
+                thumbnailUrl: p.thumbnail_url || p.public_url,
                 timestamp: p.created_at,
                 description: '',
                 name: p.filename,
                 type: p.mime_type,
                 isFavorite: p.is_favorite
             })));
-            setTotalItems(total);
-            setTotalPages(pages);
+            // Later pages skip the count; keep the one from page 1
+            if (total !== null) {
+                setTotalItems(total);
+                setTotalPages(pages);
+            }
         } catch (error) {
             console.error("Failed to load favorites", error);
         } finally {
@@ -195,6 +202,7 @@ const FavoritesPage = () => {
                                                         onClick={() => {
                                                             setLimit(value);
                                                             setPage(1);
+                                                            cursorsRef.current = [null];
                                                             setIsLimitOpen(false);
                                                         }}
                                                         className={`w-full text-center py-2 px-3 text-xs font-medium transition-colors ${limit === value ? 'bg-blue-50 text-blue-600' : 'text-gray-700 hover:bg-gray-50'}`}
@@ -220,8 +228,8 @@ const FavoritesPage = () => {
                                     <ChevronLeft size={14} />
                                 </button>
                                 <button
-                                    onClick={() => setPage(p => Math.min(totalPages, p + 1))}
-                                    disabled={page === totalPages}
+                                    onClick={() => setPage(p => p + 1)}
+                                    disabled={!cursorsRef.current[page]}
                                     className="p-1.5 rounded-lg hover:bg-gray-50 disabled:opacity-30 disabled:hover:bg-transparent transition-colors"
                                 >
                                     <ChevronRight size={14} />
@@ -300,7 +308,7 @@ const FavoritesPage = () => {
                                     className={`aspect-square bg-gray-100 rounded-lg overflow-hidden relative group border cursor-pointer transition-all duration-200 ${isSelected ? 'ring-4 ring-blue-500 border-transparent p-1' : 'border-gray-100 hover:shadow-md'}`}
                                 >
                                     <img
-                                        src={photo.previewUrl}
+                                        src={photo.thumbnailUrl || photo.previewUrl}
                                         alt={photo.name}
                                         className={`w-full h-full object-cover transition-transform duration-300 ${isSelected ? 'rounded-md' : 'group-hover:scale-105'}`}
                                     />
@@ -11,7 +11,7 @@ import { itinerary } from '../services/itineraryApi';
 const TripDetailPage = () => {
     const { tripId } = useParams();
     const navigate = useNavigate();
-    const { currentTrip, days, activities, loadTrip, addDay, addActivity, updateActivity, deleteActivity, deleteDay, deleteTrip } = useItinerary();
+    const { currentTrip, days, activities, loadTrip, syncTrip, addDay, addActivity, updateActivity, deleteActivity, deleteDay, deleteTrip } = useItinerary();
     const [selectedDay, setSelectedDay] = useState(null);
     const [showAddDayModal, setShowAddDayModal] = useState(false);
     const [showAddActivityModal, setShowAddActivityModal] = useState(false);
@@ -30,6 +30,27 @@ const TripDetailPage = () => {
         }
     }, [tripId]);
 
+    // Latest values for the event stream's handlers, which outlive renders
+    const syncTripRef = useRef(syncTrip);
+    syncTripRef.current = syncTrip;
+    const versionRef = useRef(null);
+    versionRef.current = currentTrip?.version;
+
+    // Pick up collaborators' changes as they are made
+    useEffect(() => {
+        const events = itinerary.watchTrip(tripId);
+        events.addEventListener('version', (event) => {
+            if (JSON.parse(event.data).version !== versionRef.current) {
+                syncTripRef.current(tripId);
+            }
+        });
+        events.addEventListener('deleted', () => {
+            events.close();
+            navigate('/itinerary');
+        });
+        return () => events.close();
+    }, [tripId]);
+
     useEffect(() => {
         if (days.length > 0 && !selectedDay) {
             setSelectedDay(days[0]);
@@ -216,7 +237,7 @@ const TripDetailPage = () => {
                                         activity={activity}
                                         onEdit={() => handleEditActivity(activity)}
                                         onDelete={() => confirmDeleteActivity(activity)}
-                                        onPhotoUpdate={() => loadTrip(tripId)}
+                                        onPhotoUpdate={() => syncTrip(tripId)}
                                     />
                                 ))}
 
@@ -264,7 +285,7 @@ const TripDetailPage = () => {
             {showAddActivityModal && selectedDay && (
                 <AddActivityModal
                     dayId={selectedDay.id}
-                    activityCount={dayActivities.length}
+                    nextOrderIndex={dayActivities.length ? dayActivities[dayActivities.length - 1].order_index + 1 : 0}
                     onClose={() => setShowAddActivityModal(false)}
                     onAdd={addActivity}
                 />
@@ -278,7 +299,7 @@ const TripDetailPage = () => {
                         setEditingActivity(null);
                     }}
                     onUpdate={updateActivity}
-                    onPhotoUpdate={() => loadTrip(tripId)}
+                    onPhotoUpdate={() => syncTrip(tripId)}
                 />
             )}
 
@@ -640,7 +661,7 @@ const AddDayModal = ({ tripId, dayNumber, onClose, onAdd }) => {
 };
 
 // Add Activity Modal
-const AddActivityModal = ({ dayId, activityCount, onClose, onAdd }) => {
+const AddActivityModal = ({ dayId, nextOrderIndex, onClose, onAdd }) => {
     const [formData, setFormData] = useState({
         title: '',
         description: '',
@@ -649,7 +670,7 @@ const AddActivityModal = ({ dayId, activityCount, onClose, onAdd }) => {
         location: '',
         cost: '',
         currency: 'USD',
-        order_index: activityCount
+        order_index: nextOrderIndex
     });
     const [loading, setLoading] = useState(false);
 
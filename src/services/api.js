@@ -83,11 +83,37 @@ export const media = {
         });
     },
 
-    // Get all media for a trip (paginated)
-    getByTrip: (tripId, page = 1, limit = 50) => api.get(`/media/trip/${tripId}`, { params: { page, limit } }),
+    // Upload many files in one request; resolves to { results, uploaded, failed }
+    uploadBatch: async (files, tripId = null, onProgress) => {
+        const formData = new FormData();
+        files.forEach((file) => formData.append('files', file));
+        if (tripId) {
+            formData.append('trip_id', tripId);
+        }
+
+        return api.post('/media/upload-batch', formData, {
+            headers: {
+                'Content-Type': 'multipart/form-data',
+            },
+            onUploadProgress: (progressEvent) => {
+                if (onProgress) {
+                    const percentCompleted = Math.round((progressEvent.loaded * 100) / progressEvent.total);
+                    onProgress(percentCompleted);
+                }
+            }
+        });
+    },
+
+    // Get all media for a trip (paginated). Pass the previous page's next_cursor to continue;
+    // the total is only counted on the first page.
+    getByTrip: (tripId, page = 1, limit = 50, cursor = null) => api.get(`/media/trip/${tripId}`, {
+        params: { page, limit, cursor: cursor || undefined, total: cursor ? 'none' : 'exact' }
+    }),
 
-    // Get favorite media (paginated)
-    getFavorites: (page = 1, limit = 50) => api.get(`/media/favorites`, { params: { page, limit } }),
+    // Get favorite media (paginated, same cursor rules as getByTrip)
+    getFavorites: (page = 1, limit = 50, cursor = null) => api.get(`/media/favorites`, {
+        params: { page, limit, cursor: cursor || undefined, total: cursor ? 'none' : 'exact' }
+    }),
 
     // Toggle favorite
     toggleFavorite: (mediaId, isFavorite) =>
@@ -7,9 +7,21 @@ export const itinerary = {
     createTrip: (tripData) => api.post('/itinerary/trips', tripData),
     getTrips: () => api.get('/itinerary/trips'),
     getTrip: (tripId) => api.get(`/itinerary/trips/${tripId}`),
+    // Trip, days with their activities and packing list in one request
+    getTripFull: (tripId) => api.get(`/itinerary/trips/${tripId}/full`),
+    // Rows created, updated or deleted after a version (from getTripFull or a previous call)
+    getTripChanges: (tripId, since) => api.get(`/itinerary/trips/${tripId}/changes`, { params: { since } }),
+    // Server-sent events: "version" after every change to the trip, "deleted" when it is deleted
+    watchTrip: (tripId) => {
+        const token = sessionStorage.getItem('token');
+        return new EventSource(`${api.defaults.baseURL}/itinerary/trips/${tripId}/events?token=${token}`);
+    },
     updateTrip: (tripId, tripData) => api.put(`/itinerary/trips/${tripId}`, tripData),
     deleteTrip: (tripId) => api.delete(`/itinerary/trips/${tripId}`),
     joinTrip: (joinCode) => api.post('/itinerary/trips/join', { join_code: joinCode }),
+    // Many creates/updates/deletes in one transaction:
+    // [{ op, entity, ref?, id?, data? }], where a created row's ref can stand in for its id
+    applyBatch: (tripId, operations) => api.post(`/itinerary/trips/${tripId}/batch`, { operations }),
 
     // Day endpoints
     createDay: (tripId, dayData) => api.post(`/itinerary/trips/${tripId}/days`, dayData),
@@ -22,6 +34,9 @@ export const itinerary = {
     getDayActivities: (dayId) => api.get(`/itinerary/days/${dayId}/activities`),
     updateActivity: (activityId, activityData) => api.put(`/itinerary/activities/${activityId}`, activityData),
     deleteActivity: (activityId) => api.delete(`/itinerary/activities/${activityId}`),
+    // Set the order of whole days at once: [{ day_id, activity_ids }], moving activities between days
+    reorderActivities: (tripId, days, gaps = true) =>
+        api.put(`/itinerary/trips/${tripId}/activities/order`, { days, gaps }),
     uploadActivityPhoto: (activityId, file) => {
         const formData = new FormData();
         formData.append('file', file);